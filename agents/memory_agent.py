@@ -5,556 +5,1443 @@ Supports both English and Romanized Nepali queries
 SPECIAL: Prioritizes girlfriend identity when asked about "lalita" or "girlfriend"
 """
 
+import hashlib
+import heapq
 import json
 import os
-from typing import List, Dict, Optional
-from datetime import datetime
+import threading
+import time
+from typing import Iterable, List, Dict, Optional, Sequence
+from datetime import date, datetime
+
+try:
+    import numpy as np
+except ImportError:
+    pass  # Batch scoring falls back to per-query retrieval
+
+from memory.keyword_index import KeywordIndex
+from memory.bm25 import BM25Index, NUMPY_AVAILABLE, top_k
+from memory.embeddings import HashingEmbedder, VectorIndex
+from memory.embedding_cache import EmbeddingCache
+from memory.ann import IVFIndex
+from memory.storage import MemoryStore, JsonMemoryStore
+from memory.cache import QueryCache
+from memory.secondary_index import SecondaryIndex
+from memory.identity_profile import IdentityProfile
+from memory.id_index import IdIndex, id_key
+from memory.columnar import ColumnarMemories, new_memory_table, id_sort_key
+from memory.date_parser import parse_date_range
+from memory.fusion import ranks, reciprocal_rank_fusion
+from memory.ingest import dedupe_key, validate_record
+from memory.minhash import MinHashLSH, jaccard, shingles
+from memory.snapshot import CorpusSnapshot, merge_states, split_state, verify_in_background
+from memory.state import MemoryState
+from memory.text_features import MemoryText, memory_text, text_of
+from memory.trigger_matcher import TriggerMatcher, TriggerMatch
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# GIRLFRIEND IDENTITY TRIGGERS
+# ══════════════════════════════════════════════════════════════════════════
+GF_TRIGGERS = [
+    'lalita oli', 'lalita', 'who is lalita',
+    'my gf', 'my girlfriend', 'girlfriend ko',
+    'detail of my gf', 'detail of gf', 'gf ko detail',
+    'tell me about her', 'about my girlfriend',
+    'her name', 'girlfriend name', 'gf name',
+    'girlfriend ki', 'premi ko', 'girlfriend baare',
+    'usko naam', 'usle ko naam', 'ke ho girlfriend'
+]
+
+IDENTITY_CATEGORIES = ['her_identity', 'her_family', 'her_personality', 'personality_traits', 'her_personality']
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# KEYWORD GROUPS (English + Romanized Nepali)
+# ══════════════════════════════════════════════════════════════════════════
+KEYWORD_GROUPS = {
+
+    # ── Her identity (HIGHEST BOOST) ──────────────────────────────
+    'her_identity': {
+        'keywords': [
+            'lalita', 'girlfriend', 'your girlfriend', 'her name',
+            'who is she', 'bhadra', '2060', 'her birth',
+            'girlfriend ko naam', 'premi ko naam', 'usko naam',
+            'girlfriend baare', 'tero girlfriend', 'premi', 'saathini'
+        ],
+        'categories': ['her_identity'],
+        'content_matches': [
+            'lalita', 'oli', 'bhadra', '2060', 'premi', 
+            'jeevan ko pyaar', 'saathini', 'chatbot', 'girlfriend'
+        ],
+        'boost': 100  # HIGHEST!
+    },
+
+    # ── How we first made contact ──────────────────────────────────
+    'first_contact': {
+        'keywords': [
+            'first', 'start', 'talking', 'message', 'friday', 'facebook',
+            'reply', 'began', 'messaged', 'contact', 'how did we',
+            'how we met', 'night', '7pm', 'lonely', 'ignore',
+            'kasto shuru', 'kasari chinu', 'pehilo palta', 'pahilo palta',
+            'pahilo message', 'pehilo message', 'kasari bheta',
+            'shuru bhayo', 'facebook ma', 'message gareko',
+            'friday ko raat', 'reply garyo', 'kati bajey',
+            'first time boleko', 'bolna shuru', 'ignore garla',
+            'socheko thiyo', 'pehilo palo', 'pahilo palo',
+            'kasari contact', 'kina message', 'message kina',
+            'pehilo din', 'pahilo din', 'raat ma message',
+            'eklo thiye', 'friday bela', 'facebook bata'
+        ],
+        'categories': ['first_contact', 'relationship_start', 'how_we_connected'],
+        'content_matches': [
+            'facebook', 'friday', '7pm', 'messaged', 'lonely', 'ignore',
+            'eklo thiye', 'reply garyo', 'message gareko', 'badliyo',
+            'socheko thiyo', 'pahilo message'
+        ],
+        'boost': 35
+    },
+
+    # ── Common friend / video call introduction ────────────────────
+    'how_connected': {
+        'keywords': [
+            'common friend', 'mutual friend', 'video call', 'connected',
+            'introduced', 'friend connect', 'before we talked', 'weeks before',
+            'common saathi', 'mutual saathi', 'saathi le', 'saathi le connect',
+            'video call garyeko', 'video call ma', 'pehile nai', 'pahile nai',
+            'kasle milayo', 'kasle introduce', 'saathi ko madhyam',
+            'saathi le chinauko', 'saathi ko through', 'dui hapta agadi',
+            '2 hapta pahile', 'agaadi nai', 'pehile connect',
+            'video ma boleko', 'video call ko agadi'
+        ],
+        'categories': ['how_we_connected', 'relationship_start'],
+        'content_matches': [
+            'common friend', 'video call', '2 weeks', 'casual', 'connected',
+            'common saathi', 'saathi le', 'video call maa', 'saadhaaran',
+            'chinaaudiyeko', 'pehile'
+        ],
+        'boost': 32
+    },
+
+    # ── Number of in-person meetings ───────────────────────────────
+    'meetings': {
+        'keywords': [
+            'met', 'meet', 'meeting', 'in person', 'times', 'saw', 'seen',
+            'how many times', 'physically', 'face to face', 'together',
+            'kati choti', 'kati palta', 'bheta', 'bheteko', 'bhet',
+            'physically bheto', 'aankha dekha', 'dekha bhayo',
+            'kati baar bheteko', 'samna', 'aamne saamne',
+            'face dekha', 'prataksha bheteko', 'kati din bheteko',
+            'kati palo bheteko', 'bhetna', 'bhet gare', 'bhetna gaye',
+            'sanga bheto', 'ma bheteko', 'hami bheteko',
+            'kati baar dekha', 'physically dekha'
+        ],
+        'categories': ['meetings'],
+        'content_matches': [
+            '4 times', 'four times', 'only met', 'precious', 'distance',
+            'chaar palta', 'physically', 'bheteko chhau', 'kyaaro thiyo',
+            'kati choti', 'palta matra'
+        ],
+        'boost': 35
+    },
+
+    # ── Baby bet / Alisha ──────────────────────────────────────────
+    'bet': {
+        'keywords': [
+            'bet', 'alisha', 'baby', 'boy', 'girl', 'won', 'win', 'wins',
+            'argument', 'gender', 'niece', 'nephew', 'prediction', 'always wins',
+            'shart', 'bet lagyo', 'alisha ko', 'baby ko', 'chora ki chori',
+            'jitiyo', 'haari', 'argument jityo', 'jhagada jityo',
+            'bhanji', 'bhanja', 'gender kasto hola', 'sahi thiyo',
+            'galat thiyo', 'ma jite', 'usle jityo', 'usle jitchhe',
+            'hamesha jitchhe', 'jitna man parcha', 'shart ma jitiyo',
+            'baby chora hola', 'baby chori hola', 'kasto hola baby',
+            'alisha janmada', 'alisha ko janma', 'chhori thiyo',
+            'chora thiyo', 'usle sahi thiyo', 'ma galat thiyo'
+        ],
+        'categories': ['inside_jokes', 'special_moments'],
+        'content_matches': [
+            'bet', 'alisha', 'boy', 'girl', 'won',
+            'shart', 'chora', 'chori', 'jitiyo', 'hamesha jitchhe',
+            'alisha ko janma', 'bhanji', 'maaya garcha'
+        ],
+        'boost': 40
+    },
+
+    # ── Gifts exchanged ────────────────────────────────────────────
+    'gifts': {
+        'keywords': [
+            'gift', 'gave', 'give', 'given', 'earring', 'rose', 'rupees',
+            'present', 'token', '100', 'one earring', 'flower', 'wrapped',
+            'uphaar', 'uphar', 'dieko', 'deko', 'diyeko', 'kaan ko',
+            'kaanmuni', 'kaanbali', 'phool', 'gulaab', 'gulab',
+            '100 rupiya', 'note ma', 'ek kaanbali', 'kasle ke diyo',
+            'maine ke diye', 'usle ke diye', 'ke uphaar diyo',
+            'ke diyo malai', 'ke diyo uslai', 'ek earring',
+            'ek matra', 'phool dieko', 'gulab dieko',
+            'rupiya wrapped', 'note ma gulab', 'paisa maa gulab',
+            'uphar ke thiyo', 'ke lyaeko', 'ke lyauthyo'
+        ],
+        'categories': ['gifts', 'gifts_exchanged'],
+        'content_matches': [
+            'earring', 'rose', 'rupees', '100', 'awkward', 'wrapped',
+            'kaanbali', 'gulab', 'rupiya', 'uphaar', 'note maa',
+            'sambhaalera', 'wrap gareko'
+        ],
+        'boost': 35
+    },
+
+    # ── My / Her family ────────────────────────────────────────────
+    'family': {
+        'keywords': [
+            'family', 'father', 'dad', 'mother', 'mom', 'brother', 'sister',
+            'parents', 'mandir', 'pabitra', 'sunil', 'lokendra',
+            'middle child', 'siblings', 'elder brother', 'younger brother',
+            'pariwar', 'buba', 'buwa', 'aama', 'ama', 'bhai', 'daju',
+            'didi', 'bahini', 'mandir khadka', 'pabitra khadka',
+            'sunil dai', 'lokendra', 'maijhilo', 'majhilo chhora',
+            'mero pariwar', 'hamro ghar', 'tero buwa', 'tero aama',
+            'buba ko naam', 'aama ko naam', 'daju ko naam',
+            'bhai ko naam', 'ghar ma', 'ghar ko', 'pariwar ko',
+            'teen jana', 'teen bhai', 'majhilo', 'daju bhai'
+        ],
+        'categories': ['my_family', 'family', 'her_family'],
+        'content_matches': [
+            'mandir', 'pabitra', 'sunil', 'lokendra', 'middle child',
+            'buwa', 'aama', 'daju', 'bhai', 'majhilo chhora',
+            'mandir khadka', 'pabitra khadka', 'teen jana'
+        ],
+        'boost': 35
+    },
+
+    # ── Nickname ───────────────────────────────────────────────────
+    'nickname': {
+        'keywords': [
+            'call', 'name', 'chuchi', 'ghosu', 'nickname', 'what do you call',
+            'pet name', 'term of endearment',
+            'ke bhanchu', 'ke bhanera', 'naam ke ho', 'ke naam',
+            'chuchi kina', 'ghosu kina', 'naamdhari', 'tapaai ko naam',
+            'tero naam', 'mero naam', 'ke boli', 'ke bolchhu',
+            'darling naam', 'pyaar ko naam', 'boli ko naam',
+            'chuchi bhanchhau', 'ghosu bhanchhau', 'kina chuchi',
+            'kina ghosu', 'tapaai le ke bhannu', 'usle ke bhancha'
+        ],
+        'categories': ['nickname'],
+        'content_matches': [
+            'chuchi', 'ghosu', 'call', 'darpok',
+            'bhanchu', 'bhancha', 'pyaar ko naam', 'arkulai thaha'
+        ],
+        'boost': 35
+    },
+
+    # ── Personality ────────────────────────────────────────────────
+    'personality': {
+        'keywords': [
+            'scared', 'darpok', 'afraid', 'competitive', 'win', 'sensitive',
+            'feel', 'shy', 'brave', 'personality', 'nature', 'character',
+            'daraune', 'darauchhe', 'daraunchhe', 'darpok chhe',
+            'darpok chha', 'dar lagcha', 'darlagcha', 'harauna man pardaina',
+            'jitna man parcha', 'sensitive chhe', 'sensitive chha',
+            'man ko kura', 'swabhav', 'swabhaav', 'kasto chhe',
+            'kasto chha', 'personality kasto', 'kasri chhe',
+            'komal chhe', 'brave chhe', 'himmat', 'sachchi chhe',
+            'darpok thiyo', 'sensitive thiyo', 'kasto manchhe'
+        ],
+        'categories': ['personality', 'her_personality', 'my_personality', 'personality_traits'],
+        'content_matches': [
+            'darpok', 'scared', 'competitive', 'sensitive', 'brave',
+            'dar lagchha', 'adorable', 'surakshit', 'himmatpan',
+            'joshilaaipan', 'komal', 'sachcho'
+        ],
+        'boost': 30
+    },
+
+    # ── Favorites ──────────────────────────────────────────────────
+    'favorites': {
+        'keywords': [
+            'favorite', 'favourite', 'love', 'likes', 'color', 'colour',
+            'purple', 'ice cream', 'chocolate', 'music', 'artist', 'song',
+            'romcom', 'romantic comedy', 'movie', 'film', 'food',
+            'man parcha', 'man pareko', 'rang', 'rang ke ho',
+            'kasto rang', 'purple rang', 'aayskrim', 'ice cream khana',
+            'chocolate', 'gana', 'geet', 'sangeet', 'gayak', 'gaayak',
+            'movie hercha', 'movie man parcha', 'romantic film',
+            'romantic movie', 'khana man parcha', 'kasto khana',
+            'cigarettes after sex', 'indie geet', 'indie music',
+            'favorite gana', 'favorite rang', 'favorite khana'
+        ],
+        'categories': ['favorites'],
+        'content_matches': [
+            'purple', 'chocolate', 'cigarettes after sex', 'romcom', 'indie',
+            'rang', 'aayskrim', 'gayak', 'geet', 'sangeet',
+            'man paraaunchhe', 'man parcha'
+        ],
+        'boost': 25
+    },
+
+    # ── Relationship timeline / growth ─────────────────────────────
+    'relationship': {
+        'keywords': [
+            'relationship', 'year', 'together', 'talking', 'timeline',
+            '4 days', 'formal', 'grew', 'journey', 'how long',
+            'since when', 'duration', 'history',
+            'sambandha', 'rishta', 'kati din', 'kati barsadekhi',
+            'kati samay', 'ek barsadekhi', 'ek barsha', 'yati din',
+            'yati samay', 'kati din dekhi', 'kina bheteko',
+            'kasari chaliyo', 'kasari badyo', 'kasari sudhriyo',
+            'suru dekhi', 'aba samma', 'kitna time', 'kati arsa',
+            'ek barsama', 'saal bhari', 'din gaye', 'samay gayo',
+            'formal thiyo', 'formal thiye', 'har 4 din'
+        ],
+        'categories': [
+            'relationship_timeline', 'relationship_growth',
+            'relationship_dynamic', 'relationship_start'
+        ],
+        'content_matches': [
+            'year', 'formal', '4 days', 'beautiful', 'trust',
+            'sambandha', 'rishta', 'barsadekhi', 'har 4 din',
+            'sunaulo', 'formal thiyo', 'ek barsama'
+        ],
+        'boost': 30
+    },
+
+    # ── Promises ──────────────────────────────────────────────────
+    'promises': {
+        'keywords': [
+            'promise', 'promised', 'always there', 'commitment', 'vow',
+            'swear', 'never leave', 'forever', 'always be',
+            'vachan', 'vaada', 'vada', 'promise gareko', 'kasam',
+            'hamesha', 'hamesha rahnchhu', 'kabhi chhordina',
+            'satha hunchu', 'sanga rahnchhu', 'chhadna', 'chhadne chaina',
+            'sadhai satha', 'sadhai hunchu', 'kina promise',
+            'ke promise', 'vaada gareko', 'vachan gareko'
+        ],
+        'categories': ['promises'],
+        'content_matches': [
+            'promised', 'always', 'deserves', 'world',
+            'vachan', 'vaada', 'sadhai satha', 'kabhi chhordina',
+            'hamesha usko satha', 'sachchi'
+        ],
+        'boost': 30
+    },
+
+    # ── Apologies / sorry ──────────────────────────────────────────
+    'apologies': {
+        'keywords': [
+            'sorry', 'apology', 'apologize', 'forgive', 'forgiveness',
+            'mistake', 'say sorry', 'always sorry',
+            'maaf', 'maafi', 'sorry bhanchu', 'sorry bhaneko',
+            'maaf garchhe', 'maaf garyo', 'galti', 'galti gareko',
+            'maafi magnu', 'maafi magchhu', 'kina sorry',
+            'sorry bhanchhau', 'sorry bhandaichu', 'maaf gardiye',
+            'hamro sorry', 'maafi ko kura'
+        ],
+        'categories': ['apologies'],
+        'content_matches': [
+            'sorry', 'forgives', 'thing',
+            'maaf', 'maafi', 'galti', 'maaf gardiye',
+            'hamro afnai kura', 'sorry bhaniranchhu'
+        ],
+        'boost': 28
+    },
+
+    # ── My identity / personal info ────────────────────────────────
+    'my_identity': {
+        'keywords': [
+            'yamraj', 'khadka', 'your name', 'who are you', 'born',
+            'birthday', 'scorpio', 'zodiac', 'rashi', 'monday',
+            'december', '2001', 'middle child',
+            'yamraj', 'tero naam', 'tapaai ko naam', 'naam ke ho',
+            'ko ho timi', 'ko hau', 'janam', 'janma', 'birthday kab',
+            'janma din', 'rashifal', 'rashi ke ho', 'kasto rashi',
+            'scorpio rashi', 'december ma', 'december 15',
+            'sombar', 'somabara', 'majhilo chhora',
+            'tero parichay', 'tapaai ko parichay'
+        ],
+        'categories': ['my_identity', 'my_background', 'my_personality', 'my_hobbies'],
+        'content_matches': [
+            'yamraj', 'khadka', 'december', 'scorpio', 'monday', '2001',
+            'sombar', 'janma', 'rashi', 'majhilo chhora', 'puuro naam'
+        ],
+        'boost': 35
+    },
+
+    # ── My hobbies / interests ─────────────────────────────────────
+    'hobbies': {
+        'keywords': [
+            'chess', 'hobby', 'hobbies', 'interest', 'passion', 'play',
+            'game', 'introvert', 'strategy',
+            'chess khelchhu', 'chess khelna', 'daam', 'satranj',
+            'man laagchha', 'ruchhi', 'khelna man parcha',
+            'chess man parcha', 'introvert', 'eklo basna', 'khel',
+            'khelkud', 'strategy khelna', 'dimag ko khel',
+            'tero hobby', 'ke man parcha', 'ke khelchhu',
+            'introvert hau', 'introvert ho'
+        ],
+        'categories': ['my_hobbies'],
+        'content_matches': [
+            'chess', 'passion', 'strategy', 'introvert',
+            'satranj', 'ruchhi', 'khelna', 'dimag', 'ghantau ghanta'
+        ],
+        'boost': 30
+    },
+
+    # ── Education / background / location ─────────────────────────
+    'education': {
+        'keywords': [
+            'study', 'studying', 'engineer', 'engineering', 'computer',
+            'degree', 'college', 'university', 'final year', 'graduate',
+            'undergraduate', 'baijanath', 'banke',
+            'padhna', 'padhchhu', 'padhai', 'computer engineering',
+            'engineering padhchhu', 'final year ma', 'degree',
+            'college ma', 'university ma', 'padhera', 'padheko',
+            'baijanath', 'banke', 'ghar kaha', 'kaha baschhau',
+            'kaha padhchhu', 'ke padhchhu', 'tero padhai'
+        ],
+        'categories': ['my_background', 'my_identity', 'dreams', 'location'],
+        'content_matches': [
+            'computer engineering', 'final year', 'baijanath', 'banke', 'degree',
+            'padhdaichhu', 'lagbhag degree', 'kaha baschhau', 'thaau'
+        ],
+        'boost': 30
+    },
+
+    # ── Her family ─────────────────────────────────────────────────
+    'her_family': {
+        'keywords': [
+            'her family', 'her brother', 'her sister', 'alisha',
+            'niece', 'nephew', 'her parents', 'her siblings',
+            'usko pariwar', 'uski pariwar', 'usko daju', 'usko bhai',
+            'usko didi', 'usko bahini', 'alisha', 'bhanji',
+            'ushni pariwar', 'uski ghar', 'ushni daju',
+            'ushni bhai', 'ushni didi', 'ushni aama', 'ushni buwa',
+            'girlfriend ko pariwar', 'uski niece', 'baby alisha'
+        ],
+        'categories': ['her_family'],
+        'content_matches': [
+            'alisha', 'elder brothers', 'elder sister', '3-month',
+            'bhanji', 'usko daju', 'usko didi', 'daju ra didi',
+            'mahina ko chhori'
+        ],
+        'boost': 33
+    },
+
+    # ── Dreams / future ────────────────────────────────────────────
+    'dreams': {
+        'keywords': [
+            'dream', 'future', 'graduate', 'together forever', 'someday',
+            'hope', 'wish', 'plan', 'goal', 'aspire',
+            'sapana', 'sapna', 'bhabishya', 'bhavishya', 'aune din',
+            'ek din', 'sanga basna', 'sanga rahna',
+            'future ma', 'aagadi', 'life ma', 'sath ma basna',
+            'sapana ke ho', 'sapna ke ho', 'graduate bhayepachi',
+            'degree sakiepachi', 'aune din sath', 'hamesha sath'
+        ],
+        'categories': ['dreams'],
+        'content_matches': [
+            'graduate', 'future', 'dream', 'together', 'someday',
+            'sapana', 'bhavishya', 'degree sakiyo', 'gannu paraina',
+            'sanga basnu', 'saadhaaran jeevan'
+        ],
+        'boost': 28
+    },
+
+    # ── Special moments / dates ────────────────────────────────────
+    'special_moments': {
+        'keywords': [
+            'date', 'restaurant', 'stargazing', 'night', 'stars',
+            'orion', 'special', 'moment', 'memory', 'remember',
+            'khana khaeko', 'restaurant gako', 'tara hereko',
+            'raat ma baseko', 'tara ko kura', 'orion belt',
+            'bistaar kura gareko', 'yaad chha', 'yaad cha',
+            'bisesh din', 'bisesh pal', 'bistaar boli',
+            'tara hereko bela', 'raat bistaar', 'din yaad cha'
+        ],
+        'categories': ['special_moments'],
+        'content_matches': [
+            'restaurant', 'stargazing', 'orion', 'dreams', 'talked',
+            'tara hereko', 'bistaar kura', 'yaad chha', 'khana khaeko',
+            'raat bistaar'
+        ],
+        'boost': 28
+    },
+
+    # ── Inside jokes ───────────────────────────────────────────────
+    'inside_jokes': {
+        'keywords': [
+            'joke', 'funny', 'pineapple', 'pizza', 'laugh', 'tease',
+            'inside joke', 'argue',
+            'joke', 'hanso', 'hansaune', 'pineapple pizza',
+            'pizza ko kura', 'pizza ma pineapple', 'hasamkhel',
+            'chidhaaune', 'taunt', 'haasikhushi', 'ramilo kura',
+            'haami ko joke', 'ramro joke', 'jhagada ko kura',
+            'argue gareko', 'tarkibadi', 'kura gareko'
+        ],
+        'categories': ['inside_jokes'],
+        'content_matches': [
+            'pineapple', 'pizza', 'team yes', 'team no',
+            'hasamkhel', 'argue gareko', 'pizza maa pineapple',
+            'hansaune'
+        ],
+        'boost': 25
+    },
+}
+
+# Compiled once: finds identity triggers and triggered groups in one pass
+TRIGGER_MATCHER = TriggerMatcher(KEYWORD_GROUPS, GF_TRIGGERS)
+
+# Corpus snapshots built with other keyword groups are stale
+KEYWORD_GROUPS_FINGERPRINT = hashlib.sha256(
+    json.dumps(KEYWORD_GROUPS, sort_keys=True).encode('utf-8')
+).hexdigest()
+
+
+def _iso_date(value) -> Optional[str]:
+    """'YYYY-MM-DD' for a date (or datetime); strings pass through"""
+    if isinstance(value, date):
+        return value.isoformat()[:10]
+    return value
 
 
 class MemoryAgent:
     """Manages and retrieves relationship memories"""
 
-    def __init__(self, memory_file: str = "memory/memories.json"):
+    ENGINES = ('keyword', 'bm25', 'vector', 'hybrid')
+
+    # What add_memory / import_memories do with a near-duplicate memory
+    NEAR_DUPLICATE_MODES = ('keep', 'flag', 'skip')
+
+    # Batch scoring works on query chunks of at most this many score cells
+    BATCH_CELLS = 1 << 24
+
+    # Memories parsed and indexed per batch when building the indexes
+    LOAD_CHUNK = 4096
+
+    # The embedding cache is compacted once it holds this many times more
+    # rows than there are live memories (plus EMBEDDING_CACHE_SLACK)
+    EMBEDDING_CACHE_GROWTH = 2
+    EMBEDDING_CACHE_SLACK = 4096
+
+    def __init__(self, memory_file: str = "memory/memories.json", engine: str = "keyword",
+                 use_vector: bool = False, compact_records: int = 1000,
+                 compact_bytes: int = 1_000_000, store: Optional[MemoryStore] = None,
+                 cache_size: int = 256, min_score: Optional[float] = None,
+                 snapshot: bool = True, near_duplicates: str = 'keep',
+                 near_duplicate_threshold: float = 0.7, background_load: bool = False,
+                 watch_interval: Optional[float] = 2.0, date_filter: bool = True,
+                 hybrid_weights: Sequence[float] = (1.0, 0.35), hybrid_candidates: int = 100,
+                 rrf_k: float = 5, ann: bool = False, ann_lists: Optional[int] = None,
+                 ann_probe: int = 8, embedding_cache: bool = True):
+        """
+        Initialize the memory agent
+
+        Args:
+            memory_file: Path to memories.json
+            engine: Retrieval engine - 'keyword' (hand-tuned group boosts),
+                    'bm25' (vectorized BM25), 'vector' (local char n-gram
+                    embeddings) or 'hybrid' (keyword and vector rankings
+                    fused by reciprocal rank); all but keyword need numpy
+            use_vector: Shortcut for engine='vector'
+            compact_records: Fold the write journal into memories.json
+                             after this many added memories
+            compact_bytes: ...or once the journal grows past this size
+            store: Storage backend (default: JsonMemoryStore on memory_file).
+                   Queryable stores such as SQLiteMemoryStore answer
+                   lookups directly and only support the keyword engine;
+                   an empty one is seeded from memory_file.
+            cache_size: Max cached retrieve_memories results (0 disables)
+            min_score: Default score cutoff; memories scoring below it
+                       never reach the results (None: any positive score).
+                       The hybrid engine compares it with the fused score.
+            snapshot: Keep a binary snapshot of the parsed corpus and
+                      indexes next to memories.json and memory-map it on
+                      startup while the JSON and journal are unchanged
+                      (needs numpy and a file-backed store); its array
+                      checksums are verified on a background thread, and a
+                      damaged snapshot is replaced by a rebuild
+            near_duplicates: New memories whose word Jaccard similarity with
+                             an existing one reaches near_duplicate_threshold
+                             are stored anyway ('keep', no index), stored
+                             with a duplicate_of id ('flag') or dropped
+                             ('skip'); flag and skip keep a MinHash LSH index
+                             and need numpy
+            near_duplicate_threshold: Similarity that makes a near-duplicate
+            background_load: Return at once and build the indexes on a
+                             background thread; queries answer from the
+                             memories loaded so far and writes wait for
+                             the load (see wait_until_loaded)
+            watch_interval: Reads stat() memory_file at most this often
+                            (seconds); when someone else changed it, the
+                            edit is diffed by memory id and applied on a
+                            background thread (see reload). None or 0
+                            disables watching; queryable stores are
+                            never watched.
+            date_filter: Restrict retrieval to the dates a query names
+                         ("last month", "hijo", "2024 ma"); see
+                         retrieve_memories
+            hybrid_weights: (keyword, vector) weights of the two rankings
+                            in the hybrid engine's fusion; the default
+                            leans on the hand-tuned keyword groups, which
+                            beat the char n-gram embeddings on the labeled
+                            queries in benchmark_memory.py
+            hybrid_candidates: Candidates the hybrid engine takes from each
+                               scorer before fusing
+            rrf_k: Reciprocal rank fusion damping constant (RRF_K = 60 is
+                   the usual choice for long rankings; small values favor
+                   each ranker's top few)
+            ann: Search vectors through an IVF approximate nearest-neighbour
+                 index instead of scanning them all (vector and hybrid
+                 engines; it trains once the corpus reaches
+                 memory.ann.MIN_TRAIN memories and is kept in the snapshot)
+            ann_lists: IVF buckets (None: about sqrt(corpus size))
+            ann_probe: Buckets scanned per query; raise for recall, lower
+                       for speed (can be changed on a live agent)
+            embedding_cache: Keep memory embeddings in a content-hash keyed
+                             cache next to memories.json, so loads and
+                             reloads only embed memories whose text is new;
+                             agents in other processes share it (vector and
+                             hybrid engines)
+        """
+        if use_vector:
+            engine = 'vector'
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Choose from: {', '.join(self.ENGINES)}")
+        if engine != 'keyword' and not NUMPY_AVAILABLE:
+            print("⚠️  NumPy not available, falling back to keyword engine. Install: pip install numpy")
+            engine = 'keyword'
+        if store is not None and store.queryable and engine != 'keyword':
+            raise ValueError(f"{type(store).__name__} only supports the keyword engine")
+        if near_duplicates not in self.NEAR_DUPLICATE_MODES:
+            raise ValueError(f"Unknown near_duplicates mode '{near_duplicates}'. "
+                             f"Choose from: {', '.join(self.NEAR_DUPLICATE_MODES)}")
+        if near_duplicates != 'keep' and not NUMPY_AVAILABLE:
+            print("⚠️  NumPy not available, near-duplicate detection disabled. Install: pip install numpy")
+            near_duplicates = 'keep'
+        if store is not None and store.queryable and near_duplicates != 'keep':
+            raise ValueError(f"{type(store).__name__} does not support near-duplicate detection")
+        if ann and engine not in ('vector', 'hybrid'):
+            raise ValueError("ann needs the vector or hybrid engine")
+        if len(hybrid_weights) != 2 or min(hybrid_weights) < 0:
+            raise ValueError("hybrid_weights must be two non-negative (keyword, vector) weights")
+
         self.memory_file = memory_file
-        self.memories = []
-        self._load_memories()
+        self.engine = engine
+        self.min_score = min_score
+        self.near_duplicates = near_duplicates
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.date_filter = date_filter
+        self.hybrid_weights = tuple(hybrid_weights)
+        self.hybrid_candidates = hybrid_candidates
+        self.rrf_k = rrf_k
+        self.ann = ann
+        self.ann_lists = ann_lists
+        self.ann_probe = ann_probe
+        self.store = store or JsonMemoryStore(memory_file, compact_records, compact_bytes)
+        self._embedder = HashingEmbedder() if engine in ('vector', 'hybrid') else None
+        if self._embedder is not None and embedding_cache:
+            self._embedder.cache = self._embedding_cache()
+        # Readers use the MemoryState published when they start and never
+        # lock; writers serialize on _write_lock and publish a new state
+        self._state: Optional[MemoryState] = None
+        self._write_lock = threading.RLock()
+        self._scratch = threading.local()
+        self._loaded = threading.Event()
+        self._cache = QueryCache(cache_size)
+        self._snapshot = self._corpus_snapshot() if snapshot else None
+        # (mtime_ns, size) of memory_file as last loaded or written by us
+        self.watch_interval = watch_interval if watch_interval and not self.store.queryable else None
+        self._file_stat: Optional[tuple] = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()  # Held while a background reload runs
+        self._snapshot_checked = threading.Event()  # Set once a loaded snapshot is verified
+        self._snapshot_checked.set()
+        self._load_memories(background_load)
+
+    def _embedding_cache(self) -> Optional[EmbeddingCache]:
+        """Cache file for this embedder next to memory_file (None if it can't be opened)"""
+        root, _ = os.path.splitext(self.memory_file)
+        path = f"{root}.embeddings-{self._embedder.fingerprint}"
+        try:
+            return EmbeddingCache(path, self._embedder.dim)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Embedding cache disabled ({path}): {e}")
+            return None
 
-    def _load_memories(self):
-        """Load memories from JSON file"""
-        if os.path.exists(self.memory_file):
+    @property
+    def memories(self):
+        """Memory table of the published state (columnar; dicts are
+        materialized only for returned memories)"""
+        return self._state.memories
+
+    @property
+    def version(self) -> int:
+        """Published corpus version; bumped by every write and reload"""
+        return self._state.version
+
+    def _new_state(self, version: int) -> MemoryState:
+        """Empty table and indexes for the active engine"""
+        return MemoryState(
+            version=version,
+            memories=new_memory_table(),
+            ids=IdIndex(),
+            secondary=SecondaryIndex(),
+            identity=IdentityProfile(IDENTITY_CATEGORIES),
+            keyword=(KeywordIndex(KEYWORD_GROUPS, KEYWORD_GROUPS_FINGERPRINT)
+                     if self.engine in ('keyword', 'hybrid') and not self.store.queryable else None),
+            bm25=BM25Index() if self.engine == 'bm25' else None,
+            vectors=VectorIndex(self._embedder.dim) if self._embedder is not None else None,
+            ann=IVFIndex(self.ann_lists, self.ann_probe) if self.ann else None,
+            near_dups=MinHashLSH() if self.near_duplicates != 'keep' else None
+        )
+
+    def _load_memories(self, background: bool = False):
+        """Load memories from the store, build the indexes and publish them"""
+        with self._write_lock:
+            self._loaded.clear()
+            state = self._new_state(self._state.version + 1 if self._state is not None else 1)
+            if self.store.queryable:
+                self._seed_store()
+            else:
+                # Stat before reading: an edit made while loading triggers a reload
+                self._file_stat = self._memory_file_stat()
+                loaded = self._load_snapshot(state) if self._snapshot is not None else None
+                if loaded is None and background:
+                    # Empty corpus until the loader publishes its first batch
+                    self._state = state
+                    threading.Thread(target=self._background_load, args=(state.fork(),), daemon=True,
+                                     name=f"memory-load-{os.path.basename(self.memory_file)}").start()
+                    return
+                state = loaded or self._build_state(state)
+            self._state = state
+            self._loaded.set()
+
+    def _background_load(self, state: MemoryState):
+        with self._write_lock:
             try:
-                with open(self.memory_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.memories = data.get('memories', [])
-                print(f"✅ Loaded {len(self.memories)} memories")
+                self._state = self._build_state(state, publish=True)
             except Exception as e:
-                print(f"❌ Error loading memories: {e}")
-                self.memories = []
-        else:
-            print(f"⚠️  Memory file not found: {self.memory_file}")
-            self.memories = []
+                print(f"❌ Error loading memories in the background: {e}")
+            finally:
+                self._loaded.set()
+
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Block until the whole corpus is indexed; False on timeout"""
+        return self._loaded.wait(timeout)
+
+    @property
+    def loading(self) -> bool:
+        """True while a background load is still indexing memories"""
+        return not self._loaded.is_set()
 
-    def retrieve_memories(self, query: str, k: int = 3) -> List[Dict]:
+    def _build_state(self, state: MemoryState, memories: Optional[Iterable[Dict]] = None,
+                     publish: bool = False, sources: Optional[List[Dict]] = None) -> MemoryState:
+        """
+        Fill an empty state from store.stream() (or from memories just saved,
+        read when the snapshot sources were `sources`)
+
+        Memories are parsed, indexed and dropped LOAD_CHUNK at a time, so
+        peak memory stays near the size of the finished table and indexes.
+        With publish=True the state is also published after 4096, 8192,
+        16384, ... memories and loading continues on a fork of it.
+        """
+        if memories is None:
+            # Source state before reading, so a concurrent write invalidates the snapshot
+            sources = self._snapshot.source_state() if self._snapshot is not None else None
+            memories = self.store.stream()
+
+        next_publish = self.LOAD_CHUNK
+        chunk = []
+        for memory in memories:
+            chunk.append(memory)
+            if len(chunk) == self.LOAD_CHUNK:
+                self._index_chunk(state, chunk)
+                chunk = []
+                if publish and len(state.memories) >= next_publish:
+                    self._compile_indexes(state)
+                    self._state = state
+                    state = state.fork()
+                    next_publish *= 2
+        if chunk:
+            self._index_chunk(state, chunk)
+        self._compile_indexes(state)
+        self._compact_embedding_cache(state)
+
+        if self._snapshot is not None:
+            self._save_snapshot(state, sources)
+        return state
+
+    def _index_chunk(self, state: MemoryState, memories: List[Dict]):
+        """Append a batch of memories to a private state's table and indexes"""
+        # Text is normalized once here and shared by the table and indexes
+        texts = [text_of(memory) for memory in memories]
+        start = len(state.memories)
+        state.memories.extend(memories, texts)
+        state.ids.extend(memories, start)
+        state.secondary.extend(memories, start)
+        state.identity.extend(memories, start)
+        if state.keyword is not None:
+            state.keyword.extend(memories, texts)
+        if state.bm25 is not None:
+            state.bm25.extend(memories)
+        if state.vectors is not None:
+            vectors = self._embedder.embed_memories(memories)
+            state.vectors.add_batch(vectors)
+            if state.ann is not None:
+                state.ann.extend(vectors, start)
+        if state.near_dups is not None:
+            state.near_dups.add_batch(start, [shingles(text.text) for text in texts])
+
+    @staticmethod
+    def _compile_indexes(state: MemoryState):
+        """Bring the lazily maintained indexes of a private state up to date before publishing it"""
+        if state.bm25 is not None:
+            state.bm25.compile()
+        if state.ann is not None:
+            state.ann.maintain(state.vectors)
+
+    def _compact_embedding_cache(self, state: MemoryState):
+        """Drop rows of changed and deleted memories once they outnumber the live ones"""
+        cache = self._embedder.cache if self._embedder is not None else None
+        live = len(state.memories) - len(state.memories.removed)
+        if cache is None or len(cache) <= self.EMBEDDING_CACHE_GROWTH * live + self.EMBEDDING_CACHE_SLACK:
+            return
+        try:
+            dropped = cache.compact(self._embedder.cache_key(memory) for memory in state.memories.live())
+        except OSError as e:
+            print(f"⚠️  Could not compact embedding cache {cache.path}: {e}")
+            return
+        print(f"✅ Compacted embedding cache: {dropped:,} stale rows dropped")
+
+    # ══════════════════════════════════════════════════════════════════════
+    # HOT RELOAD
+    # ══════════════════════════════════════════════════════════════════════
+
+    def _memory_file_stat(self) -> Optional[tuple]:
+        """(mtime_ns, size) of memory_file, None if it can't be stat'ed"""
+        try:
+            stat = os.stat(self.memory_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _check_memory_file(self):
+        """
+        Start a background reload if memory_file changed on disk
+
+        Costs a clock read per call and one stat() per watch_interval;
+        the caller never waits for the reload and keeps reading the
+        published state.
+        """
+        if self.watch_interval is None:
+            return
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.watch_interval
+        current = self._memory_file_stat()
+        if current is None or current == self._file_stat:
+            return  # A missing file is mid-replace or gone: keep the corpus
+        if self._reload_lock.acquire(blocking=False):
+            threading.Thread(target=self._background_reload, daemon=True,
+                             name=f"memory-reload-{os.path.basename(self.memory_file)}").start()
+
+    def _background_reload(self):
+        try:
+            self.reload()
+        except Exception as e:
+            # The file stat is left as is, so the next check retries
+            print(f"❌ Error reloading memories: {e}")
+        finally:
+            self._reload_lock.release()
+
+    def reload(self) -> Dict:
+        """
+        Apply changes made to memory_file by someone else (an editor, a sync)
+
+        The file and journal are streamed and diffed against the published
+        corpus by memory id. Only the difference touches the indexes:
+        removed memories are dropped from them, new ones are appended and
+        modified ones are re-indexed at their current position. The result
+        is published in one assignment, so in-flight reads finish on the
+        old corpus, and the version bump invalidates cached results. A file
+        that does not parse completely raises and changes nothing.
+
+        New memories rank like add_memory() ones wherever they sit in the
+        file: ties that fall back to file order place them last until the
+        next full load.
+
+        Returns:
+            Counts of added, removed and modified memories
+        """
+        if self.store.queryable:
+            raise ValueError(f"{type(self.store).__name__} is not reloaded from {self.memory_file}")
+        self._loaded.wait()
+        with self._write_lock:
+            file_stat = self._memory_file_stat()
+            sources = self._snapshot.source_state() if self._snapshot is not None else None
+            state = self._state
+            table = state.memories
+
+            # id -> positions, smallest last, so duplicate ids pair up in order
+            old_positions: Dict = {}
+            for pos in range(len(table) - 1, -1, -1):
+                if pos not in table.removed:
+                    old_positions.setdefault(id_key(table[pos].get('id')), []).append(pos)
+
+            added, modified = [], []
+            for memory in self.store.stream(strict=True):
+                positions = old_positions.get(id_key(memory.get('id')))
+                if not positions:
+                    added.append(memory)
+                    continue
+                pos = positions.pop()
+                if table[pos] != memory:
+                    modified.append((pos, memory))
+            removed = [pos for positions in old_positions.values() for pos in positions]
+            report = {'added': len(added), 'removed': len(removed), 'modified': len(modified)}
+
+            if added or removed or modified:
+                state = state.fork()
+                for pos in removed:
+                    self._unindex_memory(state, pos)
+                for pos, memory in modified:
+                    self._reindex_memory(state, pos, memory)
+                for start in range(0, len(added), self.LOAD_CHUNK):
+                    self._index_chunk(state, added[start:start + self.LOAD_CHUNK])
+                if len(state.memories.removed) * 2 > len(state.memories):
+                    state = self._repack(state, sources)
+                else:
+                    self._compile_indexes(state)
+                    self._compact_embedding_cache(state)
+                    if self._snapshot is not None:
+                        self._save_snapshot(state, sources)
+                self._state = state
+            self._file_stat = file_stat
+
+        print(f"🔄 Reloaded {self.memory_file}: {report['added']} added, "
+              f"{report['removed']} removed, {report['modified']} modified")
+        return report
+
+    def _repack(self, state: MemoryState, sources: Optional[List[Dict]] = None) -> MemoryState:
+        """Rebuild a state that is mostly tombstones densely from its live memories"""
+        return self._build_state(self._new_state(state.version), list(state.memories.live()), sources=sources)
+
+    # ══════════════════════════════════════════════════════════════════════
+    # CORPUS SNAPSHOT
+    # ══════════════════════════════════════════════════════════════════════
+
+    def _corpus_snapshot(self) -> Optional[CorpusSnapshot]:
+        """Snapshot file for this store and engine (None if unsupported)"""
+        sources = self.store.source_files()
+        if not NUMPY_AVAILABLE or self.store.queryable or not sources:
+            return None
+        root, _ = os.path.splitext(sources[0])
+        config = {
+            'engine': self.engine,
+            'keyword_groups': KEYWORD_GROUPS_FINGERPRINT,
+            'identity_categories': sorted(set(IDENTITY_CATEGORIES))
+        }
+        if self._embedder is not None:
+            config['embedder'] = [self._embedder.dim, list(self._embedder.ngram_range)]
+        if self.near_duplicates != 'keep':
+            config['near_duplicates'] = True
+        if self.ann:
+            config['ann'] = [self.ann_lists]
+        return CorpusSnapshot(f"{root}.{self.engine}.snapshot", sources, config)
+
+    @staticmethod
+    def _snapshot_components(state: MemoryState) -> Dict:
+        """Index objects saved in the snapshot, by name"""
+        components = {'ids': state.ids, 'secondary': state.secondary, 'identity': state.identity,
+                      'keyword': state.keyword, 'bm25': state.bm25, 'vectors': state.vectors,
+                      'ann': state.ann, 'near_dups': state.near_dups}
+        return {name: component for name, component in components.items() if component is not None}
+
+    def _load_snapshot(self, state: MemoryState) -> Optional[MemoryState]:
+        """Fill an empty state from a current snapshot (None if there is none)"""
+        snapshot = self._snapshot.load()
+        if snapshot is None:
+            return None
+        header, arrays = snapshot
+        meta = header['meta']
+        try:
+            state = state._replace(memories=ColumnarMemories.from_state(*split_state(meta, arrays, 'memories')))
+            for name, component in self._snapshot_components(state).items():
+                component.load_state(*split_state(meta, arrays, name))
+            self.store.restore(meta['store'])
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable memory snapshot {self._snapshot.path}: {e}")
+            return None
+        print(f"✅ Loaded {len(state.memories)} memories (snapshot)")
+        # Checksums read the whole file, so the shared verifier thread checks them later
+        self._snapshot_checked.clear()
+        verify_in_background(header, arrays, self._snapshot_verified)
+        return state
+
+    def _snapshot_verified(self, damaged: List[str]):
+        """Verifier callback: rebuild from the store if a loaded snapshot array is damaged"""
+        try:
+            if not damaged:
+                return
+            print(f"⚠️  Memory snapshot {self._snapshot.path} is damaged "
+                  f"({', '.join(damaged[:3])}), rebuilding from {self.memory_file}")
+            with self._write_lock:
+                self._snapshot.remove()
+                try:
+                    self._load_memories()
+                except Exception as e:
+                    print(f"❌ Error rebuilding memories: {e}")
+                finally:
+                    self._loaded.set()  # Keep serving the loaded corpus if the rebuild failed
+        finally:
+            self._snapshot_checked.set()
+
+    def _save_snapshot(self, state: MemoryState, sources: Optional[List[Dict]] = None):
+        """Write a state's table and indexes (sources: state they were read from)"""
+        try:
+            states = {name: component.export_state()
+                      for name, component in self._snapshot_components(state).items()}
+            states['memories'] = state.memories.export_state()
+            states['store'] = (self.store.checkpoint(), {})
+            self._snapshot.save(*merge_states(states), sources=sources)
+        except Exception as e:
+            print(f"⚠️  Could not write memory snapshot: {e}")
+            self._snapshot.remove()
+
+    def _seed_store(self):
+        """Fill an empty queryable store from memories.json"""
+        if self.store.count() == 0 and os.path.exists(self.memory_file):
+            seed = JsonMemoryStore(self.memory_file).load()
+            self.store.import_memories(seed)
+            print(f"✅ Imported {len(seed)} memories into {type(self.store).__name__}")
+        print(f"✅ {type(self.store).__name__} holds {self.store.count()} memories")
+
+    def retrieve_memories(self, query: str, k: int = 3, min_score: Optional[float] = None,
+                          dedupe: Optional[float] = None, date_from=None, date_to=None) -> List[Dict]:
         """
         Retrieve relevant memories using enhanced keyword search
         SPECIAL HANDLING for girlfriend identity questions
 
+        Only memories dated date_from..date_to are ranked. Without either,
+        a date range named in the query ("what happened in January?",
+        "gaeko mahina", "3 din aghi") is used instead when date_filter is
+        on, unless no memory falls in it. A month or day named without a
+        year is the latest one with memories.
+
         Args:
             query: Search query (English or Romanized Nepali)
             k: Number of memories to retrieve
+            min_score: Drop memories scoring below this (default: the
+                       agent's min_score); identity answers are exempt
+            dedupe: Skip memories whose word Jaccard similarity with a
+                    better-ranked result is at least this (None: keep all)
+            date_from: Earliest date, inclusive (date or 'YYYY-MM-DD')
+            date_to: Latest date, inclusive (date or 'YYYY-MM-DD')
 
         Returns:
             List of relevant memories
         """
+        self._check_memory_file()
+        if min_score is None:
+            min_score = self.min_score
+        state = self._state
+        dates = self._query_dates(state, query, date_from, date_to)
+        # Normalized key: every scorer lowercases and no trigger phrase
+        # starts or ends with whitespace
+        key = (query.lower().strip(), k, min_score, dedupe, dates)
+        cached = self._cache.get(key, state.version)
+        if cached is not None:
+            return list(cached)
+
+        if dedupe is None:
+            results = self._retrieve(state, query, k, min_score, dates)
+        else:
+            results = self._retrieve_distinct(state, query, k, min_score, dedupe, dates)
+        self._cache.put(key, tuple(results), state.version)
+        return results
+
+    def _query_dates(self, state: MemoryState, query: str, date_from, date_to) -> Optional[tuple]:
+        """(start, end) ISO date range to restrict a retrieval to, or None"""
+        if date_from is not None or date_to is not None:
+            return _iso_date(date_from), _iso_date(date_to)
+        if not self.date_filter:
+            return None
+        count_between = self.store.count_between if self.store.queryable else state.secondary.count_between
+
+        def remembered(span) -> bool:
+            return count_between(_iso_date(span.start), _iso_date(span.end)) > 0
+
+        # "in January": the latest January something was remembered in
+        parsed = parse_date_range(query, exists=remembered)
+        if parsed is None:
+            return None
+        # Asked about a period nothing was remembered in: search everything
+        return (_iso_date(parsed.start), _iso_date(parsed.end)) if remembered(parsed) else None
+
+    def retrieve_memories_batch(self, queries: List[str], k: int = 3, min_score: Optional[float] = None,
+                                dedupe: Optional[float] = None, date_from=None,
+                                date_to=None) -> List[List[Dict]]:
+        """
+        Retrieve memories for many queries at once
+
+        All queries are tokenized and trigger-matched up front. With the
+        keyword engine a chunk of queries is then scored against the whole
+        corpus as one (queries x memories) matrix and each row's top k is
+        picked with argpartition. Results are the same as calling
+        retrieve_memories() per query (identity fast path and date ranges
+        included); date-restricted queries are ranked one at a time.
+
+        Args:
+            queries: Search queries (English or Romanized Nepali)
+            k: Number of memories to retrieve per query
+            min_score: Score cutoff (default: the agent's min_score)
+            dedupe: Near-duplicate cutoff, as in retrieve_memories()
+            date_from: Earliest date, as in retrieve_memories()
+            date_to: Latest date, as in retrieve_memories()
+
+        Returns:
+            One list of memories per query, in input order
+        """
+        self._check_memory_file()
+        if min_score is None:
+            min_score = self.min_score
+        state = self._state
+        dates = [self._query_dates(state, query, date_from, date_to) for query in queries]
+        if dedupe is not None:
+            return [self._retrieve_distinct(state, query, k, min_score, dedupe, query_dates)
+                    for query, query_dates in zip(queries, dates)]
+        if self.engine != 'keyword' or self.store.queryable or not NUMPY_AVAILABLE:
+            return [self._retrieve(state, query, k, min_score, query_dates)
+                    for query, query_dates in zip(queries, dates)]
+        if k <= 0:
+            return [[] for _ in queries]
+
+        results = [[] for _ in queries]
+        pending = []
+        identity_memories = None
+        for i, query in enumerate(queries):
+            if dates[i] is not None:
+                results[i] = self._retrieve(state, query, k, min_score, dates[i])
+                continue
+            query_lower = query.lower()
+            triggers = self.match_triggers(query_lower)
+            if triggers.identity:
+                if identity_memories is None:
+                    identity_memories = self._identity_memories(state, k)
+                if identity_memories:
+                    results[i] = list(identity_memories)
+                    continue
+            pending.append((i, query_lower, triggers))
+
+        memories = state.memories
+        n = len(memories)
+        if not pending or not n:
+            return results
+
+        # Only groups some query triggered get a row in the group matrix
+        groups = list(dict.fromkeys(g for _, _, triggers in pending for g in triggers.groups))
+        group_rows = {group_name: row for row, group_name in enumerate(groups)}
+        group_matrix = state.keyword.group_score_matrix(groups)
+        importance = memories.importance_array(5)
+        neg_importance = -importance
+        id_keys = memories.id_key_array()
+        importance *= 0.5
+        word_positions = {}
+
+        chunk_size = max(1, self.BATCH_CELLS // n)
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+
+            # Query x group trigger matrix: one product adds every group boost
+            triggered = np.zeros((len(chunk), len(groups)))
+            for row, (_, _, triggers) in enumerate(chunk):
+                for group_name in triggers.groups:
+                    triggered[row, group_rows[group_name]] = 1
+            scores = triggered @ group_matrix
+            scores += importance
+
+            # Direct word matches (base score), scattered with one bincount
+            flat = []
+            for row, (_, query_lower, _) in enumerate(chunk):
+                for word in query_lower.split():
+                    if len(word) > 2:
+                        positions = word_positions.get(word)
+                        if positions is None:
+                            positions = np.fromiter(state.keyword.positions_containing(word), dtype=np.int64)
+                            word_positions[word] = positions
+                        flat.append(positions + row * n)
+            if flat:
+                counts = np.bincount(np.concatenate(flat), minlength=scores.size)
+                scores += 3 * counts.reshape(scores.shape)
+            if memories.removed:
+                scores[:, list(memories.removed)] = 0
+
+            for row, (i, _, _) in enumerate(chunk):
+                keep = scores[row] > 0
+                if min_score is not None:
+                    keep &= scores[row] >= min_score
+                candidates = np.flatnonzero(keep)
+                best = candidates[top_k(candidates, scores[row, candidates], k,
+                                        ties=(neg_importance[candidates], id_keys[candidates]))]
+                results[i] = [memories[pos] for pos in best]
+
+        return results
+
+    def _retrieve(self, state: MemoryState, query: str, k: int,
+                  min_score: Optional[float] = None, dates: Optional[tuple] = None) -> List[Dict]:
+        """Uncached retrieval (identity fast path, then the active engine)"""
         query_lower = query.lower()
+        triggers = self.match_triggers(query_lower)
+        # Positions dated within the range: O(log n + hits) off the date index
+        within = None
+        if dates is not None and not self.store.queryable:
+            within = state.secondary.date_range_positions(*dates)
         
         # ══════════════════════════════════════════════════════════════════
         # SPECIAL: Direct girlfriend identity detection
         # ══════════════════════════════════════════════════════════════════
-        gf_triggers = [
-            'lalita oli', 'lalita', 'who is lalita',
-            'my gf', 'my girlfriend', 'girlfriend ko', 
-            'detail of my gf', 'detail of gf', 'gf ko detail',
-            'tell me about her', 'about my girlfriend',
-            'her name', 'girlfriend name', 'gf name',
-            'girlfriend ki', 'premi ko', 'girlfriend baare',
-            'usko naam', 'usle ko naam', 'ke ho girlfriend'
-        ]
-        
         # Check if asking specifically about girlfriend identity
-        if any(trigger in query_lower for trigger in gf_triggers):
-            # Get her_identity, her_family, her_personality
-            identity_memories = []
-            for m in self.memories:
-                cat = m.get('category', '')
-                if cat in ['her_identity', 'her_family', 'her_personality', 'personality_traits', 'her_personality']:
-                    identity_memories.append(m)
-            
+        if triggers.identity:
+            identity_memories = self._identity_memories(state, k, dates, within)
             if identity_memories:
-                # Sort by importance
-                identity_memories.sort(key=lambda x: x.get('importance', 0), reverse=True)
-                return identity_memories[:k]
+                return identity_memories
         
         # ══════════════════════════════════════════════════════════════════
         # Otherwise use normal enhanced search
         # ══════════════════════════════════════════════════════════════════
-        return self._enhanced_search(query, k)
+        if self.engine == 'bm25':
+            return self._bm25_search(state, query, k, min_score, within)
+        if self.engine == 'vector':
+            return self._vector_search(state, query, k, min_score, within)
+        if self.engine == 'hybrid':
+            return self._hybrid_search(state, query, k, triggers, min_score, within)
+        return self._enhanced_search(state, query, k, triggers, min_score, dates, within)
+
+    def _retrieve_distinct(self, state: MemoryState, query: str, k: int, min_score: Optional[float],
+                           threshold: float, dates: Optional[tuple] = None) -> List[Dict]:
+        """
+        _retrieve() minus memories too similar to a better-ranked result
+
+        Fetches twice as many candidates as still needed until k distinct
+        memories are found or the ranking runs out.
+        """
+        fetch = k
+        while k > 0:
+            fetch *= 2
+            candidates = self._retrieve(state, query, fetch, min_score, dates)
+            selected, selected_shingles = [], []
+            for memory in candidates:
+                memory_shingles = shingles(text_of(memory).text)
+                if any(jaccard(memory_shingles, other) >= threshold for other in selected_shingles):
+                    continue
+                selected.append(memory)
+                selected_shingles.append(memory_shingles)
+                if len(selected) == k:
+                    return selected
+            if len(candidates) < fetch:
+                return selected
+        return []
+
+    def _identity_memories(self, state: MemoryState, k: int, dates: Optional[tuple] = None,
+                           within: Optional[List[int]] = None) -> List[Dict]:
+        """Her identity/family/personality memories, most important first"""
+        if self.store.queryable:
+            return self.store.by_categories_ranked(IDENTITY_CATEGORIES, k, dates)
+
+        # her_identity, her_family, her_personality - already ranked
+        positions = state.identity.top(k, set(within) if within is not None else None)
+        return [state.memories[pos] for pos in positions]
+
+    def _bm25_search(self, state: MemoryState, query: str, k: int = 3,
+                     min_score: Optional[float] = None, within: Optional[List[int]] = None) -> List[Dict]:
+        """BM25 search with importance folded in as a prior"""
+        return [state.memories[pos] for pos, score in state.bm25.search(query, k, within)
+                if min_score is None or score >= min_score]
+
+    def _vector_search(self, state: MemoryState, query: str, k: int = 3,
+                       min_score: Optional[float] = None, within: Optional[List[int]] = None) -> List[Dict]:
+        """Nearest memories by char n-gram embedding similarity"""
+        query_vector = self._embedder.embed(query)
+        return [state.memories[row] for row, score in self._nearest(state, query_vector, k, within)
+                if min_score is None or score >= min_score]
+
+    def _nearest(self, state: MemoryState, query_vector: "np.ndarray", k: int,
+                 within: Optional[List[int]] = None) -> List[tuple]:
+        """(row, similarity) of the k nearest memories; through the ANN index when there is one"""
+        if within is None and state.ann is not None:
+            # None until the index is trained: scan everything
+            within = state.ann.candidates(query_vector, self.ann_probe)
+        memories = state.memories
+
+        def ties(rows: "np.ndarray") -> tuple:
+            # The keyword heap's order: more important first, then lower id
+            rows = rows.tolist()
+            return (-np.array([memories.importance_at(row, 5) for row in rows], dtype=np.float64),
+                    np.array([memories.id_key_at(row) for row in rows], dtype=np.float64))
+        return state.vectors.search(query_vector, k, within, ties)
+
+    def _hybrid_search(self, state: MemoryState, query: str, k: int, triggers: TriggerMatch,
+                       min_score: Optional[float] = None, within: Optional[List[int]] = None) -> List[Dict]:
+        """
+        Keyword and vector scoring fused by reciprocal rank
+
+        The keyword scorer's best hybrid_candidates and the vector index's
+        nearest hybrid_candidates form one candidate set; both scorers then
+        score every candidate from the precomputed embeddings and match
+        scores, rank them, and the rankings are fused with hybrid_weights.
+        A memory the keyword groups miss can still rank on a paraphrase,
+        and one the embeddings miss on an exact trigger phrase.
+        """
+        memories = state.memories
+        pool = max(k, self.hybrid_candidates)
+        match_scores = state.keyword.match_scores(query.lower(), triggers.groups)
+        keyword_best = heapq.nsmallest(pool, self._score_stream(state, match_scores, pool, None, within))
+        query_vector = self._embedder.embed(query)
+        vector_best = self._nearest(state, query_vector, pool, within)
+        positions = np.array(sorted({entry[-1] for entry in keyword_best} | {row for row, _ in vector_best}),
+                             dtype=np.int64)
+        if not len(positions) or k <= 0:
+            return []
+
+        pos_list = positions.tolist()
+        importance = np.array([memories.importance_at(pos, 5) for pos in pos_list], dtype=np.float64)
+        id_keys = np.array([memories.id_key_at(pos) for pos in pos_list], dtype=np.float64)
+        matched = np.array([match_scores.get(pos, 0) for pos in pos_list], dtype=np.float64)
+        keyword_scores = matched + importance * 0.5
+        similarities = state.vectors.similarities(query_vector, positions)
+
+        # Each scorer ranks the whole candidate set. The keyword ranking only
+        # counts actual matches: importance alone is a prior, not evidence
+        keyword_rank = ranks((positions, id_keys, -importance, -keyword_scores))
+        keyword_rank[(matched <= 0) | (keyword_scores <= 0)] = 0
+        vector_rank = ranks((positions, id_keys, -importance, -similarities))
+        vector_rank[similarities <= 0] = 0
+        fused = reciprocal_rank_fusion(np.stack([keyword_rank, vector_rank]), self.hybrid_weights, self.rrf_k)
+
+        keep = fused > 0
+        if min_score is not None:
+            keep &= fused >= min_score
+        candidates = np.flatnonzero(keep)
+        best = candidates[top_k(positions[candidates], fused[candidates], k,
+                                ties=(-importance[candidates], id_keys[candidates]))]
+        return [memories[pos] for pos in positions[best].tolist()]
+
+    def match_triggers(self, query: str) -> TriggerMatch:
+        """
+        Find identity triggers and keyword-group keywords in a query
 
-    def _enhanced_search(self, query: str, k: int = 3) -> List[Dict]:
+        Args:
+            query: Search query (English or Romanized Nepali)
+
+        Returns:
+            TriggerMatch listing the matched phrases
+        """
+        return TRIGGER_MATCHER.match(query.lower())
+
+    def _enhanced_search(self, state: MemoryState, query: str, k: int = 3,
+                         triggers: Optional[TriggerMatch] = None,
+                         min_score: Optional[float] = None, dates: Optional[tuple] = None,
+                         within: Optional[List[int]] = None) -> List[Dict]:
         """
         Enhanced keyword-based search with comprehensive matching.
         Supports both English and Romanized Nepali queries.
+
+        Scored memories stream through a bounded heap of size k; ties on
+        score go to the more important memory, then the lower id.
         """
         query_lower = query.lower()
+        if triggers is None:
+            triggers = self.match_triggers(query_lower)
 
-        keyword_groups = {
-
-            # ── Her identity (HIGHEST BOOST) ──────────────────────────────
-            'her_identity': {
-                'keywords': [
-                    'lalita', 'girlfriend', 'your girlfriend', 'her name',
-                    'who is she', 'bhadra', '2060', 'her birth',
-                    'girlfriend ko naam', 'premi ko naam', 'usko naam',
-                    'girlfriend baare', 'tero girlfriend', 'premi', 'saathini'
-                ],
-                'categories': ['her_identity'],
-                'content_matches': [
-                    'lalita', 'oli', 'bhadra', '2060', 'premi', 
-                    'jeevan ko pyaar', 'saathini', 'chatbot', 'girlfriend'
-                ],
-                'boost': 100  # HIGHEST!
-            },
-
-            # ── How we first made contact ──────────────────────────────────
-            'first_contact': {
-                'keywords': [
-                    'first', 'start', 'talking', 'message', 'friday', 'facebook',
-                    'reply', 'began', 'messaged', 'contact', 'how did we',
-                    'how we met', 'night', '7pm', 'lonely', 'ignore',
-                    'kasto shuru', 'kasari chinu', 'pehilo palta', 'pahilo palta',
-                    'pahilo message', 'pehilo message', 'kasari bheta',
-                    'shuru bhayo', 'facebook ma', 'message gareko',
-                    'friday ko raat', 'reply garyo', 'kati bajey',
-                    'first time boleko', 'bolna shuru', 'ignore garla',
-                    'socheko thiyo', 'pehilo palo', 'pahilo palo',
-                    'kasari contact', 'kina message', 'message kina',
-                    'pehilo din', 'pahilo din', 'raat ma message',
-                    'eklo thiye', 'friday bela', 'facebook bata'
-                ],
-                'categories': ['first_contact', 'relationship_start', 'how_we_connected'],
-                'content_matches': [
-                    'facebook', 'friday', '7pm', 'messaged', 'lonely', 'ignore',
-                    'eklo thiye', 'reply garyo', 'message gareko', 'badliyo',
-                    'socheko thiyo', 'pahilo message'
-                ],
-                'boost': 35
-            },
-
-            # ── Common friend / video call introduction ────────────────────
-            'how_connected': {
-                'keywords': [
-                    'common friend', 'mutual friend', 'video call', 'connected',
-                    'introduced', 'friend connect', 'before we talked', 'weeks before',
-                    'common saathi', 'mutual saathi', 'saathi le', 'saathi le connect',
-                    'video call garyeko', 'video call ma', 'pehile nai', 'pahile nai',
-                    'kasle milayo', 'kasle introduce', 'saathi ko madhyam',
-                    'saathi le chinauko', 'saathi ko through', 'dui hapta agadi',
-                    '2 hapta pahile', 'agaadi nai', 'pehile connect',
-                    'video ma boleko', 'video call ko agadi'
-                ],
-                'categories': ['how_we_connected', 'relationship_start'],
-                'content_matches': [
-                    'common friend', 'video call', '2 weeks', 'casual', 'connected',
-                    'common saathi', 'saathi le', 'video call maa', 'saadhaaran',
-                    'chinaaudiyeko', 'pehile'
-                ],
-                'boost': 32
-            },
-
-            # ── Number of in-person meetings ───────────────────────────────
-            'meetings': {
-                'keywords': [
-                    'met', 'meet', 'meeting', 'in person', 'times', 'saw', 'seen',
-                    'how many times', 'physically', 'face to face', 'together',
-                    'kati choti', 'kati palta', 'bheta', 'bheteko', 'bhet',
-                    'physically bheto', 'aankha dekha', 'dekha bhayo',
-                    'kati baar bheteko', 'samna', 'aamne saamne',
-                    'face dekha', 'prataksha bheteko', 'kati din bheteko',
-                    'kati palo bheteko', 'bhetna', 'bhet gare', 'bhetna gaye',
-                    'sanga bheto', 'ma bheteko', 'hami bheteko',
-                    'kati baar dekha', 'physically dekha'
-                ],
-                'categories': ['meetings'],
-                'content_matches': [
-                    '4 times', 'four times', 'only met', 'precious', 'distance',
-                    'chaar palta', 'physically', 'bheteko chhau', 'kyaaro thiyo',
-                    'kati choti', 'palta matra'
-                ],
-                'boost': 35
-            },
-
-            # ── Baby bet / Alisha ──────────────────────────────────────────
-            'bet': {
-                'keywords': [
-                    'bet', 'alisha', 'baby', 'boy', 'girl', 'won', 'win', 'wins',
-                    'argument', 'gender', 'niece', 'nephew', 'prediction', 'always wins',
-                    'shart', 'bet lagyo', 'alisha ko', 'baby ko', 'chora ki chori',
-                    'jitiyo', 'haari', 'argument jityo', 'jhagada jityo',
-                    'bhanji', 'bhanja', 'gender kasto hola', 'sahi thiyo',
-                    'galat thiyo', 'ma jite', 'usle jityo', 'usle jitchhe',
-                    'hamesha jitchhe', 'jitna man parcha', 'shart ma jitiyo',
-                    'baby chora hola', 'baby chori hola', 'kasto hola baby',
-                    'alisha janmada', 'alisha ko janma', 'chhori thiyo',
-                    'chora thiyo', 'usle sahi thiyo', 'ma galat thiyo'
-                ],
-                'categories': ['inside_jokes', 'special_moments'],
-                'content_matches': [
-                    'bet', 'alisha', 'boy', 'girl', 'won',
-                    'shart', 'chora', 'chori', 'jitiyo', 'hamesha jitchhe',
-                    'alisha ko janma', 'bhanji', 'maaya garcha'
-                ],
-                'boost': 40
-            },
-
-            # ── Gifts exchanged ────────────────────────────────────────────
-            'gifts': {
-                'keywords': [
-                    'gift', 'gave', 'give', 'given', 'earring', 'rose', 'rupees',
-                    'present', 'token', '100', 'one earring', 'flower', 'wrapped',
-                    'uphaar', 'uphar', 'dieko', 'deko', 'diyeko', 'kaan ko',
-                    'kaanmuni', 'kaanbali', 'phool', 'gulaab', 'gulab',
-                    '100 rupiya', 'note ma', 'ek kaanbali', 'kasle ke diyo',
-                    'maine ke diye', 'usle ke diye', 'ke uphaar diyo',
-                    'ke diyo malai', 'ke diyo uslai', 'ek earring',
-                    'ek matra', 'phool dieko', 'gulab dieko',
-                    'rupiya wrapped', 'note ma gulab', 'paisa maa gulab',
-                    'uphar ke thiyo', 'ke lyaeko', 'ke lyauthyo'
-                ],
-                'categories': ['gifts', 'gifts_exchanged'],
-                'content_matches': [
-                    'earring', 'rose', 'rupees', '100', 'awkward', 'wrapped',
-                    'kaanbali', 'gulab', 'rupiya', 'uphaar', 'note maa',
-                    'sambhaalera', 'wrap gareko'
-                ],
-                'boost': 35
-            },
-
-            # ── My / Her family ────────────────────────────────────────────
-            'family': {
-                'keywords': [
-                    'family', 'father', 'dad', 'mother', 'mom', 'brother', 'sister',
-                    'parents', 'mandir', 'pabitra', 'sunil', 'lokendra',
-                    'middle child', 'siblings', 'elder brother', 'younger brother',
-                    'pariwar', 'buba', 'buwa', 'aama', 'ama', 'bhai', 'daju',
-                    'didi', 'bahini', 'mandir khadka', 'pabitra khadka',
-                    'sunil dai', 'lokendra', 'maijhilo', 'majhilo chhora',
-                    'mero pariwar', 'hamro ghar', 'tero buwa', 'tero aama',
-                    'buba ko naam', 'aama ko naam', 'daju ko naam',
-                    'bhai ko naam', 'ghar ma', 'ghar ko', 'pariwar ko',
-                    'teen jana', 'teen bhai', 'majhilo', 'daju bhai'
-                ],
-                'categories': ['my_family', 'family', 'her_family'],
-                'content_matches': [
-                    'mandir', 'pabitra', 'sunil', 'lokendra', 'middle child',
-                    'buwa', 'aama', 'daju', 'bhai', 'majhilo chhora',
-                    'mandir khadka', 'pabitra khadka', 'teen jana'
-                ],
-                'boost': 35
-            },
-
-            # ── Nickname ───────────────────────────────────────────────────
-            'nickname': {
-                'keywords': [
-                    'call', 'name', 'chuchi', 'ghosu', 'nickname', 'what do you call',
-                    'pet name', 'term of endearment',
-                    'ke bhanchu', 'ke bhanera', 'naam ke ho', 'ke naam',
-                    'chuchi kina', 'ghosu kina', 'naamdhari', 'tapaai ko naam',
-                    'tero naam', 'mero naam', 'ke boli', 'ke bolchhu',
-                    'darling naam', 'pyaar ko naam', 'boli ko naam',
-                    'chuchi bhanchhau', 'ghosu bhanchhau', 'kina chuchi',
-                    'kina ghosu', 'tapaai le ke bhannu', 'usle ke bhancha'
-                ],
-                'categories': ['nickname'],
-                'content_matches': [
-                    'chuchi', 'ghosu', 'call', 'darpok',
-                    'bhanchu', 'bhancha', 'pyaar ko naam', 'arkulai thaha'
-                ],
-                'boost': 35
-            },
-
-            # ── Personality ────────────────────────────────────────────────
-            'personality': {
-                'keywords': [
-                    'scared', 'darpok', 'afraid', 'competitive', 'win', 'sensitive',
-                    'feel', 'shy', 'brave', 'personality', 'nature', 'character',
-                    'daraune', 'darauchhe', 'daraunchhe', 'darpok chhe',
-                    'darpok chha', 'dar lagcha', 'darlagcha', 'harauna man pardaina',
-                    'jitna man parcha', 'sensitive chhe', 'sensitive chha',
-                    'man ko kura', 'swabhav', 'swabhaav', 'kasto chhe',
-                    'kasto chha', 'personality kasto', 'kasri chhe',
-                    'komal chhe', 'brave chhe', 'himmat', 'sachchi chhe',
-                    'darpok thiyo', 'sensitive thiyo', 'kasto manchhe'
-                ],
-                'categories': ['personality', 'her_personality', 'my_personality', 'personality_traits'],
-                'content_matches': [
-                    'darpok', 'scared', 'competitive', 'sensitive', 'brave',
-                    'dar lagchha', 'adorable', 'surakshit', 'himmatpan',
-                    'joshilaaipan', 'komal', 'sachcho'
-                ],
-                'boost': 30
-            },
-
-            # ── Favorites ──────────────────────────────────────────────────
-            'favorites': {
-                'keywords': [
-                    'favorite', 'favourite', 'love', 'likes', 'color', 'colour',
-                    'purple', 'ice cream', 'chocolate', 'music', 'artist', 'song',
-                    'romcom', 'romantic comedy', 'movie', 'film', 'food',
-                    'man parcha', 'man pareko', 'rang', 'rang ke ho',
-                    'kasto rang', 'purple rang', 'aayskrim', 'ice cream khana',
-                    'chocolate', 'gana', 'geet', 'sangeet', 'gayak', 'gaayak',
-                    'movie hercha', 'movie man parcha', 'romantic film',
-                    'romantic movie', 'khana man parcha', 'kasto khana',
-                    'cigarettes after sex', 'indie geet', 'indie music',
-                    'favorite gana', 'favorite rang', 'favorite khana'
-                ],
-                'categories': ['favorites'],
-                'content_matches': [
-                    'purple', 'chocolate', 'cigarettes after sex', 'romcom', 'indie',
-                    'rang', 'aayskrim', 'gayak', 'geet', 'sangeet',
-                    'man paraaunchhe', 'man parcha'
-                ],
-                'boost': 25
-            },
-
-            # ── Relationship timeline / growth ─────────────────────────────
-            'relationship': {
-                'keywords': [
-                    'relationship', 'year', 'together', 'talking', 'timeline',
-                    '4 days', 'formal', 'grew', 'journey', 'how long',
-                    'since when', 'duration', 'history',
-                    'sambandha', 'rishta', 'kati din', 'kati barsadekhi',
-                    'kati samay', 'ek barsadekhi', 'ek barsha', 'yati din',
-                    'yati samay', 'kati din dekhi', 'kina bheteko',
-                    'kasari chaliyo', 'kasari badyo', 'kasari sudhriyo',
-                    'suru dekhi', 'aba samma', 'kitna time', 'kati arsa',
-                    'ek barsama', 'saal bhari', 'din gaye', 'samay gayo',
-                    'formal thiyo', 'formal thiye', 'har 4 din'
-                ],
-                'categories': [
-                    'relationship_timeline', 'relationship_growth',
-                    'relationship_dynamic', 'relationship_start'
-                ],
-                'content_matches': [
-                    'year', 'formal', '4 days', 'beautiful', 'trust',
-                    'sambandha', 'rishta', 'barsadekhi', 'har 4 din',
-                    'sunaulo', 'formal thiyo', 'ek barsama'
-                ],
-                'boost': 30
-            },
-
-            # ── Promises ──────────────────────────────────────────────────
-            'promises': {
-                'keywords': [
-                    'promise', 'promised', 'always there', 'commitment', 'vow',
-                    'swear', 'never leave', 'forever', 'always be',
-                    'vachan', 'vaada', 'vada', 'promise gareko', 'kasam',
-                    'hamesha', 'hamesha rahnchhu', 'kabhi chhordina',
-                    'satha hunchu', 'sanga rahnchhu', 'chhadna', 'chhadne chaina',
-                    'sadhai satha', 'sadhai hunchu', 'kina promise',
-                    'ke promise', 'vaada gareko', 'vachan gareko'
-                ],
-                'categories': ['promises'],
-                'content_matches': [
-                    'promised', 'always', 'deserves', 'world',
-                    'vachan', 'vaada', 'sadhai satha', 'kabhi chhordina',
-                    'hamesha usko satha', 'sachchi'
-                ],
-                'boost': 30
-            },
-
-            # ── Apologies / sorry ──────────────────────────────────────────
-            'apologies': {
-                'keywords': [
-                    'sorry', 'apology', 'apologize', 'forgive', 'forgiveness',
-                    'mistake', 'say sorry', 'always sorry',
-                    'maaf', 'maafi', 'sorry bhanchu', 'sorry bhaneko',
-                    'maaf garchhe', 'maaf garyo', 'galti', 'galti gareko',
-                    'maafi magnu', 'maafi magchhu', 'kina sorry',
-                    'sorry bhanchhau', 'sorry bhandaichu', 'maaf gardiye',
-                    'hamro sorry', 'maafi ko kura'
-                ],
-                'categories': ['apologies'],
-                'content_matches': [
-                    'sorry', 'forgives', 'thing',
-                    'maaf', 'maafi', 'galti', 'maaf gardiye',
-                    'hamro afnai kura', 'sorry bhaniranchhu'
-                ],
-                'boost': 28
-            },
-
-            # ── My identity / personal info ────────────────────────────────
-            'my_identity': {
-                'keywords': [
-                    'yamraj', 'khadka', 'your name', 'who are you', 'born',
-                    'birthday', 'scorpio', 'zodiac', 'rashi', 'monday',
-                    'december', '2001', 'middle child',
-                    'yamraj', 'tero naam', 'tapaai ko naam', 'naam ke ho',
-                    'ko ho timi', 'ko hau', 'janam', 'janma', 'birthday kab',
-                    'janma din', 'rashifal', 'rashi ke ho', 'kasto rashi',
-                    'scorpio rashi', 'december ma', 'december 15',
-                    'sombar', 'somabara', 'majhilo chhora',
-                    'tero parichay', 'tapaai ko parichay'
-                ],
-                'categories': ['my_identity', 'my_background', 'my_personality', 'my_hobbies'],
-                'content_matches': [
-                    'yamraj', 'khadka', 'december', 'scorpio', 'monday', '2001',
-                    'sombar', 'janma', 'rashi', 'majhilo chhora', 'puuro naam'
-                ],
-                'boost': 35
-            },
-
-            # ── My hobbies / interests ─────────────────────────────────────
-            'hobbies': {
-                'keywords': [
-                    'chess', 'hobby', 'hobbies', 'interest', 'passion', 'play',
-                    'game', 'introvert', 'strategy',
-                    'chess khelchhu', 'chess khelna', 'daam', 'satranj',
-                    'man laagchha', 'ruchhi', 'khelna man parcha',
-                    'chess man parcha', 'introvert', 'eklo basna', 'khel',
-                    'khelkud', 'strategy khelna', 'dimag ko khel',
-                    'tero hobby', 'ke man parcha', 'ke khelchhu',
-                    'introvert hau', 'introvert ho'
-                ],
-                'categories': ['my_hobbies'],
-                'content_matches': [
-                    'chess', 'passion', 'strategy', 'introvert',
-                    'satranj', 'ruchhi', 'khelna', 'dimag', 'ghantau ghanta'
-                ],
-                'boost': 30
-            },
-
-            # ── Education / background / location ─────────────────────────
-            'education': {
-                'keywords': [
-                    'study', 'studying', 'engineer', 'engineering', 'computer',
-                    'degree', 'college', 'university', 'final year', 'graduate',
-                    'undergraduate', 'baijanath', 'banke',
-                    'padhna', 'padhchhu', 'padhai', 'computer engineering',
-                    'engineering padhchhu', 'final year ma', 'degree',
-                    'college ma', 'university ma', 'padhera', 'padheko',
-                    'baijanath', 'banke', 'ghar kaha', 'kaha baschhau',
-                    'kaha padhchhu', 'ke padhchhu', 'tero padhai'
-                ],
-                'categories': ['my_background', 'my_identity', 'dreams', 'location'],
-                'content_matches': [
-                    'computer engineering', 'final year', 'baijanath', 'banke', 'degree',
-                    'padhdaichhu', 'lagbhag degree', 'kaha baschhau', 'thaau'
-                ],
-                'boost': 30
-            },
-
-            # ── Her family ─────────────────────────────────────────────────
-            'her_family': {
-                'keywords': [
-                    'her family', 'her brother', 'her sister', 'alisha',
-                    'niece', 'nephew', 'her parents', 'her siblings',
-                    'usko pariwar', 'uski pariwar', 'usko daju', 'usko bhai',
-                    'usko didi', 'usko bahini', 'alisha', 'bhanji',
-                    'ushni pariwar', 'uski ghar', 'ushni daju',
-                    'ushni bhai', 'ushni didi', 'ushni aama', 'ushni buwa',
-                    'girlfriend ko pariwar', 'uski niece', 'baby alisha'
-                ],
-                'categories': ['her_family'],
-                'content_matches': [
-                    'alisha', 'elder brothers', 'elder sister', '3-month',
-                    'bhanji', 'usko daju', 'usko didi', 'daju ra didi',
-                    'mahina ko chhori'
-                ],
-                'boost': 33
-            },
-
-            # ── Dreams / future ────────────────────────────────────────────
-            'dreams': {
-                'keywords': [
-                    'dream', 'future', 'graduate', 'together forever', 'someday',
-                    'hope', 'wish', 'plan', 'goal', 'aspire',
-                    'sapana', 'sapna', 'bhabishya', 'bhavishya', 'aune din',
-                    'ek din', 'sanga basna', 'sanga rahna',
-                    'future ma', 'aagadi', 'life ma', 'sath ma basna',
-                    'sapana ke ho', 'sapna ke ho', 'graduate bhayepachi',
-                    'degree sakiepachi', 'aune din sath', 'hamesha sath'
-                ],
-                'categories': ['dreams'],
-                'content_matches': [
-                    'graduate', 'future', 'dream', 'together', 'someday',
-                    'sapana', 'bhavishya', 'degree sakiyo', 'gannu paraina',
-                    'sanga basnu', 'saadhaaran jeevan'
-                ],
-                'boost': 28
-            },
-
-            # ── Special moments / dates ────────────────────────────────────
-            'special_moments': {
-                'keywords': [
-                    'date', 'restaurant', 'stargazing', 'night', 'stars',
-                    'orion', 'special', 'moment', 'memory', 'remember',
-                    'khana khaeko', 'restaurant gako', 'tara hereko',
-                    'raat ma baseko', 'tara ko kura', 'orion belt',
-                    'bistaar kura gareko', 'yaad chha', 'yaad cha',
-                    'bisesh din', 'bisesh pal', 'bistaar boli',
-                    'tara hereko bela', 'raat bistaar', 'din yaad cha'
-                ],
-                'categories': ['special_moments'],
-                'content_matches': [
-                    'restaurant', 'stargazing', 'orion', 'dreams', 'talked',
-                    'tara hereko', 'bistaar kura', 'yaad chha', 'khana khaeko',
-                    'raat bistaar'
-                ],
-                'boost': 28
-            },
-
-            # ── Inside jokes ───────────────────────────────────────────────
-            'inside_jokes': {
-                'keywords': [
-                    'joke', 'funny', 'pineapple', 'pizza', 'laugh', 'tease',
-                    'inside joke', 'argue',
-                    'joke', 'hanso', 'hansaune', 'pineapple pizza',
-                    'pizza ko kura', 'pizza ma pineapple', 'hasamkhel',
-                    'chidhaaune', 'taunt', 'haasikhushi', 'ramilo kura',
-                    'haami ko joke', 'ramro joke', 'jhagada ko kura',
-                    'argue gareko', 'tarkibadi', 'kura gareko'
-                ],
-                'categories': ['inside_jokes'],
-                'content_matches': [
-                    'pineapple', 'pizza', 'team yes', 'team no',
-                    'hasamkhel', 'argue gareko', 'pizza maa pineapple',
-                    'hansaune'
-                ],
-                'boost': 25
-            },
-        }
+        if self.store.queryable:
+            return self._store_search(query_lower, triggers, k, min_score, dates)
 
         # ══════════════════════════════════════════════════════════════════
         # SCORING ENGINE
         # ══════════════════════════════════════════════════════════════════
-        scored_memories = []
-        for memory in self.memories:
-            content = memory.get('content', '').lower()
-            category = memory.get('category', '').lower()
-
-            score = 0
-
-            # Direct word matching (base score)
-            for word in query_lower.split():
-                if len(word) > 2:
-                    if word in content:
-                        score += 3
-
-            # Check each keyword group
-            for group_name, group_info in keyword_groups.items():
-                has_keyword = any(kw in query_lower for kw in group_info['keywords'])
-
-                if has_keyword:
-                    # Category match boost
-                    if category in group_info['categories']:
-                        score += group_info['boost']
-
-                    # Content match boost
-                    content_matches = sum(
-                        1 for cm in group_info['content_matches'] if cm in content
-                    )
-                    score += content_matches * 15
+        match_scores = state.keyword.match_scores(query_lower, triggers.groups)
+        best = heapq.nsmallest(k, self._score_stream(state, match_scores, k, min_score, within))
+        return [state.memories[entry[-1]] for entry in best]
+
+    @staticmethod
+    def _score_stream(state: MemoryState, match_scores: Dict[int, float], k: int,
+                      min_score: Optional[float], within: Optional[List[int]] = None):
+        """
+        Yield a (-score, -importance, id, position) ranking key for every
+        memory that can make the top k
 
+        Only memories found through the keyword index carry a match score;
+        every other memory scores importance * 0.5, so the best k of them
+        are read straight off the index's (importance, id) order. With
+        `within` (a date range) just those positions are scored.
+        """
+        memories = state.memories
+        floor = 0 if min_score is None else min_score
+        if within is not None:
+            for pos in within:
+                importance = memories.importance_at(pos, 5)
+                score = match_scores.get(pos, 0) + importance * 0.5
+                if score > 0 and score >= floor:
+                    yield (-score, -importance, memories.id_key_at(pos), pos)
+            return
+
+        for pos, score in match_scores.items():
             # Importance boost
-            importance = memory.get('importance', 5)
+            importance = memories.importance_at(pos, 5)
             score += importance * 0.5
+            if score > 0 and score >= floor:
+                yield (-score, -importance, memories.id_key_at(pos), pos)
+
+        # Memories without any match only carry their importance boost
+        for neg_importance, id_key, pos in state.keyword.top_by_importance(k, exclude=match_scores.keys()):
+            score = -neg_importance * 0.5
+            if score <= 0 or score < floor:
+                break
+            yield (-score, neg_importance, id_key, pos)
+
+    def _store_search(self, query_lower: str, triggers: TriggerMatch, k: int,
+                      min_score: Optional[float] = None, dates: Optional[tuple] = None) -> List[Dict]:
+        """
+        Keyword search on a queryable store: the store's indexes narrow the
+        corpus to memories that can match, which are then scored exactly
+        like the in-memory path.
+        """
+        words = [word for word in query_lower.split() if len(word) > 2]
+        phrases, categories = [], []
+        for group_name in triggers.groups:
+            phrases.extend(KEYWORD_GROUPS[group_name]['content_matches'])
+            categories.extend(KEYWORD_GROUPS[group_name]['categories'])
+
+        candidates = self.store.search_candidates(words + phrases, categories, dates)
+        index = self._scratch_index()
+        index.build(candidates.values())
+        match_scores = index.match_scores(query_lower, triggers.groups)
+        floor = 0 if min_score is None else min_score
+
+        def scored():
+            for i, (pos, memory) in enumerate(candidates.items()):
+                # Importance boost
+                importance = memory.get('importance', 5)
+                score = match_scores.get(i, 0) + importance * 0.5
+                if score > 0 and score >= floor:
+                    yield (-score, -importance, id_sort_key(memory.get('id')), pos, memory)
 
-            if score > 0:
-                scored_memories.append((score, memory))
+            # Memories without any match only carry their importance boost
+            for pos, memory in self.store.top_by_importance(k, exclude=candidates, dates=dates):
+                importance = memory.get('importance', 5)
+                score = importance * 0.5
+                if score <= 0 or score < floor:
+                    break
+                yield (-score, -importance, id_sort_key(memory.get('id')), pos, memory)
 
-        scored_memories.sort(key=lambda x: x[0], reverse=True)
-        return [m[1] for m in scored_memories[:k]]
+        return [entry[-1] for entry in heapq.nsmallest(k, scored())]
+
+    def _scratch_index(self) -> KeywordIndex:
+        """This thread's KeywordIndex for scoring store search candidates"""
+        index = getattr(self._scratch, 'index', None)
+        if index is None:
+            index = self._scratch.index = KeywordIndex(KEYWORD_GROUPS, KEYWORD_GROUPS_FINGERPRINT)
+        return index
 
     # ══════════════════════════════════════════════════════════════════════
     # UTILITY METHODS
@@ -562,49 +1449,397 @@ class MemoryAgent:
 
     def get_memory_by_category(self, category: str) -> List[Dict]:
         """Get all memories of a specific category"""
-        return [m for m in self.memories if m.get('category') == category]
+        self._check_memory_file()
+        if self.store.queryable:
+            return self.store.by_category(category)
+        state = self._state
+        return [state.memories[pos] for pos in state.secondary.category_positions(category)]
 
     def get_recent_memories(self, n: int = 5) -> List[Dict]:
         """Get most recent memories"""
-        return sorted(self.memories, key=lambda x: x.get('date', ''), reverse=True)[:n]
+        self._check_memory_file()
+        if self.store.queryable:
+            return self.store.recent(n)
+        state = self._state
+        return [state.memories[pos] for pos in state.secondary.recent_positions(n)]
+
+    def get_memories_between(self, date_from=None, date_to=None) -> List[Dict]:
+        """
+        Timeline of the memories dated date_from..date_to (inclusive; date
+        or 'YYYY-MM-DD', None: open), oldest first
+        """
+        self._check_memory_file()
+        dates = _iso_date(date_from), _iso_date(date_to)
+        if self.store.queryable:
+            return self.store.between(*dates)
+        state = self._state
+        return [state.memories[pos] for pos in state.secondary.date_range_positions(*dates)]
 
     def get_important_memories(self, threshold: int = 7) -> List[Dict]:
         """Get memories above importance threshold"""
-        return [m for m in self.memories if m.get('importance', 0) >= threshold]
-
-    def add_memory(self, content: str, category: str, importance: int = 5):
-        """Add a new memory"""
-        new_memory = {
-            'id': len(self.memories) + 1,
-            'category': category,
-            'content': content,
-            'date': datetime.now().strftime('%Y-%m-%d'),
-            'importance': importance
-        }
-        self.memories.append(new_memory)
-        self._save_memories()
+        self._check_memory_file()
+        if self.store.queryable:
+            return self.store.important(threshold)
+        state = self._state
+        return [state.memories[pos] for pos in state.secondary.important_positions(threshold)]
+
+    def add_memory(self, content: str, category: str, importance: int = 5) -> Dict:
+        """
+        Add a new memory
+
+        The write goes to a fork of the published state, which replaces it
+        in one assignment: concurrent readers see the corpus either without
+        or with the whole memory, never in between.
+
+        Returns:
+            The stored memory, or the existing one it near-duplicates when
+            near_duplicates='skip'
+        """
+        self._loaded.wait()
+        with self._write_lock:
+            state = self._state
+            new_memory = {
+                'id': self.store.allocate_id(),
+                'category': category,
+                'content': content,
+                'date': datetime.now().strftime('%Y-%m-%d'),
+                'importance': importance
+            }
+            if self.store.queryable:
+                state = state._replace(version=state.version + 1)
+            else:
+                text = memory_text(new_memory)
+                if state.near_dups is not None:
+                    table = state.memories
+                    duplicate = self._find_near_duplicate(
+                        state.near_dups, shingles(text.text), lambda pos: shingles(table.text_at(pos).text))
+                    if duplicate is not None:
+                        original = table[duplicate]
+                        if self.near_duplicates == 'skip':
+                            print(f"⚠️  Skipping near-duplicate of memory {original.get('id')}")
+                            return original
+                        new_memory['duplicate_of'] = original.get('id')
+                state = state.fork()
+                state.memories.append(new_memory, text)
+                self._index_memory(state, new_memory, text)
+
+            try:
+                self.store.append(new_memory)
+            except Exception as e:
+                print(f"❌ Error storing memory: {e}")
+            self._state = state
+            if self.store.should_compact():
+                self._save_memories()
+            return new_memory
+
+    def get_memory(self, memory_id) -> Optional[Dict]:
+        """The memory with this id, or None (an index lookup, not a scan)"""
+        self._check_memory_file()
+        if self.store.queryable:
+            return self.store.get(memory_id)
+        state = self._state
+        pos = state.ids.get(memory_id)
+        return state.memories[pos] if pos is not None else None
+
+    def update_memory(self, memory_id, content: Optional[str] = None, category: Optional[str] = None,
+                      importance: Optional[int] = None) -> Dict:
+        """
+        Change a memory in place
+
+        Only the given fields change. The memory keeps its id and position,
+        and only its own entries in the indexes are replaced; the new
+        version is published in one assignment, like add_memory().
+
+        Returns:
+            The updated memory
+
+        Raises:
+            KeyError: No memory has this id
+        """
+        changes = {key: value for key, value in
+                   (('content', content), ('category', category), ('importance', importance))
+                   if value is not None}
+        self._loaded.wait()
+        with self._write_lock:
+            state = self._state
+            if self.store.queryable:
+                memory = self.store.get(memory_id)
+                if memory is None:
+                    raise KeyError(f"No memory with id {memory_id!r}")
+                memory.update(changes)
+                self.store.update(memory)
+                self._state = state._replace(version=state.version + 1)
+                return memory
+
+            pos = state.ids.get(memory_id)
+            if pos is None:
+                raise KeyError(f"No memory with id {memory_id!r}")
+            memory = {**state.memories[pos], **changes}
+            if not changes:
+                return memory
+            state = state.fork()
+            self._reindex_memory(state, pos, memory)
+            self._compile_indexes(state)
+
+            try:
+                self.store.update(memory)
+            except Exception as e:
+                print(f"❌ Error storing memory update: {e}")
+            self._state = state
+            if self.store.should_compact():
+                self._save_memories()
+            return memory
+
+    def delete_memory(self, memory_id) -> Dict:
+        """
+        Delete a memory
+
+        Its slot is tombstoned and its index entries removed, so no other
+        memory moves; once tombstones fill half the table, the live
+        memories are re-packed. Its id is never reused.
+
+        Returns:
+            The deleted memory
+
+        Raises:
+            KeyError: No memory has this id
+        """
+        self._loaded.wait()
+        with self._write_lock:
+            state = self._state
+            if self.store.queryable:
+                memory = self.store.get(memory_id)
+                if memory is None:
+                    raise KeyError(f"No memory with id {memory_id!r}")
+                self.store.delete(memory_id)
+                self._state = state._replace(version=state.version + 1)
+                return memory
+
+            pos = state.ids.get(memory_id)
+            if pos is None:
+                raise KeyError(f"No memory with id {memory_id!r}")
+            memory = dict(state.memories[pos])
+            state = state.fork()
+            self._unindex_memory(state, pos)
+
+            try:
+                self.store.delete(memory_id)
+            except Exception as e:
+                print(f"❌ Error storing memory deletion: {e}")
+            if len(state.memories.removed) * 2 > len(state.memories):
+                state = self._repack(state)
+            else:
+                self._compile_indexes(state)
+            self._state = state
+            if self.store.should_compact():
+                self._save_memories()
+            return memory
+
+    def _find_near_duplicate(self, index: MinHashLSH, memory_shingles, shingles_at) -> Optional[int]:
+        """
+        Position of the most similar near-duplicate, or None
+
+        Args:
+            index: LSH index that proposes candidate positions
+            memory_shingles: Word shingles of the new memory
+            shingles_at: Shingles of the memory at a candidate position
+        """
+        best, best_similarity = None, 0.0
+        for pos in index.candidates(memory_shingles).tolist():
+            similarity = jaccard(memory_shingles, shingles_at(pos))
+            if similarity >= self.near_duplicate_threshold and similarity > best_similarity:
+                best, best_similarity = pos, similarity
+        return best
+
+    def _unindex_memory(self, state: MemoryState, pos: int):
+        """Remove one memory from a forked state's table and indexes"""
+        memory = state.memories[pos]
+        state.memories.remove(pos)
+        state.ids.remove(memory, pos)
+        state.secondary.remove(memory, pos)
+        state.identity.remove(memory, pos)
+        if state.keyword is not None:
+            state.keyword.remove(memory, state.memories.text_at(pos), pos)
+        if state.bm25 is not None:
+            state.bm25.remove(pos)
+        if state.vectors is not None:
+            state.vectors.remove(pos)
+        if state.near_dups is not None:
+            state.near_dups.remove(pos)
+
+    def _reindex_memory(self, state: MemoryState, pos: int, memory: Dict):
+        """Swap in a new version of one memory in a forked state, at the same position"""
+        old = state.memories[pos]
+        text = memory_text(memory)
+        state.memories.replace(pos, memory, text)
+        state.ids.remove(old, pos)
+        state.ids.add(memory, pos)
+        state.secondary.remove(old, pos)
+        state.secondary.add(memory, pos)
+        state.identity.remove(old, pos)
+        state.identity.add(memory, pos)
+        if state.keyword is not None:
+            state.keyword.remove(old, old.text, pos)
+            state.keyword.add(memory, text, pos)
+        if state.bm25 is not None:
+            state.bm25.replace(pos, memory)
+        if state.vectors is not None:
+            vector = self._embedder.embed_memory(memory)
+            state.vectors.replace(pos, vector)
+            if state.ann is not None:
+                state.ann.add(pos, vector)
+        if state.near_dups is not None:
+            # The old version's band keys stay; candidates are checked against the new text
+            state.near_dups.add(pos, shingles(text.text))
+
+    def _index_memory(self, state: MemoryState, memory: Dict, text: MemoryText):
+        """Add one memory to a forked state's secondary and retrieval indexes"""
+        pos = len(state.memories) - 1
+        state.ids.add(memory, pos)
+        state.secondary.add(memory, pos)
+        state.identity.add(memory, pos)
+        if state.keyword is not None:
+            state.keyword.add(memory, text)
+        if state.bm25 is not None:
+            state.bm25.add(memory)
+            state.bm25.compile()
+        if state.vectors is not None:
+            vector = self._embedder.embed_memory(memory)
+            state.vectors.add(vector)
+            if state.ann is not None:
+                state.ann.add(pos, vector)
+                state.ann.maintain(state.vectors)
+        if state.near_dups is not None:
+            state.near_dups.add(pos, shingles(text.text))
+
+    def import_memories(self, records: Iterable, progress_every: int = 50_000) -> Dict:
+        """
+        Bulk-add memories (e.g. a chat export streamed by read_records)
+
+        Records are validated and deduplicated by content against the
+        corpus and each other, then get consecutive new ids. Near-duplicates
+        are flagged or skipped as in add_memory(). Instead of one
+        journal write and index update per memory, the corpus is saved
+        once, every index is rebuilt in a single pass and the snapshot is
+        written once at the end.
+
+        Args:
+            records: Raw memory dicts; ids in them are ignored
+            progress_every: Print progress after this many records (0: never)
+
+        Returns:
+            Counts of read / added / duplicate / near-duplicate / invalid
+            records, the first and last new id, and the elapsed time and
+            throughput
+        """
+        self._loaded.wait()
+        started = time.perf_counter()
+        with self._write_lock:
+            state = self._state
+            existing = state.memories
+            if self.store.queryable:
+                # The store's indexed content_key answers for stored memories
+                seen = set()
+                stored = self.store.has_content
+            else:
+                seen = {dedupe_key(existing.text_at(pos).text) for pos in range(len(existing))
+                        if pos not in existing.removed}
+                stored = None
+            # Peek at the next id; the block is reserved once the count is known
+            next_id = self.store.allocate_id(0)
+
+            report = {'read': 0, 'added': 0, 'duplicates': 0, 'near_duplicates': 0, 'invalid': 0,
+                      'first_id': next_id, 'last_id': next_id - 1}
+            added = []
+
+            # Candidates at or past len(existing) are records added by this import
+            near_dups = state.near_dups.fork() if state.near_dups is not None else None
+            n = len(existing)
+
+            def shingles_at(pos: int):
+                return shingles(existing.text_at(pos).text if pos < n else added[pos - n]['content'])
+
+            for record in records:
+                report['read'] += 1
+                try:
+                    memory = validate_record(record)
+                except ValueError as e:
+                    report['invalid'] += 1
+                    if report['invalid'] <= 5:
+                        print(f"⚠️  Skipping record {report['read']}: {e}")
+                    continue
+                key = dedupe_key(memory['content'])
+                if key in seen or (stored is not None and stored(key)):
+                    report['duplicates'] += 1
+                    continue
+                seen.add(key)
+                if near_dups is not None:
+                    memory_shingles = shingles(memory['content'])
+                    duplicate = self._find_near_duplicate(near_dups, memory_shingles, shingles_at)
+                    if duplicate is not None:
+                        report['near_duplicates'] += 1
+                        if self.near_duplicates == 'skip':
+                            continue
+                        memory['duplicate_of'] = (existing[duplicate] if duplicate < n
+                                                  else added[duplicate - n]).get('id')
+                    near_dups.add(n + len(added), memory_shingles)
+                added.append({'id': next_id + len(added), **memory})
+                if progress_every and report['read'] % progress_every == 0:
+                    elapsed = time.perf_counter() - started
+                    print(f"📥 {report['read']:,} records read, {len(added):,} new "
+                          f"({report['read'] / elapsed:,.0f} records/s)")
+
+            if added:
+                self.store.allocate_id(len(added))
+                report['added'] = len(added)
+                report['last_id'] = next_id + len(added) - 1
+                if self.store.queryable:
+                    self.store.import_memories(added)
+                    self._state = state._replace(version=state.version + 1)
+                else:
+                    memories = list(existing.live()) + added
+                    self.store.save(memories)
+                    self._file_stat = self._memory_file_stat()
+                    self._state = self._build_state(self._new_state(state.version + 1), memories)
+
+        report['seconds'] = round(time.perf_counter() - started, 3)
+        report['per_second'] = round(report['read'] / report['seconds']) if report['seconds'] else 0
+        print(f"✅ Imported {report['added']:,} of {report['read']:,} records "
+              f"({report['duplicates']:,} duplicates, {report['near_duplicates']:,} near-duplicates, "
+              f"{report['invalid']:,} invalid) "
+              f"in {report['seconds']:.1f}s")
+        return report
 
     def _save_memories(self):
-        """Save memories to JSON file"""
-        try:
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                json.dump({'memories': self.memories}, f, indent=2, ensure_ascii=False)
-            print("✅ Memories saved")
-        except Exception as e:
-            print(f"❌ Error saving memories: {e}")
+        """Persist the full corpus (JSON store: compact the journal)"""
+        if self.store.queryable:
+            return  # Every write already went straight to the store
+        self._loaded.wait()
+        with self._write_lock:
+            state = self._state
+            try:
+                self.store.save(list(state.memories.live()))
+                self._file_stat = self._memory_file_stat()
+                print("✅ Memories saved")
+            except Exception as e:
+                print(f"❌ Error saving memories: {e}")
+                return
+            if self._snapshot is not None:
+                self._save_snapshot(state)
+
+    def nbytes(self) -> int:
+        """Approximate resident size of the loaded corpus and indexes"""
+        return self._state.nbytes()
 
     def get_stats(self) -> Dict:
-        """Get memory statistics"""
-        categories = {}
-        for memory in self.memories:
-            cat = memory.get('category', 'unknown')
-            categories[cat] = categories.get(cat, 0) + 1
-        return {
-            'total_memories': len(self.memories),
-            'categories': categories,
-            'oldest_memory': min((m.get('date', '') for m in self.memories), default='N/A'),
-            'newest_memory': max((m.get('date', '') for m in self.memories), default='N/A')
-        }
+        """Get memory statistics (plus query cache counters)"""
+        self._check_memory_file()
+        if self.store.queryable:
+            stats = self.store.stats()
+        else:
+            stats = self._state.secondary.stats()
+        stats['cache'] = self._cache.stats()
+        return stats
 
 
 if __name__ == "__main__":
@@ -3,11 +3,44 @@ Enhanced Romantic Response Agent
 Now checks memories FIRST, then generates LLM response if no relevant memory found
 """
 
+from functools import lru_cache
 from typing import Dict, List, Optional
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage
 import json
 
+from memory.text_features import text_of
+
+
+@lru_cache(maxsize=256)
+def render_memory_prompt(category, content, importance) -> str:
+    """
+    Memory-first instruction block for one relevant memory.
+    Cached: the same few memories (identity questions especially) come up
+    again and again, so each is formatted once.
+    """
+    return f"""
+⚠️ CRITICAL INSTRUCTION - MEMORY-BASED RESPONSE REQUIRED:
+
+A RELEVANT MEMORY was found that DIRECTLY answers her question:
+
+Category: {category}
+Content: {content}
+Importance: {importance}/10
+
+YOUR TASK:
+1. Use the EXACT content from this memory as your PRIMARY response
+2. DO NOT make up new information
+3. Reference the memory content naturally in Romanized Nepali/English
+4. Add emotional depth but STAY TRUE to the memory
+5. Keep it 2-4 sentences
+
+EXAMPLE FORMAT:
+"Chuchi, [memory content in your own words]. Tyo din ko yaad aauxha malai... 💕"
+
+Remember: The memory IS the answer. Don't deviate from it.
+"""
+
 class RomanticAgent:
     def __init__(self, personality_config: Dict, llm=None):
         self.personality_config = personality_config
@@ -79,10 +112,11 @@ Write your response now:"""),
             'apologies': ['sorry', 'apologize', 'forgive', 'my bad']
         }
         
+        message_words = set(message_lower.split())
+        
         # Check each memory for relevance
         for memory in memories:
             category = memory.get('category', '')
-            content = memory.get('content', '').lower()
             
             # Check if message keywords match this memory's category
             if category in relevance_keywords:
@@ -91,10 +125,9 @@ Write your response now:"""),
                     return memory
                     
             # Also check if any memory content words appear in the message
-            # (for more flexible matching)
-            content_words = set(content.split())
-            message_words = set(message_lower.split())
-            overlap = content_words & message_words
+            # (for more flexible matching; token sets are precomputed
+            # by MemoryAgent)
+            overlap = text_of(memory).tokens & message_words
             if len(overlap) >= 2:  # At least 2 words match
                 return memory
         
@@ -121,27 +154,11 @@ Write your response now:"""),
         # Step 2: Prepare LLM input with memory-first logic
         if relevant_memory:
             # MEMORY FOUND - Make LLM use it directly
-            memory_text = f"""
-⚠️ CRITICAL INSTRUCTION - MEMORY-BASED RESPONSE REQUIRED:
-
-A RELEVANT MEMORY was found that DIRECTLY answers her question:
-
-Category: {relevant_memory.get('category')}
-Content: {relevant_memory.get('content')}
-Importance: {relevant_memory.get('importance')}/10
-
-YOUR TASK:
-1. Use the EXACT content from this memory as your PRIMARY response
-2. DO NOT make up new information
-3. Reference the memory content naturally in Romanized Nepali/English
-4. Add emotional depth but STAY TRUE to the memory
-5. Keep it 2-4 sentences
-
-EXAMPLE FORMAT:
-"Chuchi, [memory content in your own words]. Tyo din ko yaad aauxha malai... 💕"
-
-Remember: The memory IS the answer. Don't deviate from it.
-"""
+            memory_text = render_memory_prompt(
+                relevant_memory.get('category'),
+                relevant_memory.get('content'),
+                relevant_memory.get('importance')
+            )
             print(f"✅ Using relevant memory: {relevant_memory.get('category')}")
             print(f"   Content: {relevant_memory.get('content')[:60]}...")
         else:
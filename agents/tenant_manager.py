@@ -0,0 +1,208 @@
+"""
+Tenant Memory Manager
+One deployment, many couples: every tenant has its own memory file and
+MemoryAgent. Agents load lazily on a tenant's first request, and the
+least recently used ones are evicted once the resident corpora exceed a
+memory budget.
+"""
+
+import os
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from agents.memory_agent import MemoryAgent, NUMPY_AVAILABLE
+
+
+DEFAULT_TENANT = 'default'
+
+# Tenant ids become directory names
+TENANT_ID_PATTERN = re.compile(r'[A-Za-z0-9][A-Za-z0-9_.-]{0,63}')
+
+
+class TenantMemoryManager:
+    """
+    Lazily loaded, LRU-evicted MemoryAgent per tenant
+
+    The default tenant uses memory/memories.json. Every other tenant uses
+    <root>/<tenant_id>/memories.json, with its journal and snapshot next
+    to it.
+
+    Only agents held by the manager count against the budget. Agents are
+    opened through one process-wide registry keyed by memory file, shared
+    by every manager: an evicted agent that a caller still holds, or one
+    another manager opened, is handed out instead of a second agent, so a
+    journal never has two live agents writing it.
+    """
+
+    _shared_manager: Optional["TenantMemoryManager"] = None
+    _shared_lock = threading.Lock()
+
+    # Process-wide: absolute memory file -> its live agent, and per-file open locks
+    _open_agents: "weakref.WeakValueDictionary[str, MemoryAgent]" = weakref.WeakValueDictionary()
+    _opening: Dict[str, threading.Lock] = {}
+
+    def __init__(self, root: str = "memory/tenants", budget_bytes: int = 256 * 2 ** 20,
+                 default_memory_file: str = "memory/memories.json", **agent_kwargs):
+        """
+        Args:
+            root: Directory holding one sub-directory per tenant
+            budget_bytes: Evict idle tenants once resident agents are
+                          estimated to use more than this
+            default_memory_file: Memory file of DEFAULT_TENANT
+            **agent_kwargs: Passed to every MemoryAgent (engine, ...)
+        """
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self.default_memory_file = default_memory_file
+        self.agent_kwargs = agent_kwargs
+        # tenant -> [agent, version when measured, estimated bytes], LRU first
+        self._resident: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    @classmethod
+    def shared(cls) -> "TenantMemoryManager":
+        """Process-wide manager with the default settings"""
+        with cls._shared_lock:
+            if cls._shared_manager is None:
+                cls._shared_manager = cls()
+            return cls._shared_manager
+
+    def memory_file(self, tenant_id: str) -> str:
+        """Path of a tenant's memories.json"""
+        if tenant_id == DEFAULT_TENANT:
+            return self.default_memory_file
+        if not isinstance(tenant_id, str) or not TENANT_ID_PATTERN.fullmatch(tenant_id):
+            raise ValueError(f"Invalid tenant id: {tenant_id!r}")
+        return os.path.join(self.root, tenant_id, 'memories.json')
+
+    # ══════════════════════════════════════════════════════════════════════
+    # LOOKUP
+    # ══════════════════════════════════════════════════════════════════════
+
+    def get(self, tenant_id: str = DEFAULT_TENANT) -> MemoryAgent:
+        """
+        The tenant's agent, loading it on first use
+
+        Loads of different tenants run in parallel; concurrent first
+        requests for one memory file, from any manager, share one agent.
+        Nothing is created on disk: tenants other than DEFAULT_TENANT must
+        have been set up with create().
+
+        Raises:
+            KeyError: The tenant has no directory under root
+            ValueError: The memory file is already open with another engine
+        """
+        memory_file = self.memory_file(tenant_id)
+        with self._lock:
+            agent = self._touch(tenant_id)
+            if agent is not None:
+                return agent
+
+        if tenant_id != DEFAULT_TENANT and not os.path.isdir(os.path.dirname(memory_file)):
+            raise KeyError(f"Unknown tenant: {tenant_id!r}")
+        agent, loaded = self._open(memory_file)
+        with self._lock:
+            if tenant_id in self._resident:
+                return self._touch(tenant_id)
+            if loaded:
+                self.loads += 1
+            else:
+                self.hits += 1  # Evicted but still held by a caller, or opened elsewhere
+            self._resident[tenant_id] = [agent, agent.version, agent.nbytes()]
+            self.resident_bytes += self._resident[tenant_id][2]
+            self._evict_over_budget()
+        return agent
+
+    def create(self, tenant_id: str) -> MemoryAgent:
+        """Set up a tenant's directory if it is new, and return its agent"""
+        directory = os.path.dirname(self.memory_file(tenant_id))
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return self.get(tenant_id)
+
+    def _open(self, memory_file: str) -> Tuple[MemoryAgent, bool]:
+        """(agent, newly loaded) for a memory file, via the process-wide registry"""
+        key = os.path.abspath(memory_file)
+        cls = TenantMemoryManager
+        with cls._shared_lock:
+            open_lock = cls._opening.setdefault(key, threading.Lock())
+        with open_lock:
+            agent = cls._open_agents.get(key)
+            loaded = agent is None
+            if loaded:
+                agent = MemoryAgent(memory_file, **self.agent_kwargs)
+                cls._open_agents[key] = agent
+            else:
+                engine = self.agent_kwargs.get('engine', 'keyword')
+                if self.agent_kwargs.get('use_vector'):
+                    engine = 'vector'
+                # Without numpy every agent falls back to the keyword engine
+                if agent.engine != engine and NUMPY_AVAILABLE:
+                    raise ValueError(f"{memory_file} is already open with the {agent.engine} engine")
+            with cls._shared_lock:
+                cls._opening.pop(key, None)
+        return agent, loaded
+
+    def _touch(self, tenant_id: str) -> Optional[MemoryAgent]:
+        """Resident agent marked most recently used (re-measured after writes)"""
+        entry = self._resident.get(tenant_id)
+        if entry is None:
+            return None
+        self._resident.move_to_end(tenant_id)
+        self.hits += 1
+        agent = entry[0]
+        if agent.version != entry[1]:
+            size = agent.nbytes()
+            self.resident_bytes += size - entry[2]
+            entry[1:] = [agent.version, size]
+            self._evict_over_budget()
+        return agent
+
+    # ══════════════════════════════════════════════════════════════════════
+    # EVICTION
+    # ══════════════════════════════════════════════════════════════════════
+
+    def _evict_over_budget(self):
+        # The most recently used tenant always stays, even over budget
+        while self.resident_bytes > self.budget_bytes and len(self._resident) > 1:
+            _, (_, _, size) = self._resident.popitem(last=False)
+            self.resident_bytes -= size
+            self.evictions += 1
+
+    def evict(self, tenant_id: str) -> bool:
+        """Drop a tenant's agent (reloaded on its next request)"""
+        with self._lock:
+            entry = self._resident.pop(tenant_id, None)
+            if entry is None:
+                return False
+            self.resident_bytes -= entry[2]
+            self.evictions += 1
+            return True
+
+    def __contains__(self, tenant_id: str) -> bool:
+        """True if the tenant's agent is resident"""
+        return tenant_id in self._resident
+
+    def __len__(self) -> int:
+        return len(self._resident)
+
+    def stats(self) -> Dict:
+        """Residency, budget and hit/load/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.loads
+            return {
+                'resident_tenants': len(self._resident),
+                'resident_bytes': self.resident_bytes,
+                'budget_bytes': self.budget_bytes,
+                'hits': self.hits,
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -19,7 +19,7 @@ from utils.llm_config import get_llm_instance
 
 # Import agents
 from agents.mood_detector import MoodDetector
-from agents.memory_agent import MemoryAgent
+from agents.tenant_manager import TenantMemoryManager, DEFAULT_TENANT
 from agents.romantic_agent import RomanticAgent
 from agents.surprise_agent import SurpriseAgent
 from agents.safety_agent import SafetyAgent
@@ -519,15 +519,20 @@ class HerAIApp:
                 llm = get_llm_instance(api_key)
                 st.session_state.use_llm = llm is not None
                 
+                # Couple whose memories this session uses, fixed by the server
+                # config (never by the request, which anyone can edit)
+                st.session_state.tenant_id = self._configured_tenant()
+                self.memory_agent  # Load it now; an unknown tenant fails here
+                
                 # ⭐ Initialize EnhancedLoveGraph with proactive messaging DISABLED
                 st.session_state.love_graph = EnhancedLoveGraph(
                     llm=llm,
-                    enable_proactive=False  # DISABLED to prevent token wastage
+                    enable_proactive=False,  # DISABLED to prevent token wastage
+                    tenant_id=st.session_state.tenant_id
                 )
                 
                 # Keep individual agents for backward compatibility
                 st.session_state.mood_detector = MoodDetector(llm=llm)
-                st.session_state.memory_agent = MemoryAgent()
                 st.session_state.romantic_agent = RomanticAgent(llm=llm, personality="Yamraj")
                 st.session_state.surprise_agent = SurpriseAgent(llm=llm)
                 st.session_state.safety_agent = SafetyAgent(strictness="medium")
@@ -539,6 +544,20 @@ class HerAIApp:
                 st.error(f"Error initializing HerAI: {e}")
                 st.session_state.herai_ready = False
     
+    @staticmethod
+    def _configured_tenant() -> str:
+        """Tenant from Streamlit secrets or the HERAI_TENANT env var (default tenant otherwise)"""
+        try:
+            tenant_id = st.secrets.get("HERAI_TENANT")
+        except Exception:
+            tenant_id = None
+        return tenant_id or os.getenv("HERAI_TENANT") or DEFAULT_TENANT
+
+    @property
+    def memory_agent(self):
+        """This session's tenant agent (looked up per use so idle tenants can be evicted)"""
+        return TenantMemoryManager.shared().get(st.session_state.tenant_id)
+
     def _detect_task_type(self, message: str) -> str:
         """Detect if message is asking for a specific task"""
         message_lower = message.lower()
@@ -0,0 +1,525 @@
+"""
+Memory Benchmarks - Resident size of the loaded memory corpus,
+MemoryAgent cold start with and without the binary corpus snapshot, peak
+memory of the streaming loader, hot reload of an edited memories.json,
+get/update/delete by id, date-range filtered retrieval, recall and
+latency of the retrieval engines on labeled queries, recall@k and QPS of
+the IVF nearest-neighbour index, vector engine startup with the
+persistent embedding cache, and resident memory of the tenant manager
+under many synthetic tenants
+Usage: python benchmark_memory.py [num_memories] [num_tenants]
+"""
+
+import contextlib
+import gc
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from memory.columnar import ColumnarMemories, DictMemories
+
+
+# Test queries from diagnostic.py and memory_agent.__main__, plus
+# paraphrases the keyword groups do not spell out, with the categories of
+# the memories that answer them
+HER_IDENTITY = ('her_identity', 'her_family', 'her_personality', 'personality_traits')
+LABELED_QUERIES = [
+    ("How did we first start talking?", ('first_contact',)),
+    ("who is lalita oli", HER_IDENTITY),
+    ("tell me about my girlfriend", HER_IDENTITY),
+    ("detail of my gf", HER_IDENTITY),
+    ("mero gf ko nam k ho", HER_IDENTITY),
+    ("lalita ko baare ma bata", HER_IDENTITY),
+    # Paraphrases
+    ("when did I send her the very first message", ('first_contact',)),
+    ("pahilo choti kasari message gareko", ('first_contact',)),
+    ("which restaurant was our first date at", ('special_moments',)),
+    ("what presents have we exchanged", ('gifts',)),
+    ("how many times have we seen each other in person", ('meetings',)),
+    ("what does she like to listen to", ('favorites',)),
+    ("usko man pareko rang", ('favorites',)),
+    ("how many siblings does she have", ('her_family',)),
+    ("what did I vow to her", ('promises',)),
+    ("what am I studying at university", ('my_background', 'dreams')),
+]
+
+
+def synthetic_memories(n: int, seed: int = 7) -> list:
+    """n memories shaped like memory/memories.json (content reshuffled)"""
+    with open('memory/memories.json', 'r', encoding='utf-8') as f:
+        base = json.load(f)['memories']
+    rng = random.Random(seed)
+    words = ' '.join(m['content'] for m in base).split()
+    memories = []
+    for i in range(n):
+        template = base[i % len(base)]
+        memories.append({
+            'id': i + 1,
+            'category': template['category'],
+            'content': ' '.join(rng.choices(words, k=rng.randint(8, 40))),
+            'date': f"20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'importance': rng.randint(1, 10)
+        })
+    return memories
+
+
+def traced_size(build) -> int:
+    """Bytes still allocated after build() returns (result kept alive)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def benchmark_footprint(n: int):
+    """List of dicts (json.load) vs ColumnarMemories for the same corpus"""
+    print("=" * 60)
+    print(f"CORPUS FOOTPRINT: {n:,} memories")
+    print("=" * 60)
+
+    text = json.dumps({'memories': synthetic_memories(n)}, ensure_ascii=False)
+    dict_bytes = traced_size(lambda: json.loads(text)['memories'])
+    # Same dicts carrying precomputed MemoryText, as DictMemories holds them
+    record_bytes = traced_size(lambda: DictMemories.from_memories(json.loads(text)['memories']))
+    columnar_bytes = traced_size(lambda: ColumnarMemories.from_memories(json.loads(text)['memories'], capacity=n))
+
+    table = ColumnarMemories.from_memories(json.loads(text)['memories'], capacity=n)
+    content_bytes = len(table._content)
+
+    print(f"List of dicts:     {dict_bytes / 1e6:8.1f} MB  ({dict_bytes / n:6.0f} B/memory)")
+    print(f"  + MemoryText:    {record_bytes / 1e6:8.1f} MB  ({record_bytes / n:6.0f} B/memory)")
+    print(f"Columnar:          {columnar_bytes / 1e6:8.1f} MB  ({columnar_bytes / n:6.0f} B/memory)")
+    print(f"  content table:   {content_bytes / 1e6:8.1f} MB  ({content_bytes / n:6.0f} B/memory)")
+    print(f"Reduction:         {dict_bytes / columnar_bytes:8.1f}x")
+    print(f"  excluding text:  {(dict_bytes - content_bytes) / (columnar_bytes - content_bytes):8.1f}x")
+    print(f"  vs + MemoryText: {record_bytes / columnar_bytes:8.1f}x")
+    print()
+
+
+def benchmark_cold_start(n: int, runs: int = 5):
+    """MemoryAgent construction: json.load + index build vs mapped snapshot"""
+    from agents.memory_agent import MemoryAgent
+
+    print("=" * 60)
+    print(f"AGENT COLD START: {n:,} memories")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        memory_file = os.path.join(tmp, 'memories.json')
+        with open(memory_file, 'w', encoding='utf-8') as f:
+            json.dump({'memories': synthetic_memories(n)}, f, ensure_ascii=False)
+
+        def construct(**kwargs) -> float:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                MemoryAgent(memory_file, **kwargs)
+                return time.perf_counter() - start
+
+        rebuild = construct(snapshot=False)
+        first = construct()  # Builds and writes the snapshot
+        mapped = statistics.median(construct() for _ in range(runs))
+        snapshot_bytes = os.path.getsize(os.path.join(tmp, 'memories.keyword.snapshot'))
+
+    print(f"JSON + index build:  {rebuild * 1000:10.1f} ms")
+    print(f"  + write snapshot:  {first * 1000:10.1f} ms")
+    print(f"Snapshot (median):   {mapped * 1000:10.1f} ms  ({rebuild / mapped:.0f}x faster)")
+    print(f"Snapshot file:       {snapshot_bytes / 1e6:10.1f} MB")
+    print()
+
+
+def benchmark_streaming_load(n: int):
+    """Peak memory of building from a parsed list vs the streaming loader"""
+    from agents.memory_agent import MemoryAgent
+    from memory.storage import JsonMemoryStore
+
+    print("=" * 60)
+    print(f"STREAMING LOAD: {n:,} memories")
+    print("=" * 60)
+
+    def peak(build):
+        """(peak, retained) bytes while build() runs"""
+        gc.collect()
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = build()
+        gc.collect()
+        retained, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+        return peak_bytes, retained
+
+    with tempfile.TemporaryDirectory() as tmp:
+        memory_file = os.path.join(tmp, 'memories.json')
+        with open(memory_file, 'w', encoding='utf-8') as f:
+            json.dump({'memories': synthetic_memories(n)}, f, indent=2, ensure_ascii=False)
+        file_bytes = os.path.getsize(memory_file)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent = MemoryAgent(memory_file, snapshot=False)
+        # Whole file parsed into dicts first, then indexed (the previous loader)
+        listed_peak, _ = peak(lambda: agent._build_state(agent._new_state(1), JsonMemoryStore(memory_file).load()))
+        streamed_peak, retained = peak(lambda: MemoryAgent(memory_file, snapshot=False))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            agent = MemoryAgent(memory_file, snapshot=False, background_load=True)
+            while not len(agent.memories):
+                time.sleep(0.001)
+            first_answer = time.perf_counter() - start
+            agent.retrieve_memories("kati choti bheteko", k=3)
+            agent.wait_until_loaded()
+            loaded = time.perf_counter() - start
+
+    print(f"memories.json:            {file_bytes / 1e6:8.1f} MB")
+    print(f"Final table + indexes:    {retained / 1e6:8.1f} MB")
+    print(f"Peak, parse then index:   {listed_peak / 1e6:8.1f} MB")
+    print(f"Peak, streaming:          {streamed_peak / 1e6:8.1f} MB  ({streamed_peak / retained:.2f}x final)")
+    print(f"Background: first answer {first_answer * 1000:.0f} ms, fully loaded {loaded:.1f} s")
+    print()
+
+
+def benchmark_hot_reload(n: int, edited: float = 0.01):
+    """Applying an external edit of memories.json: diff reload vs full rebuild"""
+    from agents.memory_agent import MemoryAgent
+
+    print("=" * 60)
+    print(f"HOT RELOAD: {n:,} memories, {edited:.0%} edited")
+    print("=" * 60)
+
+    rng = random.Random(5)
+    memories = synthetic_memories(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        memory_file = os.path.join(tmp, 'memories.json')
+
+        def write(records):
+            with open(memory_file, 'w', encoding='utf-8') as f:
+                json.dump({'memories': records}, f, ensure_ascii=False)
+
+        write(memories)
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent = MemoryAgent(memory_file, snapshot=False, watch_interval=None)
+
+        # A third of the edit each: removed, modified, added
+        changed = max(3, int(n * edited)) // 3
+        picked = rng.sample(range(n), 2 * changed)
+        removed, modified = set(picked[:changed]), set(picked[changed:])
+        records = [dict(m, importance=m['importance'] % 10 + 1) if i in modified else m
+                   for i, m in enumerate(memories) if i not in removed]
+        records += [dict(m, id=n + i + 1) for i, m in enumerate(synthetic_memories(changed, seed=9))]
+        write(records)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            report = agent.reload()
+            reload_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            MemoryAgent(memory_file, snapshot=False, watch_interval=None)
+            rebuild_seconds = time.perf_counter() - start
+
+        # Per-read cost of watching: a clock read, plus a stat() once per interval
+        watched = MemoryAgent.__new__(MemoryAgent)
+        watched.__dict__.update(agent.__dict__, watch_interval=2.0, _next_check=0.0)
+        calls = 200_000
+        start = time.perf_counter()
+        for _ in range(calls):
+            watched._check_memory_file()
+        check_ns = (time.perf_counter() - start) / calls * 1e9
+
+    print(f"Diff:                 +{report['added']:,} -{report['removed']:,} ~{report['modified']:,}")
+    print(f"reload():             {reload_seconds * 1000:10.1f} ms")
+    print(f"Full rebuild:         {rebuild_seconds * 1000:10.1f} ms  ({rebuild_seconds / reload_seconds:.1f}x slower)")
+    print(f"Watch check per read: {check_ns:10.0f} ns")
+    print()
+
+
+def benchmark_crud(n: int, ops: int = 200):
+    """get/update/delete_memory latency by id vs a scan of the corpus"""
+    from agents.memory_agent import MemoryAgent
+
+    print("=" * 60)
+    print(f"MEMORY CRUD: {n:,} memories, {ops} operations each")
+    print("=" * 60)
+
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        memory_file = os.path.join(tmp, 'memories.json')
+        with open(memory_file, 'w', encoding='utf-8') as f:
+            json.dump({'memories': synthetic_memories(n)}, f, ensure_ascii=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent = MemoryAgent(memory_file, snapshot=False, watch_interval=None,
+                                compact_records=10 * ops)
+        ids = rng.sample(range(1, n + 1), 2 * ops)
+
+        def per_op_ms(operation, targets) -> float:
+            start = time.perf_counter()
+            for memory_id in targets:
+                operation(memory_id)
+            return (time.perf_counter() - start) / len(targets) * 1000
+
+        get_ms = per_op_ms(agent.get_memory, ids)
+        scan_ms = per_op_ms(lambda memory_id: next(m for m in agent.memories if m['id'] == memory_id),
+                            ids[:max(1, ops // 20)])
+        with contextlib.redirect_stdout(io.StringIO()):
+            update_ms = per_op_ms(lambda memory_id: agent.update_memory(memory_id, importance=10), ids[:ops])
+            delete_ms = per_op_ms(agent.delete_memory, ids[ops:])
+            add_ms = per_op_ms(lambda i: agent.add_memory(f"benchmark memory {i}", 'misc'), range(ops))
+
+    print(f"get_memory:           {get_ms * 1000:10.1f} µs  (scan: {scan_ms:.2f} ms)")
+    print(f"update_memory:        {update_ms:10.2f} ms")
+    print(f"delete_memory:        {delete_ms:10.2f} ms")
+    print(f"add_memory:           {add_ms:10.2f} ms")
+    print()
+
+
+def benchmark_date_range(n: int, runs: int = 50):
+    """Month-long timeline and date-filtered retrieval vs scanning the corpus"""
+    from agents.memory_agent import MemoryAgent
+
+    print("=" * 60)
+    print(f"DATE RANGES: {n:,} memories, one month out of 16 years")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        memory_file = os.path.join(tmp, 'memories.json')
+        with open(memory_file, 'w', encoding='utf-8') as f:
+            json.dump({'memories': synthetic_memories(n)}, f, ensure_ascii=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent = MemoryAgent(memory_file, snapshot=False, watch_interval=None, cache_size=0)
+
+        def per_call_ms(call) -> tuple:
+            start = time.perf_counter()
+            for _ in range(runs):
+                result = call()
+            return (time.perf_counter() - start) / runs * 1000, result
+
+        timeline_ms, timeline = per_call_ms(lambda: agent.get_memories_between('2020-01-01', '2020-01-31'))
+        scan_ms, _ = per_call_ms(lambda: sorted(
+            (m for m in agent.memories if '2020-01-01' <= m['date'] <= '2020-01-31'),
+            key=lambda m: m['date']))
+        query = "gift surprise for her"
+        filtered_ms, _ = per_call_ms(lambda: agent.retrieve_memories(
+            query, 5, date_from='2020-01-01', date_to='2020-01-31'))
+        parsed_ms, _ = per_call_ms(lambda: agent.retrieve_memories(query + " in January 2020", 5))
+        full_ms, _ = per_call_ms(lambda: agent.retrieve_memories(query, 5))
+
+    print(f"Memories in range:    {len(timeline):10,}")
+    print(f"get_memories_between: {timeline_ms:10.3f} ms  (scan + sort: {scan_ms:.2f} ms)")
+    print(f"retrieve, date range: {filtered_ms:10.3f} ms  (parsed from query: {parsed_ms:.3f} ms)")
+    print(f"retrieve, no range:   {full_ms:10.3f} ms")
+    print()
+
+
+def benchmark_engines(n: int, k: int = 3):
+    """recall@k on LABELED_QUERIES (memory/memories.json) and latency on n memories, per engine"""
+    from agents.memory_agent import MemoryAgent
+
+    print("=" * 60)
+    print(f"RETRIEVAL ENGINES: recall@{k} on {len(LABELED_QUERIES)} labeled queries, "
+          f"latency on {n:,} memories")
+    print("=" * 60)
+
+    with open('memory/memories.json', 'r', encoding='utf-8') as f:
+        labeled = json.load(f)['memories']
+    relevant = [{m['id'] for m in labeled if m['category'] in categories}
+                for _, categories in LABELED_QUERIES]
+    queries = [query for query, _ in LABELED_QUERIES]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        labeled_file = os.path.join(tmp, 'labeled.json')
+        with open(labeled_file, 'w', encoding='utf-8') as f:
+            json.dump({'memories': labeled}, f, ensure_ascii=False)
+        synthetic_file = os.path.join(tmp, 'synthetic.json')
+        with open(synthetic_file, 'w', encoding='utf-8') as f:
+            json.dump({'memories': synthetic_memories(n)}, f, ensure_ascii=False)
+
+        # Defaults per engine, plus textbook RRF (equal weights, k=60) for comparison
+        configs = [(engine, engine, {}) for engine in MemoryAgent.ENGINES]
+        configs.append(('hybrid', 'rrf 1:1', {'hybrid_weights': (1.0, 1.0), 'rrf_k': 60}))
+        print(f"{'engine':<10}{'recall':>10}{'paraphrase':>12}{'p50 ms':>10}{'p99 ms':>10}")
+        for engine, label, options in configs:
+            with contextlib.redirect_stdout(io.StringIO()):
+                agent = MemoryAgent(labeled_file, engine=engine, snapshot=False, watch_interval=None,
+                                    cache_size=0, date_filter=False, **options)
+            recalls = []
+            for query, answers in zip(queries, relevant):
+                found = {m['id'] for m in agent.retrieve_memories(query, k)}
+                recalls.append(len(found & answers) / min(k, len(answers)))
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                agent = MemoryAgent(synthetic_file, engine=engine, snapshot=False, watch_interval=None,
+                                    cache_size=0, date_filter=False, **options)
+            latencies = []
+            for _ in range(5):
+                for query in queries:
+                    start = time.perf_counter()
+                    agent.retrieve_memories(query, k)
+                    latencies.append(time.perf_counter() - start)
+            latencies.sort()
+            print(f"{label:<10}{statistics.mean(recalls):>10.2f}{statistics.mean(recalls[6:]):>12.2f}"
+                  f"{latencies[len(latencies) // 2] * 1000:>10.2f}"
+                  f"{latencies[int(len(latencies) * 0.99)] * 1000:>10.2f}")
+    print()
+
+
+def benchmark_ann(n: int, k: int = 10, queries: int = 200):
+    """IVF index vs brute-force vector search: recall@k and queries per second by n_probe"""
+    from memory.ann import IVFIndex
+    from memory.embeddings import HashingEmbedder, VectorIndex
+
+    print("=" * 60)
+    print(f"ANN: {n:,} memories, recall@{k} over {queries} queries")
+    print("=" * 60)
+
+    rng = random.Random(5)
+    memories = synthetic_memories(n)
+    embedder = HashingEmbedder()
+    vectors = VectorIndex(embedder.dim)
+    for start in range(0, n, 50_000):
+        vectors.add_batch(embedder.embed_memories(memories[start:start + 50_000]))
+
+    start = time.perf_counter()
+    ann = IVFIndex(min_train=0)
+    ann.train(vectors)
+    train_s = time.perf_counter() - start
+
+    # Queries: memories with a third of their words dropped
+    texts = []
+    for memory in rng.sample(memories, queries):
+        words = memory['content'].split()
+        texts.append(' '.join(w for w in words if rng.random() > 0.33) or words[0])
+    query_vectors = [embedder.embed(text) for text in texts]
+
+    def run(search) -> tuple:
+        start = time.perf_counter()
+        results = [[row for row, _ in search(query)] for query in query_vectors]
+        return results, queries / (time.perf_counter() - start)
+
+    exact, brute_qps = run(lambda query: vectors.search(query, k))
+    print(f"IVF lists / train:    {len(ann.centroids):10,}  ({train_s:.1f} s)")
+    print(f"Brute force:          {brute_qps:10,.0f} QPS")
+    for n_probe in (1, 2, 4, 8, 16, 32):
+        found, qps = run(lambda query: vectors.search(query, k, ann.candidates(query, n_probe)))
+        recall = statistics.mean(len(set(a) & set(b)) / max(len(b), 1) for a, b in zip(found, exact))
+        print(f"n_probe={n_probe:<3}          {qps:10,.0f} QPS  recall@{k} {recall:.3f}")
+    print()
+
+
+def benchmark_embedding_cache(n: int, edited: float = 0.01):
+    """Vector engine load (no corpus snapshot) with and without the embedding cache"""
+    from agents.memory_agent import MemoryAgent
+
+    print("=" * 60)
+    print(f"EMBEDDING CACHE: {n:,} memories, vector engine")
+    print("=" * 60)
+
+    rng = random.Random(5)
+    memories = synthetic_memories(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        memory_file = os.path.join(tmp, 'memories.json')
+
+        def write(records):
+            with open(memory_file, 'w', encoding='utf-8') as f:
+                json.dump({'memories': records}, f, ensure_ascii=False)
+
+        def construct(**kwargs) -> tuple:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                agent = MemoryAgent(memory_file, engine='vector', snapshot=False,
+                                    watch_interval=None, **kwargs)
+                return time.perf_counter() - start, agent._embedder.cache
+
+        write(memories)
+        uncached, _ = construct(embedding_cache=False)
+        cold, _ = construct()
+        warm, cache = construct()
+        for i in rng.sample(range(n), max(1, int(n * edited))):
+            memories[i] = dict(memories[i], content=memories[i]['content'] + ' feri')
+        write(memories)
+        changed, changed_cache = construct()
+        prefix = os.path.basename(cache.path)
+        cache_bytes = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)
+                          if name.startswith(prefix))
+
+    print(f"No cache:             {uncached * 1000:10.1f} ms")
+    print(f"Cold cache (+write):  {cold * 1000:10.1f} ms")
+    print(f"Warm cache:           {warm * 1000:10.1f} ms  ({uncached / warm:.1f}x faster)")
+    print(f"{edited:.0%} edited:           {changed * 1000:10.1f} ms  "
+          f"({changed_cache.misses:,} embedded, {changed_cache.hits:,} from cache)")
+    print(f"Cache files:          {cache_bytes / 1e6:10.1f} MB")
+    print()
+
+
+def benchmark_tenants(n_tenants: int, per_tenant: int = 100, budget_mb: int = 16,
+                      requests: int = 4_000):
+    """Zipf-distributed requests over many tenants under a memory budget"""
+    from agents.tenant_manager import TenantMemoryManager
+
+    print("=" * 60)
+    print(f"TENANTS: {n_tenants:,} x {per_tenant} memories, {budget_mb} MB budget")
+    print("=" * 60)
+
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        for tenant in range(n_tenants):
+            directory = os.path.join(tmp, f"couple{tenant}")
+            os.makedirs(directory)
+            with open(os.path.join(directory, 'memories.json'), 'w', encoding='utf-8') as f:
+                json.dump({'memories': synthetic_memories(per_tenant, seed=tenant)}, f, ensure_ascii=False)
+
+        # Agents without mapped snapshots, so tracemalloc sees everything they hold
+        manager = TenantMemoryManager(root=tmp, budget_bytes=budget_mb * 2 ** 20, snapshot=False)
+        weights = [1 / (rank + 1) for rank in range(n_tenants)]
+        tenants = rng.choices(range(n_tenants), weights=weights, k=requests)
+
+        latencies = []
+        peak_traced = 0
+        gc.collect()
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i, tenant in enumerate(tenants):
+                start = time.perf_counter()
+                manager.get(f"couple{tenant}").retrieve_memories("kati choti bheteko", k=3)
+                latencies.append(time.perf_counter() - start)
+                if i % 1000 == 0:
+                    peak_traced = max(peak_traced, tracemalloc.get_traced_memory()[0])
+        peak_traced = max(peak_traced, tracemalloc.get_traced_memory()[0])
+        tracemalloc.stop()
+
+    stats = manager.stats()
+    per_agent = stats['resident_bytes'] / max(stats['resident_tenants'], 1)
+    latencies.sort()
+    print(f"Distinct tenants hit:  {len(set(tenants)):10,}")
+    print(f"Resident tenants:      {stats['resident_tenants']:10,}  (~{per_agent / 1e3:.0f} KB each)")
+    print(f"Estimated resident:    {stats['resident_bytes'] / 1e6:10.1f} MB")
+    print(f"Traced peak:           {peak_traced / 1e6:10.1f} MB")
+    print(f"All tenants resident:  {per_agent * n_tenants / 1e6:10.1f} MB (estimated)")
+    print(f"Loads / evictions:     {stats['loads']:,} / {stats['evictions']:,}  (hit rate {stats['hit_rate']:.1%})")
+    print(f"Request p50 / p99:     {latencies[len(latencies) // 2] * 1000:.2f} / "
+          f"{latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+    print()
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_tenants = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    benchmark_footprint(n)
+    benchmark_cold_start(n)
+    benchmark_streaming_load(n)
+    benchmark_hot_reload(n)
+    benchmark_crud(n)
+    benchmark_date_range(n)
+    benchmark_engines(n)
+    benchmark_ann(n)
+    benchmark_embedding_cache(n)
+    benchmark_tenants(n_tenants)
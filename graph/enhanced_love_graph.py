@@ -17,6 +17,7 @@ except ImportError:
 
 from agents.mood_detector import MoodDetector
 from agents.memory_agent import MemoryAgent
+from agents.tenant_manager import TenantMemoryManager, DEFAULT_TENANT
 from agents.romantic_agent import RomanticAgent
 from agents.surprise_agent import SurpriseAgent
 from agents.safety_agent import SafetyAgent
@@ -39,18 +40,22 @@ class EnhancedLoveGraph:
     Orchestrates multiple agents with proactive engagement
     """
     
-    def __init__(self, llm=None, enable_proactive: bool = True):
+    def __init__(self, llm=None, enable_proactive: bool = True, tenant_id: str = DEFAULT_TENANT,
+                 memory_manager: Optional[TenantMemoryManager] = None):
         """
         Initialize the enhanced love graph
         
         Args:
             llm: Language model for agents
             enable_proactive: Enable proactive messaging
+            tenant_id: Couple whose memories this graph uses
+            memory_manager: Tenant agents (default: the process-wide manager)
         """
         # Initialize all agents
         self.llm = llm
         self.mood_detector = MoodDetector(llm=llm)
-        self.memory_agent = MemoryAgent()
+        self.tenant_id = tenant_id
+        self.memory_manager = memory_manager or TenantMemoryManager.shared()
         
         # Import the enhanced romantic agent
         from agents.romantic_agent_enhanced import RomanticAgent as EnhancedRomanticAgent
@@ -73,6 +78,11 @@ class EnhancedLoveGraph:
         
         self.last_mood = 'neutral'
         
+    @property
+    def memory_agent(self) -> MemoryAgent:
+        """This tenant's agent (looked up per use so idle tenants can be evicted)"""
+        return self.memory_manager.get(self.tenant_id)
+
     def process_message(self, message: str) -> Dict:
         """
         Process incoming message with MEMORY-FIRST approach
@@ -3,7 +3,7 @@ LangGraph Love Orchestrator
 Manages multi-agent conversation flow
 """
 
-from typing import TypedDict, List, Dict
+from typing import TypedDict, List, Dict, Optional
 import operator
 
 try:
@@ -15,6 +15,7 @@ except ImportError:
 
 from agents.mood_detector import MoodDetector
 from agents.memory_agent import MemoryAgent
+from agents.tenant_manager import TenantMemoryManager, DEFAULT_TENANT
 from agents.romantic_agent import RomanticAgent
 from agents.surprise_agent import SurpriseAgent
 from agents.safety_agent import SafetyAgent
@@ -36,17 +37,22 @@ class LoveState(TypedDict):
 class LoveGraph:
     """Orchestrates multiple agents to respond with love"""
     
-    def __init__(self, use_llm: bool = False):
+    def __init__(self, use_llm: bool = False, tenant_id: str = DEFAULT_TENANT,
+                 memory_manager: Optional[TenantMemoryManager] = None):
         """
         Initialize the love graph
         
         Args:
             use_llm: Whether to use LLM-based agents
+            tenant_id: Couple whose memories this graph uses
+            memory_manager: Tenant agents (default: the process-wide manager,
+                            keyword engine)
         """
         # Initialize all agents
         self.mood_detector = MoodDetector(llm=None)
-        # ✅ CRITICAL FIX: Disable vector search to use keyword-based matching
-        self.memory_agent = MemoryAgent(use_vector=False)
+        # ✅ CRITICAL FIX: keyword-based matching (the manager's default engine)
+        self.tenant_id = tenant_id
+        self.memory_manager = memory_manager or TenantMemoryManager.shared()
         self.romantic_agent = RomanticAgent(llm=None, personality="Yamraj")
         self.surprise_agent = SurpriseAgent(llm=None)
         self.safety_agent = SafetyAgent(strictness="medium")
@@ -57,6 +63,11 @@ class LoveGraph:
         if LANGGRAPH_AVAILABLE:
             self._build_graph()
     
+    @property
+    def memory_agent(self) -> MemoryAgent:
+        """This tenant's agent (looked up per use so idle tenants can be evicted)"""
+        return self.memory_manager.get(self.tenant_id)
+
     def _build_graph(self):
         """Build the LangGraph workflow"""
         # Create the graph
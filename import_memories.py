@@ -0,0 +1,46 @@
+"""
+HerAI Memory Import
+Bulk-load memories from a JSONL or CSV export into a memory file
+
+Each record needs "content"; "category", "importance" (1-10) and "date"
+(YYYY-MM-DD) are optional. Duplicates of existing memories are skipped.
+
+Usage:
+    python import_memories.py export.jsonl
+    python import_memories.py export.csv --tenant couple42 --engine bm25
+"""
+
+import argparse
+import sys
+
+from agents.memory_agent import MemoryAgent
+from agents.tenant_manager import TenantMemoryManager, DEFAULT_TENANT
+from memory.ingest import read_records
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-import memories from JSONL or CSV")
+    parser.add_argument('path', help="JSONL or CSV file with one memory per record")
+    parser.add_argument('--format', choices=('jsonl', 'csv'), help="Default: from the file extension")
+    parser.add_argument('--tenant', default=DEFAULT_TENANT,
+                        help="Import into this tenant's memories (default: --memory-file)")
+    parser.add_argument('--memory-file', default="memory/memories.json")
+    parser.add_argument('--tenant-root', default="memory/tenants")
+    parser.add_argument('--engine', default='keyword', choices=MemoryAgent.ENGINES,
+                        help="Engine whose snapshot is prepared for the next start")
+    parser.add_argument('--near-duplicates', default='keep', choices=MemoryAgent.NEAR_DUPLICATE_MODES,
+                        help="Flag or skip records similar to an existing memory")
+    parser.add_argument('--progress-every', type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    manager = TenantMemoryManager(root=args.tenant_root, default_memory_file=args.memory_file,
+                                  engine=args.engine, near_duplicates=args.near_duplicates)
+    print(f"📥 Importing {args.path} into {manager.memory_file(args.tenant)}")
+    agent = manager.create(args.tenant)
+    report = agent.import_memories(read_records(args.path, args.format), args.progress_every)
+    print(f"   {report['per_second']:,} records/s, ids {report['first_id']}-{report['last_id']}")
+    return 0 if report['added'] or not report['invalid'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,33 @@
 """
 HerAI Memory Package
 """
+from .keyword_index import KeywordIndex
+from .trigger_matcher import AhoCorasick, TriggerMatcher, TriggerMatch
+from .bm25 import BM25Index
+from .embeddings import HashingEmbedder, VectorIndex
+from .journal import MemoryJournal
+from .storage import MemoryStore, JsonMemoryStore
+from .sqlite_store import SQLiteMemoryStore
+from .cache import QueryCache
+from .secondary_index import SecondaryIndex
+from .identity_profile import IdentityProfile
+from .text_features import MemoryText, MemoryRecord, memory_text
+from .columnar import ColumnarMemories, DictMemories, new_memory_table
+from .snapshot import CorpusSnapshot, StringTable
+from .state import MemoryState
+from .ingest import read_records, validate_record
+from .minhash import MinHashLSH
+from .id_index import IdIndex
+from .date_parser import DateRange, parse_date_range
+from .fusion import reciprocal_rank_fusion
+from .ann import IVFIndex
+from .embedding_cache import EmbeddingCache
 
-__all__ = []
+__all__ = ['KeywordIndex', 'AhoCorasick', 'TriggerMatcher', 'TriggerMatch', 'BM25Index',
+           'HashingEmbedder', 'VectorIndex', 'MemoryJournal',
+           'MemoryStore', 'JsonMemoryStore', 'SQLiteMemoryStore', 'QueryCache',
+           'SecondaryIndex', 'IdentityProfile', 'MemoryText', 'MemoryRecord', 'memory_text',
+           'ColumnarMemories', 'DictMemories', 'new_memory_table', 'CorpusSnapshot', 'StringTable',
+           'MemoryState', 'read_records', 'validate_record',
+           'MinHashLSH', 'IdIndex', 'DateRange', 'parse_date_range',
+           'reciprocal_rank_fusion', 'IVFIndex', 'EmbeddingCache']
@@ -0,0 +1,222 @@
+"""
+Approximate Nearest Neighbours
+Inverted-file (IVF-flat) index over the rows of a VectorIndex: rows are
+bucketed by their nearest k-means centroid, and a query only scores the
+rows in the n_probe buckets whose centroids are closest to it. Recall and
+latency trade off through n_probe; the vectors themselves stay in the
+VectorIndex.
+"""
+
+import copy
+from array import array
+from math import sqrt
+from typing import Dict, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Below this many vectors a brute-force scan is already fast
+MIN_TRAIN = 20_000
+# k-means training sample per centroid, and Lloyd iterations
+TRAIN_PER_LIST = 32
+TRAIN_ITERATIONS = 8
+# Retrain once the corpus has grown this many times past the training size
+RETRAIN_GROWTH = 4
+# Rows assigned to centroids per matrix product
+ASSIGN_CHUNK = 65_536
+
+
+def spherical_kmeans(vectors: "np.ndarray", n_clusters: int, iterations: int = TRAIN_ITERATIONS,
+                     seed: int = 0) -> "np.ndarray":
+    """
+    Unit-length centroids of normalized vectors (cosine k-means)
+
+    An emptied cluster keeps its previous centroid.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind='stable')
+        clusters, starts = np.unique(assignment[order], return_index=True)
+        sums = np.add.reduceat(vectors[order], starts, axis=0)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        centroids[clusters] = sums / norms
+    return centroids
+
+
+class IVFIndex:
+    """
+    IVF-flat buckets of VectorIndex rows
+
+    Training stores the buckets as one CSR pair (offsets, rows) that is
+    never written again and is shared by every fork; rows added later go
+    to small per-bucket tails. A replaced row is appended to its new
+    bucket and simply stays in the old one: candidates are deduplicated
+    and scored with the row's current vector, and removed rows are left
+    out by VectorIndex.search().
+
+    Untrained (fewer than min_train rows), candidates() returns None and
+    callers scan every row.
+    """
+
+    def __init__(self, n_lists: Optional[int] = None, n_probe: int = 8, min_train: int = MIN_TRAIN):
+        """
+        Args:
+            n_lists: Buckets (None: about sqrt(rows) at training time)
+            n_probe: Buckets scanned per query by default; more means
+                     higher recall and slower queries
+            min_train: Rows needed before the index is trained
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("The ANN index needs numpy. Install: pip install numpy")
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.min_train = min_train
+        self.centroids: Optional["np.ndarray"] = None
+        self._offsets: Optional["np.ndarray"] = None
+        self._rows: Optional["np.ndarray"] = None
+        self._tails: Dict[int, array] = {}
+        self.trained_size = 0
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        """Number of bucket entries (stale entries of replaced rows included)"""
+        if not self.trained:
+            return 0
+        return len(self._rows) + sum(len(tail) for tail in self._tails.values())
+
+    # ══════════════════════════════════════════════════════════════════════
+    # TRAINING
+    # ══════════════════════════════════════════════════════════════════════
+
+    def maintain(self, vectors) -> bool:
+        """
+        (Re)train on `vectors` (a VectorIndex) when it is due; True if it was
+
+        Training is due once min_train rows exist, and again each time the
+        corpus grows RETRAIN_GROWTH times past the last training size, so
+        centroids keep up with a growing corpus at amortized linear cost.
+        """
+        size = len(vectors)
+        if self.trained and size < RETRAIN_GROWTH * self.trained_size:
+            return False
+        if size < self.min_train:
+            return False
+        self.train(vectors)
+        return True
+
+    def train(self, vectors, seed: int = 0):
+        """Fit centroids on a sample of the live rows and bucket every live row"""
+        rows = vectors.live_rows()
+        if not len(rows):
+            return
+        n_lists = min(self.n_lists or max(1, int(sqrt(len(rows)))), len(rows))
+        rng = np.random.default_rng(seed)
+        sample = rows if len(rows) <= n_lists * TRAIN_PER_LIST else \
+            np.sort(rng.choice(rows, n_lists * TRAIN_PER_LIST, replace=False))
+        centroids = spherical_kmeans(vectors.gather(sample), n_lists, seed=seed)
+
+        assignment = np.empty(len(rows), dtype=np.int64)
+        for start in range(0, len(rows), ASSIGN_CHUNK):
+            chunk = rows[start:start + ASSIGN_CHUNK]
+            assignment[start:start + len(chunk)] = np.argmax(vectors.gather(chunk) @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind='stable')
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=n_lists), out=offsets[1:])
+
+        self.centroids = centroids
+        self._offsets = offsets
+        self._rows = rows[order]
+        self._tails = {}
+        self.trained_size = len(vectors)
+
+    # ══════════════════════════════════════════════════════════════════════
+    # UPDATES
+    # ══════════════════════════════════════════════════════════════════════
+
+    def extend(self, vectors: "np.ndarray", start: int):
+        """Bucket a batch of appended rows, the first at row `start` (no-op until trained)"""
+        if not self.trained or not len(vectors):
+            return
+        assignment = np.argmax(vectors @ self.centroids.T, axis=1).tolist()
+        for row, bucket in enumerate(assignment, start):
+            self._tails.setdefault(bucket, array('q')).append(row)
+
+    def add(self, row: int, vector: "np.ndarray"):
+        """Bucket one appended or replaced row"""
+        if self.trained:
+            bucket = int(np.argmax(self.centroids @ vector))
+            self._tails.setdefault(bucket, array('q')).append(row)
+
+    def fork(self) -> "IVFIndex":
+        """Copy that takes add() and extend() without changing this index"""
+        clone = copy.copy(self)
+        clone._tails = {bucket: array('q', tail) for bucket, tail in self._tails.items()}
+        return clone
+
+    def nbytes(self) -> int:
+        """Approximate resident size"""
+        if not self.trained:
+            return 0
+        return (self.centroids.nbytes + self._offsets.nbytes + self._rows.nbytes
+                + sum(8 * len(tail) + 64 for tail in self._tails.values()))
+
+    # ══════════════════════════════════════════════════════════════════════
+    # SEARCH
+    # ══════════════════════════════════════════════════════════════════════
+
+    def candidates(self, query: "np.ndarray", n_probe: Optional[int] = None) -> Optional["np.ndarray"]:
+        """
+        Rows in the n_probe buckets closest to the query, ascending (None
+        while untrained: scan everything)
+        """
+        if not self.trained:
+            return None
+        n_lists = len(self.centroids)
+        n_probe = max(1, min(n_probe or self.n_probe, n_lists))
+        scores = self.centroids @ query
+        probed = np.argpartition(-scores, n_probe - 1)[:n_probe] if n_probe < n_lists else range(n_lists)
+        parts = []
+        for bucket in probed:
+            parts.append(self._rows[self._offsets[bucket]:self._offsets[bucket + 1]])
+            tail = self._tails.get(int(bucket))
+            if tail:
+                parts.append(np.frombuffer(tail, dtype=np.int64))
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(parts))
+
+    # ══════════════════════════════════════════════════════════════════════
+    # SNAPSHOT
+    # ══════════════════════════════════════════════════════════════════════
+
+    def export_state(self) -> tuple:
+        """(meta, arrays) for a CorpusSnapshot (tails merged into the CSR arrays)"""
+        meta = {'n_lists': self.n_lists, 'n_probe': self.n_probe, 'min_train': self.min_train,
+                'trained_size': self.trained_size}
+        if not self.trained:
+            return meta, {}
+        buckets = [self._rows[self._offsets[b]:self._offsets[b + 1]] for b in range(len(self.centroids))]
+        for bucket, tail in self._tails.items():
+            buckets[bucket] = np.concatenate([buckets[bucket], np.frombuffer(tail, dtype=np.int64)])
+        offsets = np.zeros(len(buckets) + 1, dtype=np.int64)
+        np.cumsum([len(rows) for rows in buckets], out=offsets[1:])
+        return meta, {'centroids': self.centroids, 'offsets': offsets,
+                      'rows': np.concatenate(buckets) if buckets else np.zeros(0, dtype=np.int64)}
+
+    def load_state(self, meta: Dict, arrays: Dict[str, "np.ndarray"]):
+        """Search straight from (possibly memory-mapped) snapshot arrays"""
+        self.__init__(meta['n_lists'], meta['n_probe'], meta['min_train'])
+        self.trained_size = meta['trained_size']
+        if 'centroids' in arrays:
+            self.centroids = arrays['centroids']
+            self._offsets = arrays['offsets']
+            self._rows = arrays['rows']
@@ -0,0 +1,417 @@
+"""
+BM25 Retrieval Engine
+Vectorized BM25 over a CSR term-document matrix (NumPy).
+Alternative to the hand-tuned keyword scorer for large memory corpora.
+"""
+
+import copy
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .chunked import ChunkedDict
+from .snapshot import StringTable, encode_strings
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# First-entry marker of a removed doc: none of its postings are current
+NO_ENTRY = 2 ** 62
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens (works for English and Romanized Nepali)"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def memory_tokens(memory: Dict) -> List[str]:
+    """Tokens BM25 indexes for a memory: content plus category words"""
+    category = memory.get('category', '').replace('_', ' ')
+    return tokenize(memory.get('content', '')) + tokenize(category)
+
+
+def top_k(positions: "np.ndarray", scores: "np.ndarray", k: int,
+          ties: Sequence["np.ndarray"] = ()) -> "np.ndarray":
+    """
+    Indices of the best k entries by score (ties -> lower position first)
+
+    Uses argpartition so only the selected k are fully sorted.
+
+    Args:
+        ties: Extra ascending tie-break keys (aligned with positions),
+              applied in order before the position
+    """
+    selected = np.arange(len(positions))
+    if len(positions) > k:
+        kth = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        # Keep boundary ties so tie-breaking stays exact
+        selected = np.flatnonzero(scores >= kth)
+    keys = [positions[selected]] + [tie[selected] for tie in reversed(ties)] + [-scores[selected]]
+    order = np.lexsort(keys)
+    return selected[order[:k]]
+
+
+def _append(column: "np.ndarray", size: int, values) -> "np.ndarray":
+    """
+    Write `values` after the first `size` entries of a growable column
+
+    A full or read-only (snapshot) column is first copied into one with
+    spare capacity; the column to keep using is returned.
+    """
+    values = np.asarray(values, dtype=column.dtype)
+    needed = size + len(values)
+    if needed > len(column) or not column.flags.writeable:
+        grown = np.empty(max(needed, 2 * len(column)), dtype=column.dtype)
+        grown[:size] = column[:size]
+        column = grown
+    column[size:needed] = values
+    return column
+
+
+class BM25Index:
+    """
+    BM25 term-document matrix
+
+    Postings are appended as COO triplets (term, doc, tf) to growable
+    columns that forks share, like VectorIndex rows. Entries up to the
+    last merge are also compiled into a CSR base segment (per term: doc
+    positions + term frequencies); entries appended since form a small
+    delta segment that search() scans alongside it. BM25 weights are
+    computed per query from the live corpus statistics, so a write never
+    touches the base: removed and replaced docs are only listed in
+    `_stale` until compile() folds everything into a new base once the
+    delta has outgrown it.
+    """
+
+    # The delta segment (entries appended + docs changed since the last
+    # merge) is merged once it exceeds max(MERGE_MIN, base entries / MERGE_FRACTION)
+    MERGE_MIN = 4096
+    MERGE_FRACTION = 16
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, importance_weight: float = 0.05):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("BM25 engine needs numpy. Install: pip install numpy")
+        self.k1 = k1
+        self.b = b
+        self.importance_weight = importance_weight
+        self._reset()
+
+    def _reset(self):
+        self.vocab = ChunkedDict()    # token -> term id
+        # COO postings, in append order
+        self._term_ids = np.zeros(1024, dtype=np.int32)
+        self._doc_ids = np.zeros(1024, dtype=np.int32)
+        self._tfs = np.zeros(1024, dtype=np.float32)
+        self._entries = 0
+        # Per doc, as last merged
+        self._doc_len = np.zeros(1024, dtype=np.float32)
+        self._importance = np.zeros(1024, dtype=np.float32)
+        self._size = 0
+        # Base segment: CSR over the first _merged COO entries
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._postings = np.zeros(0, dtype=np.float32)
+        self._merged = 0
+        self._removed = frozenset()   # Docs removed before the last merge
+        # Doc removed or replaced since the last merge -> (first current
+        # COO entry or NO_ENTRY, length, importance)
+        self._stale = ChunkedDict()
+        # Live corpus statistics
+        self._live = 0
+        self._total_len = 0.0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def build(self, memories: List[Dict]):
+        """Index a full corpus (positions follow list order)"""
+        self._reset()
+        self.extend(memories)
+        self._merge()
+
+    def add(self, memory: Dict) -> int:
+        """Append one memory and return its position"""
+        self.extend([memory])
+        return self._size - 1
+
+    def extend(self, memories: Iterable[Dict]):
+        """Append a batch of memories (one column write for all of them)"""
+        term_ids, doc_ids, tfs, lengths, importance = [], [], [], [], []
+        for pos, memory in enumerate(memories, self._size):
+            lengths.append(self._count_terms(memory, pos, term_ids, doc_ids, tfs))
+            importance.append(memory.get('importance', 5))
+        self._append_postings(term_ids, doc_ids, tfs)
+        self._doc_len = _append(self._doc_len, self._size, lengths)
+        self._importance = _append(self._importance, self._size, importance)
+        self._size += len(lengths)
+        self._live += len(lengths)
+        self._total_len += sum(lengths)
+
+    def _count_terms(self, memory: Dict, pos: int, term_ids: List, doc_ids: List, tfs: List) -> int:
+        """Collect a memory's COO triplets under doc `pos`; returns its length"""
+        tokens = memory_tokens(memory)
+        counts: Dict[int, int] = {}
+        for token in tokens:
+            term_id = self.vocab.get(token)
+            if term_id is None:
+                term_id = self.vocab[token] = len(self.vocab)
+            counts[term_id] = counts.get(term_id, 0) + 1
+        term_ids.extend(counts)
+        doc_ids.extend([pos] * len(counts))
+        tfs.extend(counts.values())
+        return len(tokens)
+
+    def _append_postings(self, term_ids: List, doc_ids: List, tfs: List):
+        self._term_ids = _append(self._term_ids, self._entries, term_ids)
+        self._doc_ids = _append(self._doc_ids, self._entries, doc_ids)
+        self._tfs = _append(self._tfs, self._entries, tfs)
+        self._entries += len(term_ids)
+
+    def replace(self, pos: int, memory: Dict):
+        """Re-index doc `pos` with a new version of its memory"""
+        if not 0 <= pos < self._size or self._is_removed(pos):
+            raise IndexError("no doc at this position")
+        # Earlier entries of the doc are skipped from now on
+        first = self._entries
+        term_ids, doc_ids, tfs = [], [], []
+        length = self._count_terms(memory, pos, term_ids, doc_ids, tfs)
+        self._append_postings(term_ids, doc_ids, tfs)
+        self._total_len += length - self._doc_value(pos, 1)
+        self._stale[pos] = (first, length, memory.get('importance', 5))
+
+    def remove(self, pos: int):
+        """Drop a doc from search results and from the corpus statistics"""
+        if not 0 <= pos < self._size:
+            raise IndexError("doc position out of range")
+        if self._is_removed(pos):
+            return
+        self._live -= 1
+        self._total_len -= self._doc_value(pos, 1)
+        self._stale[pos] = (NO_ENTRY, 0, 0)
+
+    def _is_removed(self, pos: int) -> bool:
+        return pos in self._removed or self._stale.get(pos, (0,))[0] == NO_ENTRY
+
+    def _doc_value(self, pos: int, field: int) -> float:
+        """Current length (field 1) or importance (field 2) of one doc"""
+        stale = self._stale.get(pos)
+        if stale is not None:
+            return stale[field]
+        return float((self._doc_len if field == 1 else self._importance)[pos])
+
+    def fork(self) -> "BM25Index":
+        """
+        Copy that takes add(), replace() and remove() without changing this index
+
+        COO entries and docs below this index's counts are never written
+        again, so the copy shares the columns and appends after them, and
+        it shares the base segment until the next merge replaces it. Only
+        the newest fork of an index may be written.
+        """
+        clone = copy.copy(self)
+        clone.vocab = self.vocab.copy()
+        clone._stale = self._stale.copy()
+        return clone
+
+    def nbytes(self) -> int:
+        """Approximate resident size: columns, base segment and vocabulary"""
+        columns = (self._term_ids, self._doc_ids, self._tfs, self._doc_len, self._importance,
+                   self._indptr, self._indices, self._postings)
+        return sum(column.nbytes for column in columns) + 120 * len(self.vocab) + 100 * len(self._stale)
+
+    # ══════════════════════════════════════════════════════════════════════
+    # MERGING
+    # ══════════════════════════════════════════════════════════════════════
+
+    def compile(self):
+        """Merge the delta segment into the base once it has outgrown it (after writes)"""
+        delta = self._entries - self._merged + len(self._stale)
+        if delta > max(self.MERGE_MIN, self._merged // self.MERGE_FRACTION):
+            self._merge()
+
+    def _merge(self):
+        arrays, removed = self._merged_arrays()
+        self._term_ids, self._doc_ids, self._tfs = arrays['term_ids'], arrays['doc_ids'], arrays['tfs']
+        self._doc_len, self._importance = arrays['doc_len'], arrays['importance']
+        self._indptr, self._indices, self._postings = arrays['indptr'], arrays['indices'], arrays['postings']
+        self._entries = self._merged = len(self._term_ids)
+        self._removed = removed
+        self._stale = ChunkedDict()
+
+    def _merged_arrays(self) -> tuple:
+        """
+        (arrays, removed docs) of a merged index: current COO entries only,
+        per-doc values updated, and the CSR base built over all of them
+        """
+        term_ids = self._term_ids[:self._entries]
+        doc_ids = self._doc_ids[:self._entries]
+        tfs = self._tfs[:self._entries]
+        doc_len = self._doc_len[:self._size]
+        importance = self._importance[:self._size]
+        removed = self._removed
+        if self._stale:
+            current = self._current(np.arange(self._entries), doc_ids, self._stale_arrays())
+            term_ids, doc_ids, tfs = term_ids[current], doc_ids[current], tfs[current]
+            doc_len, importance = doc_len.copy(), importance.copy()
+            removed = set(removed)
+            for pos, (first, length, value) in self._stale.items():
+                if first == NO_ENTRY:
+                    removed.add(pos)
+                else:
+                    doc_len[pos] = length
+                    importance[pos] = value
+            removed = frozenset(removed)
+
+        if self._merged == self._entries and not self._stale:
+            indptr, indices, postings = self._indptr, self._indices, self._postings
+        else:
+            order = np.argsort(term_ids, kind='stable')
+            indptr = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(term_ids, minlength=len(self.vocab)), out=indptr[1:])
+            indices, postings = doc_ids[order], tfs[order]
+        arrays = {'term_ids': term_ids, 'doc_ids': doc_ids, 'tfs': tfs, 'doc_len': doc_len,
+                  'importance': importance, 'indptr': indptr, 'indices': indices, 'postings': postings}
+        return arrays, removed
+
+    def _stale_arrays(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Docs changed since the last merge (sorted) and their first current COO entries"""
+        docs = np.fromiter(self._stale, dtype=np.int64, count=len(self._stale))
+        first = np.fromiter((value[0] for value in self._stale.values()), dtype=np.int64,
+                            count=len(self._stale))
+        order = np.argsort(docs)
+        return docs[order], first[order]
+
+    @staticmethod
+    def _current(entries: "np.ndarray", doc_ids: "np.ndarray", stale: tuple) -> "np.ndarray":
+        """Mask of the COO entries (with these doc ids) that belong to current doc versions"""
+        stale_docs, first = stale
+        if not len(stale_docs):
+            return np.ones(len(entries), dtype=bool)
+        at = np.minimum(np.searchsorted(stale_docs, doc_ids), len(stale_docs) - 1)
+        return (stale_docs[at] != doc_ids) | (entries >= first[at])
+
+    # ══════════════════════════════════════════════════════════════════════
+    # SNAPSHOT
+    # ══════════════════════════════════════════════════════════════════════
+
+    def export_state(self) -> tuple:
+        """(meta, arrays) for a CorpusSnapshot: the index as merged now (this one is left as is)"""
+        arrays, removed = self._merged_arrays()
+        tokens = [''] * len(self.vocab)
+        for token, term_id in self.vocab.items():
+            tokens[term_id] = token
+        arrays['vocab_blob'], arrays['vocab_offsets'] = encode_strings(tokens)
+        meta = {'k1': self.k1, 'b': self.b, 'importance_weight': self.importance_weight,
+                'removed': sorted(removed), 'live': self._live, 'total_len': self._total_len}
+        return meta, arrays
+
+    def load_state(self, meta: Dict, arrays: Dict[str, "np.ndarray"]):
+        """
+        Search straight from (possibly memory-mapped) snapshot arrays; the
+        first write copies the columns it appends to
+        """
+        self._reset()
+        self.k1 = meta['k1']
+        self.b = meta['b']
+        self.importance_weight = meta['importance_weight']
+        vocab = StringTable(arrays['vocab_blob'], arrays['vocab_offsets'])
+        self.vocab = ChunkedDict((token, term_id) for term_id, token in enumerate(vocab))
+        self._term_ids, self._doc_ids, self._tfs = arrays['term_ids'], arrays['doc_ids'], arrays['tfs']
+        self._doc_len, self._importance = arrays['doc_len'], arrays['importance']
+        self._indptr, self._indices, self._postings = arrays['indptr'], arrays['indices'], arrays['postings']
+        self._entries = self._merged = len(self._term_ids)
+        self._size = len(self._doc_len)
+        self._removed = frozenset(meta['removed'])
+        self._live = meta['live']
+        self._total_len = meta['total_len']
+
+    # ══════════════════════════════════════════════════════════════════════
+    # SEARCH
+    # ══════════════════════════════════════════════════════════════════════
+
+    def _query_postings(self, term_ids: List[int], stale: tuple) -> tuple:
+        """(docs, tfs, index into term_ids) of every current posting of the query terms"""
+        stale_docs = stale[0]
+        base_terms = len(self._indptr) - 1
+        spans = [(self._indptr[t], self._indptr[t + 1]) for t in term_ids if t < base_terms]
+        docs = [self._indices[s:e] for s, e in spans]
+        tfs = [self._postings[s:e] for s, e in spans]
+        if len(stale_docs):
+            # A changed doc's base entries are all out of date
+            for i, column in enumerate(docs):
+                keep = ~np.isin(column, stale_docs)
+                docs[i], tfs[i] = column[keep], tfs[i][keep]
+        # Spans cover a prefix of the sorted term ids (newer terms have higher ids)
+        which = [np.repeat(np.arange(len(docs)), [len(column) for column in docs])]
+
+        if self._entries > self._merged:
+            delta_terms = self._term_ids[self._merged:self._entries]
+            hit = np.flatnonzero(np.isin(delta_terms, term_ids))
+            entries = hit + self._merged
+            delta_docs = self._doc_ids[entries]
+            current = self._current(entries, delta_docs, stale)
+            entries = entries[current]
+            docs.append(delta_docs[current])
+            tfs.append(self._tfs[entries])
+            which.append(np.searchsorted(term_ids, self._term_ids[entries]))
+        if not docs:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32), which[0]
+        return np.concatenate(docs), np.concatenate(tfs), np.concatenate(which)
+
+    def _doc_values(self, docs: "np.ndarray", field: int, stale: tuple) -> "np.ndarray":
+        """Current lengths (field 1) or importances (field 2) of `docs`"""
+        values = (self._doc_len if field == 1 else self._importance)[docs]
+        if len(stale[0]):
+            for i in np.flatnonzero(np.isin(docs, stale[0])).tolist():
+                values[i] = self._stale[int(docs[i])][field]
+        return values
+
+    def search(self, query: str, k: int = 3, within=None) -> List[Tuple[int, float]]:
+        """
+        Score every memory against the query in one vectorized pass
+
+        Args:
+            query: Search query
+            k: Number of results
+            within: Only rank these positions (e.g. a date range); None ranks all
+
+        Returns:
+            (position, score) pairs, best first; only memories sharing at
+            least one term with the query are returned
+        """
+        term_ids = sorted({self.vocab[t] for t in tokenize(query) if t in self.vocab})
+        if not term_ids or k <= 0:
+            return []
+
+        stale = self._stale_arrays()
+        indices, tfs, which = self._query_postings(term_ids, stale)
+        if not len(indices):
+            return []
+        df = np.bincount(which, minlength=len(term_ids))
+        idf = np.log(1 + (self._live - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = np.float32(self._total_len / self._live if self._live else 1.0)
+        norm = self.k1 * (1 - self.b + self.b * self._doc_values(indices, 1, stale) / max(avgdl, 1e-9))
+        weights = (idf[which] * tfs * (self.k1 + 1) / (tfs + norm)).astype(np.float32)
+
+        if len(indices) * 8 < self._size:
+            # Sparse query: reduce the sorted postings, never touch all docs
+            order = np.argsort(indices, kind='stable')
+            candidates, starts = np.unique(indices[order], return_index=True)
+            scores = np.add.reduceat(weights[order].astype(np.float64), starts)
+        else:
+            dense = np.bincount(indices, weights=weights, minlength=self._size)
+            candidates = np.flatnonzero(dense)  # BM25 weights are always > 0
+            scores = dense[candidates]
+        if within is not None:
+            keep = np.isin(candidates, np.asarray(within, dtype=np.int64))
+            candidates, scores = candidates[keep], scores[keep]
+        prior = self.importance_weight * self._doc_values(candidates, 2, stale).astype(np.float32)
+        scores += prior
+
+        top = top_k(candidates, scores, k)
+        return [(int(candidates[i]), float(scores[i])) for i in top]
@@ -0,0 +1,66 @@
+"""
+Query Result Cache
+Bounded LRU cache for retrieval results, tied to a corpus version so any
+write or reload invalidates it.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional
+
+
+class QueryCache:
+    """LRU cache with hit/miss counters"""
+
+    def __init__(self, maxsize: int = 256):
+        """
+        Args:
+            maxsize: Maximum cached entries (0 disables caching)
+        """
+        self.maxsize = maxsize
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        """Cached value for `key`, or None; a new corpus version clears the cache"""
+        with self._lock:
+            if version != self.version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self.version = version
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, version: int):
+        """Store a value computed against corpus `version`"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if version != self.version:
+                return  # Corpus changed while the value was computed
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        """Size and hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'invalidations': self.invalidations
+        }
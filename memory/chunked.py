@@ -0,0 +1,282 @@
+"""
+Chunked Copy-on-Write Containers
+A sorted list, a dict and a set stored as bounded chunks, so an index fork
+copies one reference per chunk and a write copies only the chunk it
+changes: O(n / chunk + chunk) per write instead of O(n).
+
+All follow the fork() contract of the indexes: once copy() is called, only
+the copy is written, and the original stays as it was for its readers.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class ChunkedList:
+    """
+    Sorted list kept as chunks of up to 2 * CHUNK items
+
+    Offers what the indexes use of a sorted Python list: add() (insort;
+    appending is O(1)), discard(), bisect_left(), indexing, slicing and
+    iteration.
+    """
+
+    CHUNK = 512
+
+    __slots__ = ('_chunks', '_maxes', '_len', '_owned')
+
+    def __init__(self, items: Iterable = ()):
+        """items must already be sorted"""
+        items = list(items)
+        self._chunks: List[List] = [items[i:i + self.CHUNK] for i in range(0, len(items), self.CHUNK)]
+        self._maxes: List = [chunk[-1] for chunk in self._chunks]   # Last item of each chunk
+        self._len = len(items)
+        # ids of the chunks copied since copy() (None: all are private)
+        self._owned: Optional[Set[int]] = None
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator:
+        return chain.from_iterable(self._chunks)
+
+    def __reversed__(self) -> Iterator:
+        for chunk in reversed(self._chunks):
+            yield from reversed(chunk)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step != 1:
+                return list(self)[index]
+            if stop <= start:
+                return []
+            chunk, i = self._locate(start)
+            rest = chain(self._chunks[chunk][i:], chain.from_iterable(self._chunks[chunk + 1:]))
+            return list(islice(rest, stop - start))
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("ChunkedList index out of range")
+        chunk, i = self._locate(index)
+        return self._chunks[chunk][i]
+
+    def __repr__(self) -> str:
+        return f"ChunkedList({list(self)!r})"
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """(chunk, offset in it) of the item at `index`"""
+        for chunk, items in enumerate(self._chunks):
+            if index < len(items):
+                return chunk, index
+            index -= len(items)
+        raise IndexError("ChunkedList index out of range")
+
+    def bisect_left(self, value) -> int:
+        """Index where `value` would be inserted before any equal items"""
+        chunk = bisect_left(self._maxes, value)
+        if chunk == len(self._chunks):
+            return self._len
+        return sum(map(len, self._chunks[:chunk])) + bisect_left(self._chunks[chunk], value)
+
+    def _writable(self, chunk: int) -> List:
+        """Chunk `chunk`, copied first if it is still shared with the original"""
+        items = self._chunks[chunk]
+        if self._owned is not None and id(items) not in self._owned:
+            items = self._chunks[chunk] = items.copy()
+            self._owned.add(id(items))
+        return items
+
+    def _new_chunk(self, at: int, items: List):
+        self._chunks.insert(at, items)
+        self._maxes.insert(at, items[-1])
+        if self._owned is not None:
+            self._owned.add(id(items))
+
+    def add(self, value):
+        """Insert `value` after any equal items"""
+        self._len += 1
+        chunk = bisect_right(self._maxes, value)
+        if chunk == len(self._chunks):
+            # Appending: fill the last chunk, then start a new one
+            if not self._chunks or len(self._chunks[-1]) >= self.CHUNK:
+                self._new_chunk(len(self._chunks), [value])
+                return
+            chunk -= 1
+            self._writable(chunk).append(value)
+            self._maxes[chunk] = value
+            return
+        items = self._writable(chunk)
+        insort(items, value)
+        if len(items) > 2 * self.CHUNK:
+            self._chunks[chunk] = items[:self.CHUNK]
+            self._maxes[chunk] = items[self.CHUNK - 1]
+            if self._owned is not None:
+                self._owned.add(id(self._chunks[chunk]))
+            self._new_chunk(chunk + 1, items[self.CHUNK:])
+
+    def update(self, values: Iterable):
+        """Insert a batch of values (a rebuild unless they all sort last)"""
+        values = sorted(values)
+        if not values:
+            return
+        if self._len and values[0] < self._maxes[-1]:
+            self.__init__(sorted(chain(self, values)))
+            return
+        for value in values:
+            self.add(value)
+
+    def discard(self, value) -> bool:
+        """Remove one item equal to `value`; False if there is none"""
+        chunk = bisect_left(self._maxes, value)
+        if chunk == len(self._chunks):
+            return False
+        i = bisect_left(self._chunks[chunk], value)
+        if self._chunks[chunk][i] != value:
+            return False
+        items = self._writable(chunk)
+        del items[i]
+        self._len -= 1
+        if not items:
+            del self._chunks[chunk]
+            del self._maxes[chunk]
+        elif i == len(items):
+            self._maxes[chunk] = items[-1]
+        return True
+
+    def copy(self) -> "ChunkedList":
+        """Copy sharing every chunk until one of the two is written"""
+        clone = ChunkedList.__new__(ChunkedList)
+        clone._chunks = self._chunks.copy()
+        clone._maxes = self._maxes.copy()
+        clone._len = self._len
+        clone._owned = set()
+        return clone
+
+
+class ChunkedDict:
+    """
+    Dict split by key hash into shards of about SHARD keys
+
+    The shard table doubles as the dict grows. Iteration goes shard by
+    shard, so it follows no particular order (keys() and values() still
+    line up).
+    """
+
+    SHARD = 1024
+
+    __slots__ = ('_shards', '_len', '_owned')
+
+    def __init__(self, items: Iterable = ()):
+        self._shards: List[Dict] = [{}]
+        self._len = 0
+        # ids of the shards copied since copy() (None: all are private)
+        self._owned: Optional[Set[int]] = None
+        self.update(items)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, key) -> bool:
+        return key in self._shard(key)
+
+    def __getitem__(self, key):
+        return self._shard(key)[key]
+
+    def get(self, key, default=None):
+        return self._shard(key).get(key, default)
+
+    def __iter__(self) -> Iterator:
+        return chain.from_iterable(self._shards)
+
+    def keys(self) -> Iterator:
+        return iter(self)
+
+    def values(self) -> Iterator:
+        return chain.from_iterable(shard.values() for shard in self._shards)
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        return chain.from_iterable(shard.items() for shard in self._shards)
+
+    def __repr__(self) -> str:
+        return f"ChunkedDict({dict(self.items())!r})"
+
+    def _shard(self, key) -> Dict:
+        return self._shards[hash(key) & (len(self._shards) - 1)]
+
+    def _writable(self, key) -> Dict:
+        """Shard of `key`, copied first if it is still shared with the original"""
+        i = hash(key) & (len(self._shards) - 1)
+        shard = self._shards[i]
+        if self._owned is not None and id(shard) not in self._owned:
+            shard = self._shards[i] = shard.copy()
+            self._owned.add(id(shard))
+        return shard
+
+    def __setitem__(self, key, value):
+        shard = self._writable(key)
+        size = len(shard)
+        shard[key] = value
+        self._len += len(shard) - size
+        if self._len > self.SHARD * len(self._shards):
+            self._grow()
+
+    def __delitem__(self, key):
+        del self._writable(key)[key]
+        self._len -= 1
+
+    def pop(self, key, *default):
+        if key not in self._shard(key):
+            if default:
+                return default[0]
+            raise KeyError(key)
+        self._len -= 1
+        return self._writable(key).pop(key)
+
+    def setdefault(self, key, default=None):
+        shard = self._shard(key)
+        if key in shard:
+            return shard[key]
+        self[key] = default
+        return default
+
+    def update(self, items: Iterable):
+        if hasattr(items, 'items'):
+            items = items.items()
+        for key, value in items:
+            self[key] = value
+
+    def copy(self) -> "ChunkedDict":
+        """Copy sharing every shard until one of the two is written"""
+        clone = type(self).__new__(type(self))
+        clone._shards = self._shards.copy()
+        clone._len = self._len
+        clone._owned = set()
+        return clone
+
+    def _grow(self):
+        shards: List[Dict] = [{} for _ in range(2 * len(self._shards))]
+        mask = len(shards) - 1
+        for key, value in self.items():
+            shards[hash(key) & mask][key] = value
+        self._shards = shards
+        self._owned = None
+
+
+class ChunkedSet(ChunkedDict):
+    """Set stored as ChunkedDict shards (keys mapped to None)"""
+
+    __slots__ = ()
+
+    def __init__(self, keys: Iterable = ()):
+        super().__init__((key, None) for key in keys)
+
+    def __repr__(self) -> str:
+        return f"ChunkedSet({set(self)!r})"
+
+    def add(self, key):
+        self[key] = None
+
+    def discard(self, key):
+        self.pop(key, None)
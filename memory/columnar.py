@@ -0,0 +1,423 @@
+"""
+Columnar Memory Table
+Compact in-memory representation of the memory corpus: NumPy columns for
+id / importance / date ordinal, interned category codes and one UTF-8
+content table. Dicts are only materialized for the memories a caller
+actually asks for.
+
+A materialized memory's MemoryText is rebuilt from its content bytes
+(lowercased and split on access) rather than kept as a second copy of the
+text; the keyword index already holds what retrieval needs from it.
+"""
+
+import copy
+import sys
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from .text_features import MemoryText, MemoryRecord, memory_text
+from .chunked import ChunkedDict, ChunkedSet
+
+
+# Key order of a standard memory (as written in memories.json)
+STANDARD_KEYS = ('id', 'category', 'content', 'date', 'importance')
+
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+def id_sort_key(value) -> float:
+    """Memory id as a tie-break key (non-numeric ids sort last)"""
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else float('inf')
+
+
+def _date_ordinal(value) -> Optional[int]:
+    """Proleptic ordinal of a canonical 'YYYY-MM-DD' string, else None"""
+    if not isinstance(value, str) or len(value) != 10:
+        return None
+    try:
+        parsed = date.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed.toordinal() if parsed.isoformat() == value else None
+
+
+class ColumnarMemories:
+    """
+    Memory corpus stored column by column
+
+    Behaves like a read-mostly list of memory dicts (len, indexing,
+    iteration, append), but each standard memory costs a few fixed-width
+    column cells plus its UTF-8 content bytes instead of a dict with five
+    boxed values. Memories that don't fit the standard shape (extra keys,
+    non-int ids, unparseable dates...) are kept verbatim as dicts.
+
+    Columns are append-only, so forks share them: removing a memory only
+    records its position in `removed`, and replacing one stores the new
+    version verbatim over its old cells. Positions never shift.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("Columnar memories need numpy. Install: pip install numpy")
+        capacity = max(capacity, 1)
+        self._size = 0
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._importance = np.zeros(capacity, dtype=np.int32)
+        self._dates = np.zeros(capacity, dtype=np.int32)
+        self._category_codes = np.zeros(capacity, dtype=np.int32)
+        self._offsets = np.zeros(capacity + 1, dtype=np.int64)
+        self._content = bytearray()
+        self.categories: List[str] = []
+        self._category_lookup: Dict[str, int] = {}
+        self._category_texts: List[tuple] = []
+        self._verbatim = ChunkedDict()    # pos -> memory dict
+        self._verbatim_texts = ChunkedDict()    # pos -> MemoryText
+        # Positions of removed memories (tombstones)
+        self.removed = ChunkedSet()
+        # True while the columns are read-only arrays mapped from a snapshot
+        self._frozen = False
+
+    @classmethod
+    def from_memories(cls, memories: Iterable[Dict], texts: Optional[Iterable[MemoryText]] = None,
+                      capacity: int = 1024) -> "ColumnarMemories":
+        table = cls(capacity)
+        table.extend(memories, texts)
+        return table
+
+    # ══════════════════════════════════════════════════════════════════════
+    # WRITES
+    # ══════════════════════════════════════════════════════════════════════
+
+    def _grow(self, needed: int):
+        capacity = len(self._ids)
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity)
+        for name in ('_ids', '_importance', '_dates', '_category_codes'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+        offsets = np.zeros(capacity + 1, dtype=np.int64)
+        offsets[:self._size + 1] = self._offsets[:self._size + 1]
+        self._offsets = offsets
+
+    def _category_code(self, category: str) -> int:
+        code = self._category_lookup.get(category)
+        if code is None:
+            code = self._category_lookup[category] = len(self.categories)
+            self.categories.append(category)
+            normalized = memory_text({'category': category})
+            self._category_texts.append((normalized.category, normalized.category_tokens))
+        return code
+
+    def append(self, memory: Dict, text: Optional[MemoryText] = None) -> int:
+        """
+        Store one memory and return its position
+
+        `text` is only kept for memories stored verbatim; standard ones
+        rebuild theirs from the content in text_at().
+        """
+        if self._frozen:
+            self._thaw()
+        pos = self._size
+        self._grow(pos + 1)
+
+        standard = (
+            tuple(memory) == STANDARD_KEYS
+            and type(memory['id']) is int
+            and type(memory['importance']) is int
+            and INT32_MIN <= memory['importance'] <= INT32_MAX
+            and isinstance(memory['category'], str)
+            and isinstance(memory['content'], str)
+        )
+        ordinal = _date_ordinal(memory.get('date')) if standard else None
+
+        if standard and ordinal is not None:
+            self._ids[pos] = memory['id']
+            self._importance[pos] = memory['importance']
+            self._dates[pos] = ordinal
+            self._category_codes[pos] = self._category_code(memory['category'])
+            self._content += memory['content'].encode('utf-8')
+        else:
+            # Keep it verbatim; columns hold lookup-friendly approximations
+            self._verbatim[pos] = dict(memory)
+            self._verbatim_texts[pos] = text if text is not None else memory_text(memory)
+            importance = memory.get('importance', 5)
+            self._importance[pos] = importance if type(importance) is int and INT32_MIN <= importance <= INT32_MAX else 0
+            self._dates[pos] = _date_ordinal(memory.get('date')) or 0
+            self._category_codes[pos] = self._category_code(str(memory.get('category', '')))
+        self._offsets[pos + 1] = len(self._content)
+        self._size += 1
+        return pos
+
+    def extend(self, memories: Iterable[Dict], texts: Optional[Iterable[MemoryText]] = None):
+        if texts is None:
+            for memory in memories:
+                self.append(memory)
+        else:
+            for memory, text in zip(memories, texts):
+                self.append(memory, text)
+
+    def replace(self, pos: int, memory: Dict, text: Optional[MemoryText] = None):
+        """Store a new version of the memory at `pos` (kept verbatim)"""
+        if not 0 <= pos < self._size or pos in self.removed:
+            raise IndexError("no memory at this position")
+        self._verbatim[pos] = dict(memory)
+        self._verbatim_texts[pos] = text if text is not None else memory_text(memory)
+
+    def remove(self, pos: int):
+        """Tombstone the memory at `pos` (it keeps its slot; see live())"""
+        if not 0 <= pos < self._size:
+            raise IndexError("memory position out of range")
+        self.removed.add(pos)
+
+    # ══════════════════════════════════════════════════════════════════════
+    # READS
+    # ══════════════════════════════════════════════════════════════════════
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, pos: int) -> MemoryRecord:
+        """Materialize one memory dict (with its MemoryText as `.text`)"""
+        if pos < 0:
+            pos += self._size
+        if not 0 <= pos < self._size:
+            raise IndexError("memory position out of range")
+        verbatim = self._verbatim.get(pos)
+        if verbatim is not None:
+            record = MemoryRecord(verbatim)
+        else:
+            record = MemoryRecord(
+                id=int(self._ids[pos]),
+                category=self.categories[self._category_codes[pos]],
+                content=self.content_at(pos),
+                date=date.fromordinal(int(self._dates[pos])).isoformat(),
+                importance=int(self._importance[pos])
+            )
+        record.text = self.text_at(pos)
+        return record
+
+    def __iter__(self) -> Iterator[Dict]:
+        for pos in range(self._size):
+            yield self[pos]
+
+    def live(self) -> Iterator[Dict]:
+        """Memories that were not removed, in position order"""
+        removed = self.removed
+        for pos in range(self._size):
+            if pos not in removed:
+                yield self[pos]
+
+    def content_at(self, pos: int) -> str:
+        verbatim = self._verbatim.get(pos)
+        if verbatim is not None:
+            return verbatim.get('content', '')
+        return str(self._content[self._offsets[pos]:self._offsets[pos + 1]], 'utf-8')
+
+    def text_at(self, pos: int) -> MemoryText:
+        """MemoryText of one memory (the category part is precomputed per category)"""
+        verbatim = self._verbatim_texts.get(pos)
+        if verbatim is not None:
+            return verbatim
+        category, category_tokens = self._category_texts[self._category_codes[pos]]
+        text = str(self._content[self._offsets[pos]:self._offsets[pos + 1]], 'utf-8').lower()
+        return MemoryText(
+            text=text,
+            tokens=frozenset(sys.intern(token) for token in text.split()),
+            category=category,
+            category_tokens=category_tokens
+        )
+
+    def category_at(self, pos: int) -> str:
+        verbatim = self._verbatim.get(pos)
+        if verbatim is not None:
+            return verbatim.get('category', '')
+        return self.categories[self._category_codes[pos]]
+
+    def id_key_at(self, pos: int):
+        """id_sort_key() of one memory's id"""
+        verbatim = self._verbatim.get(pos)
+        if verbatim is not None:
+            return id_sort_key(verbatim.get('id'))
+        return int(self._ids[pos])
+
+    def id_key_array(self) -> "np.ndarray":
+        """float64 id_sort_key() per position"""
+        values = self._ids[:self._size].astype(np.float64)
+        for pos, memory in self._verbatim.items():
+            values[pos] = id_sort_key(memory.get('id'))
+        return values
+
+    def importance_at(self, pos: int, default=5):
+        """Importance as memory.get('importance', default) would return it"""
+        verbatim = self._verbatim.get(pos)
+        if verbatim is not None:
+            return verbatim.get('importance', default)
+        return int(self._importance[pos])
+
+    def importance_array(self, default=5) -> "np.ndarray":
+        """float64 importance per position (missing -> default)"""
+        values = self._importance[:self._size].astype(np.float64)
+        for pos, memory in self._verbatim.items():
+            values[pos] = memory.get('importance', default)
+        return values
+
+    def nbytes(self) -> int:
+        """Approximate resident size of the columns and content table"""
+        columns = (self._ids, self._importance, self._dates, self._category_codes, self._offsets)
+        return (sum(column.nbytes for column in columns) + len(self._content)
+                + sum(len(c) + 49 for c in self.categories) + 2048 * len(self._verbatim)
+                + 64 * len(self.removed))
+
+    def fork(self) -> "ColumnarMemories":
+        """
+        Copy that takes appends without changing this table
+
+        Columns are append-only and a table never reads past its own size,
+        so the copy shares them; the verbatim dicts and tombstones are
+        chunked and copied shard by shard as they change. Only the newest
+        fork of a table may be appended to.
+        """
+        clone = copy.copy(self)
+        clone._verbatim = self._verbatim.copy()
+        clone._verbatim_texts = self._verbatim_texts.copy()
+        clone.removed = self.removed.copy()
+        return clone
+
+    # ══════════════════════════════════════════════════════════════════════
+    # SNAPSHOT
+    # ══════════════════════════════════════════════════════════════════════
+
+    def export_state(self) -> tuple:
+        """(meta, arrays) for a CorpusSnapshot"""
+        size = self._size
+        meta = {
+            'size': size,
+            'categories': self.categories,
+            'verbatim': [[pos, memory] for pos, memory in self._verbatim.items()],
+            'removed': sorted(self.removed)
+        }
+        arrays = {
+            'ids': self._ids[:size],
+            'importance': self._importance[:size],
+            'dates': self._dates[:size],
+            'category_codes': self._category_codes[:size],
+            'offsets': self._offsets[:size + 1],
+            'content': np.frombuffer(bytes(self._content[:self._offsets[size]]), dtype=np.uint8)
+        }
+        return meta, arrays
+
+    @classmethod
+    def from_state(cls, meta: Dict, arrays: Dict[str, "np.ndarray"]) -> "ColumnarMemories":
+        """Table over (possibly memory-mapped) snapshot arrays; copied on first append"""
+        table = cls(capacity=1)
+        table._size = meta['size']
+        for name in ('ids', 'importance', 'dates', 'category_codes', 'offsets', 'content'):
+            setattr(table, '_' + name, arrays[name])
+        for category in meta['categories']:
+            table._category_code(category)
+        for pos, memory in meta['verbatim']:
+            table._verbatim[pos] = memory
+            table._verbatim_texts[pos] = memory_text(memory)
+        table.removed = ChunkedSet(meta.get('removed', ()))
+        table._frozen = True
+        return table
+
+    def _thaw(self):
+        """Switch mapped read-only columns to growable copies before a write"""
+        size = self._size
+        self._grow(size + 1)  # Fresh writable columns
+        self._content = bytearray(self._content)
+        self._frozen = False
+
+
+class DictMemories(list):
+    """
+    Plain list-of-dicts fallback with the ColumnarMemories interface
+    (used when numpy is not installed)
+    """
+
+    def __init__(self, memories: Iterable = ()):
+        super().__init__(memories)
+        self.removed = ChunkedSet()
+
+    @classmethod
+    def from_memories(cls, memories: Iterable[Dict], texts: Optional[Iterable[MemoryText]] = None,
+                      capacity: int = 0) -> "DictMemories":
+        table = cls()
+        table.extend(memories, texts)
+        return table
+
+    def append(self, memory: Dict, text: Optional[MemoryText] = None) -> int:
+        record = MemoryRecord(memory)
+        record.text = text if text is not None else memory_text(memory)
+        super().append(record)
+        return len(self) - 1
+
+    def extend(self, memories: Iterable[Dict], texts: Optional[Iterable[MemoryText]] = None):
+        if texts is None:
+            for memory in memories:
+                self.append(memory)
+        else:
+            for memory, text in zip(memories, texts):
+                self.append(memory, text)
+
+    def replace(self, pos: int, memory: Dict, text: Optional[MemoryText] = None):
+        if not 0 <= pos < len(self) or pos in self.removed:
+            raise IndexError("no memory at this position")
+        record = MemoryRecord(memory)
+        record.text = text if text is not None else memory_text(memory)
+        self[pos] = record
+
+    def remove(self, pos: int):
+        if not 0 <= pos < len(self):
+            raise IndexError("memory position out of range")
+        self.removed.add(pos)
+
+    def live(self) -> Iterator[Dict]:
+        return (m for pos, m in enumerate(self) if pos not in self.removed)
+
+    def content_at(self, pos: int) -> str:
+        return self[pos].get('content', '')
+
+    def text_at(self, pos: int) -> MemoryText:
+        return self[pos].text
+
+    def category_at(self, pos: int) -> str:
+        return self[pos].get('category', '')
+
+    def id_key_at(self, pos: int):
+        return id_sort_key(self[pos].get('id'))
+
+    def id_key_array(self) -> "np.ndarray":
+        return np.array([id_sort_key(m.get('id')) for m in self], dtype=np.float64)
+
+    def importance_at(self, pos: int, default=5):
+        return self[pos].get('importance', default)
+
+    def importance_array(self, default=5) -> "np.ndarray":
+        return np.array([m.get('importance', default) for m in self], dtype=np.float64)
+
+    def nbytes(self) -> int:
+        return sum(2 * len(m.get('content', '')) + 2000 for m in self)
+
+    def fork(self) -> "DictMemories":
+        clone = DictMemories(self)
+        clone.removed = self.removed.copy()
+        return clone
+
+
+def new_memory_table(memories: Iterable[Dict] = (), texts: Optional[Iterable[MemoryText]] = None):
+    """ColumnarMemories when numpy is available, else DictMemories"""
+    if NUMPY_AVAILABLE:
+        memories = list(memories) if not isinstance(memories, list) else memories
+        return ColumnarMemories.from_memories(memories, texts, capacity=max(len(memories), 1024))
+    return DictMemories.from_memories(memories, texts)
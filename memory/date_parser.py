@@ -0,0 +1,321 @@
+"""
+Date Range Parser
+Finds the span of time a question is anchored to ("what happened in
+January?", "gaeko mahina", "3 din aghi", "2024-02-14 dekhi 2024-03-01
+samma") so retrieval can pre-filter memories by date instead of keyword
+matching on the words. English and Romanized Nepali; Bikram Sambat months
+and years map to approximate Gregorian spans.
+"""
+
+import re
+from datetime import date, timedelta
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+
+class DateRange(NamedTuple):
+    """Inclusive span of dates; None leaves that end open"""
+    start: Optional[date]
+    end: Optional[date]
+
+
+MONTHS = {
+    'january': 1, 'jan': 1, 'januari': 1, 'janawari': 1, 'janvari': 1,
+    'february': 2, 'feb': 2, 'februari': 2, 'feburary': 2, 'farwari': 2,
+    'march': 3, 'mar': 3,
+    'april': 4, 'apr': 4, 'aprail': 4,
+    'may': 5,
+    'june': 6, 'jun': 6,
+    'july': 7, 'jul': 7, 'julai': 7,
+    'august': 8, 'aug': 8, 'agast': 8,
+    'september': 9, 'sep': 9, 'sept': 9, 'septembar': 9,
+    'october': 10, 'oct': 10, 'aktubar': 10, 'oktobar': 10,
+    'november': 11, 'nov': 11, 'nobembar': 11, 'nobhembar': 11,
+    'december': 12, 'dec': 12, 'disembar': 12,
+}
+# Abbreviations and words with other meanings only count next to a day, a
+# year or another anchor they form a range with ("feb to march 2025")
+BARE_MONTHS = {name for name, month in MONTHS.items() if len(name) > 3 and name not in ('march', 'sept')}
+
+# Bikram Sambat months and the (month, day) each one roughly starts on in
+# the Gregorian calendar; exact boundaries move by a day or two per year
+BS_MONTHS = {
+    'baisakh': 0, 'baishakh': 0, 'vaisakh': 0,
+    'jestha': 1, 'jeth': 1,
+    'asar': 2, 'asadh': 2, 'ashadh': 2, 'asaar': 2,
+    'shrawan': 3, 'srawan': 3, 'saun': 3, 'sawan': 3,
+    'bhadra': 4, 'bhadau': 4,
+    'asoj': 5, 'ashwin': 5, 'aswin': 5,
+    'kartik': 6, 'kattik': 6,
+    'mangsir': 7, 'mangshir': 7,
+    'poush': 8, 'paush': 8,
+    'magh': 9,
+    'falgun': 10, 'fagun': 10, 'phalgun': 10,
+    'chaitra': 11, 'chait': 11,
+}
+BS_MONTH_STARTS = [(4, 14), (5, 15), (6, 15), (7, 17), (8, 17), (9, 17),
+                   (10, 18), (11, 17), (12, 16), (1, 15), (2, 13), (3, 15)]
+BS_YEAR_OFFSET = 57      # Baisakh 1 of BS year Y falls in April of Y - 57
+
+# How far back a month or day without a year looks for one with memories
+MAX_YEARS_BACK = 50
+
+NUMBERS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+    'ek': 1, 'euta': 1, 'dui': 2, 'duita': 2, 'tin': 3, 'tinta': 3, 'char': 4, 'chaar': 4,
+    'paanch': 5, 'panch': 5, 'chha': 6, 'saat': 7, 'sat': 7, 'aath': 8, 'ath': 8,
+    'nau': 9, 'das': 10,
+}
+UNITS = {
+    'day': 'day', 'days': 'day', 'din': 'day',
+    'week': 'week', 'weeks': 'week', 'hapta': 'week', 'haptaa': 'week',
+    'month': 'month', 'months': 'month', 'mahina': 'month', 'mahinaa': 'month',
+    'year': 'year', 'years': 'year', 'barsa': 'year', 'barsha': 'year', 'barsh': 'year',
+    'saal': 'year', 'sal': 'year', 'varsha': 'year',
+}
+
+
+def _alternation(words) -> str:
+    return '|'.join(sorted(map(re.escape, words), key=len, reverse=True))
+
+
+_MONTH = _alternation(MONTHS)
+_BARE_MONTH = _alternation(BARE_MONTHS)
+_BS_MONTH = _alternation(BS_MONTHS)
+_NUMBER = rf"\d+|{_alternation(NUMBERS)}"
+_UNIT = _alternation(UNITS)
+_DAY = r"(?P<day>\d{1,2})(?:st|nd|rd|th)?"
+_YEAR = r"(?P<year>(?:19|20)\d{2})"
+_LAST = r"last|past|previous|pichhillo|pichhilo|pichhla|gaeko|gayeko"
+_THIS = r"this|yo|yas|yes"
+
+# Each anchor pattern names its groups after what they hold
+ANCHORS = [
+    ('iso_day', rf"\b{_YEAR}-(?P<month>\d{{1,2}})-{_DAY}\b"),
+    ('iso_month', rf"\b{_YEAR}-(?P<month>\d{{1,2}})\b(?!-)"),
+    ('month_day', rf"\b(?P<month>{_MONTH})\.? {_DAY}\b(?:,? {_YEAR}\b)?"),
+    ('day_month', rf"\b{_DAY}(?: of)? (?P<month>{_MONTH})\b(?:,? {_YEAR}\b)?"),
+    ('month_year', rf"\b(?P<month>{_MONTH}),? {_YEAR}\b"),
+    ('month', rf"\b(?P<month>{_BARE_MONTH})\b|\b(?:in|during|of) (?P<may>may)\b|\b(?P<may_ma>may) ma\b"),
+    ('bs_month', rf"(?:\b(?P<lead_year>20\d{{2}}) )?\b(?P<month>{_BS_MONTH})\b(?: \d{{1,2}}(?!\d))?(?:,? (?P<year>20\d{{2}})(?: ?b\.?s\b\.?)?)?"),
+    ('bs_year', r"\b(?P<year>20\d{2}) ?(?:b\.?s\b\.?|sal\b|saal\b)"),
+    ('year', rf"\b{_YEAR}\b"),
+    ('ago', rf"\b(?P<n>{_NUMBER}) (?P<unit>{_UNIT}) (?:ago|back|aghi|agadi|agi|pahile)\b"),
+    ('last_n', rf"\b(?:{_LAST}) (?P<n>{_NUMBER}) (?P<unit>{_UNIT})\b"),
+    ('last_unit', rf"\b(?:{_LAST}) (?P<unit>{_UNIT})\b"),
+    ('this_unit', rf"\b(?:{_THIS}) (?P<unit>{_UNIT})\b"),
+    ('day_before_yesterday', r"\bday before yesterday\b|\basti\b"),
+    ('yesterday', r"\byesterday\b|\bhijo\b"),
+    ('today', r"\btoday\b|\baaja\b|\baaj\b|\baajako\b"),
+    ('last_year', r"\bpohor\b|\bpohar\b"),
+    # Any month name; dropped unless a RANGE_JOINER ties it to a neighbour
+    ('loose_month', rf"\b(?P<month>{_MONTH})\b"),
+]
+ANCHOR_PATTERNS = [(kind, re.compile(pattern)) for kind, pattern in ANCHORS]
+
+# Text between two anchors that makes them one span ("from A to B", "A dekhi B samma")
+RANGE_JOINER = re.compile(r"^\s*(?:to|until|till|through|and|-|–|dekhi|dekhin)\s*$")
+# Words that open the span before or after a single anchor
+OPEN_BEFORE = re.compile(r"\b(?P<word>since|from|after|before|until|till|prior to)\s*$")
+OPEN_AFTER = re.compile(r"^\s*(?P<word>dekhi|dekhin|pachhi|paxi|pachi|samma|sama|bhanda (?:agadi|aghi|pahile))\b")
+
+
+def parse_date_range(query: str, today: Optional[date] = None,
+                     exists: Optional[Callable[[DateRange], bool]] = None) -> Optional[DateRange]:
+    """
+    The date span a query is about, or None if it names none
+
+    A month or day without a year is its latest occurrence up to today,
+    or with `exists`, the latest one exists() accepts (e.g. the latest
+    January anything was remembered in).
+
+    Args:
+        query: Search query (English or Romanized Nepali)
+        today: Reference date for relative phrases (default: today)
+        exists: Whether a span holds anything; earlier years are tried
+                for yearless months and days until it returns True
+    """
+    today = today or date.today()
+    text = query.lower()
+    anchors = _find_anchors(text, today, exists)
+    if not anchors:
+        return None
+
+    (start, end, span), rest = anchors[0], anchors[1:]
+    if rest and RANGE_JOINER.match(text[end:rest[0][0]]):
+        last = rest[0][2]
+        if span.start > last.end:
+            # "January to March 2025": the first end takes its year from the second
+            span = _find_anchors(text[start:end], last.end, exists, joined=False)[0][2]
+        return DateRange(span.start, last.end)
+
+    before = OPEN_BEFORE.search(text[:start])
+    after = OPEN_AFTER.match(text[end:])
+    word = before.group('word') if before else after.group('word') if after else None
+    if word in ('since', 'from', 'dekhi', 'dekhin'):
+        return DateRange(span.start, None)
+    if word in ('after', 'pachhi', 'paxi', 'pachi'):
+        return DateRange(span.end + timedelta(days=1), None)
+    if word in ('until', 'till', 'samma', 'sama'):
+        return DateRange(None, span.end)
+    if word is not None:
+        return DateRange(None, span.start - timedelta(days=1))
+    return span
+
+
+def _find_anchors(text: str, today: date, exists: Optional[Callable[[DateRange], bool]] = None,
+                  joined: bool = True) -> List[Tuple[int, int, DateRange]]:
+    """
+    Non-overlapping (start, end, span) anchors, longest match first where
+    they overlap; with joined=True, loose month names only where a
+    RANGE_JOINER ties them to the anchor before or after
+    """
+    found = []
+    for kind, pattern in ANCHOR_PATTERNS:
+        for match in pattern.finditer(text):
+            try:
+                span = _resolve(kind, match, today, exists)
+            except (ValueError, OverflowError):
+                continue  # February 30th and friends
+            if span is not None:
+                found.append((match.start(), match.end(), span, kind))
+    # Stable sort: for equal matches the earlier pattern wins
+    found.sort(key=lambda anchor: (anchor[0], anchor[0] - anchor[1]))
+    anchors = []
+    for anchor in found:
+        if not anchors or anchor[0] >= anchors[-1][1]:
+            anchors.append(anchor)
+
+    def tied(i: int) -> bool:
+        return ((i > 0 and RANGE_JOINER.match(text[anchors[i - 1][1]:anchors[i][0]]) is not None)
+                or (i + 1 < len(anchors) and RANGE_JOINER.match(text[anchors[i][1]:anchors[i + 1][0]]) is not None))
+
+    return [(start, end, span) for i, (start, end, span, kind) in enumerate(anchors)
+            if kind != 'loose_month' or not joined or tied(i)]
+
+
+def _resolve(kind: str, match: "re.Match", today: date,
+             exists: Optional[Callable[[DateRange], bool]] = None) -> Optional[DateRange]:
+    """DateRange of one anchor match"""
+    groups = match.groupdict()
+    year = groups.get('year') or groups.get('lead_year')  # "bhadra 2060" or "2060 bhadra"
+    year = int(year) if year else None
+
+    if kind == 'iso_day':
+        day = date(year, int(groups['month']), int(groups['day']))
+        return DateRange(day, day)
+    if kind == 'iso_month':
+        return _month_span(year, int(groups['month']))
+    if kind in ('month_day', 'day_month'):
+        month, day = MONTHS[groups['month']], int(groups['day'])
+        if year is not None:
+            return DateRange(date(year, month, day), date(year, month, day))
+        year = today.year if date(today.year, month, day) <= today else today.year - 1
+        return _latest(lambda y: DateRange(date(y, month, day), date(y, month, day)), year, exists)
+    if kind == 'month_year':
+        return _month_span(year, MONTHS[groups['month']])
+    if kind in ('month', 'loose_month'):
+        month = MONTHS[groups['month'] or groups.get('may') or groups.get('may_ma')]
+        year = today.year if month <= today.month else today.year - 1
+        return _latest(lambda y: _month_span(y, month), year, exists)
+    if kind == 'bs_month':
+        index = BS_MONTHS[groups['month']]
+        if year is not None:
+            return _bs_month_span(index, year)
+        year = today.year + BS_YEAR_OFFSET
+        while _bs_month_start(index, year) > today:
+            year -= 1
+        return _latest(lambda y: _bs_month_span(index, y), year, exists)
+    if kind == 'bs_year':
+        return _bs_year_span(year)
+    if kind == 'year':
+        if year > today.year + 1:
+            return _bs_year_span(year)  # No memory is dated years ahead: a Nepali year
+        return DateRange(date(year, 1, 1), date(year, 12, 31))
+
+    if kind == 'today':
+        return DateRange(today, today)
+    if kind == 'yesterday':
+        day = today - timedelta(days=1)
+        return DateRange(day, day)
+    if kind == 'day_before_yesterday':
+        day = today - timedelta(days=2)
+        return DateRange(day, day)
+    if kind == 'last_year':
+        return DateRange(date(today.year - 1, 1, 1), date(today.year - 1, 12, 31))
+
+    unit = UNITS[groups['unit']]
+    if kind == 'this_unit':
+        return DateRange(_unit_span(today, unit).start, today)
+    if kind == 'last_unit':
+        if unit == 'day':
+            return None
+        return _unit_span(_shift(today, unit, 1), unit)
+    n = int(groups['n']) if groups['n'].isdigit() else NUMBERS[groups['n']]
+    if kind == 'ago':
+        return _unit_span(_shift(today, unit, n), unit)
+    if kind == 'last_n':
+        return DateRange(_shift(today, unit, n), today)
+    return None
+
+
+def _latest(span_in: Callable[[int], DateRange], year: int,
+            exists: Optional[Callable[[DateRange], bool]]) -> DateRange:
+    """span_in(year), or the first earlier year's span exists() accepts"""
+    latest = span_in(year)
+    if exists is None or exists(latest):
+        return latest
+    for back in range(1, MAX_YEARS_BACK + 1):
+        try:
+            span = span_in(year - back)
+        except ValueError:
+            continue  # February 29th outside leap years
+        if exists(span):
+            return span
+    return latest
+
+
+def _month_span(year: int, month: int) -> DateRange:
+    start = date(year, month, 1)
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    return DateRange(start, next_month - timedelta(days=1))
+
+
+def _unit_span(day: date, unit: str) -> DateRange:
+    """Calendar day, week (Monday to Sunday), month or year containing `day`"""
+    if unit == 'day':
+        return DateRange(day, day)
+    if unit == 'week':
+        start = day - timedelta(days=day.weekday())
+        return DateRange(start, start + timedelta(days=6))
+    if unit == 'month':
+        return _month_span(day.year, day.month)
+    return DateRange(date(day.year, 1, 1), date(day.year, 12, 31))
+
+
+def _shift(day: date, unit: str, n: int) -> date:
+    """`day` moved back n units (month ends clamp: Mar 31 - 1 month = Feb 28)"""
+    if unit == 'day':
+        return day - timedelta(days=n)
+    if unit == 'week':
+        return day - timedelta(weeks=n)
+    months = day.year * 12 + day.month - 1 - (n if unit == 'month' else 12 * n)
+    year, month = divmod(months, 12)
+    last_day = _month_span(year, month + 1).end.day
+    return date(year, month + 1, min(day.day, last_day))
+
+
+def _bs_month_start(index: int, bs_year: int) -> date:
+    month, day = BS_MONTH_STARTS[index]
+    # Magh to Chaitra fall in the next Gregorian year
+    return date(bs_year - BS_YEAR_OFFSET + (1 if month < 4 else 0), month, day)
+
+
+def _bs_month_span(index: int, bs_year: int) -> DateRange:
+    start = _bs_month_start(index, bs_year)
+    following = _bs_month_start(0, bs_year + 1) if index == 11 else _bs_month_start(index + 1, bs_year)
+    return DateRange(start, following - timedelta(days=1))
+
+
+def _bs_year_span(bs_year: int) -> DateRange:
+    return DateRange(_bs_month_start(0, bs_year), _bs_month_start(0, bs_year + 1) - timedelta(days=1))
@@ -0,0 +1,301 @@
+"""
+Persistent Embedding Cache
+Content hash -> embedding, kept on disk so a restart or reload only embeds
+memories whose text changed since some process last embedded it.
+
+Two files per embedder configuration:
+    <path>.idx        header (with a generation) | (16-byte BLAKE2b of the
+                      text, row) records
+    <path>.<gen>.f32  raw float32 rows, `dim` values each
+
+Both are append-only between compactions. Rows are written and fsynced
+before the index records that point at them, so a reader that maps the
+index first never sees a row that isn't there yet, and a writer that dies
+mid-append leaves only unreferenced bytes. Both files are memory-mapped
+read-only: any number of worker processes on the host read the same pages
+without copying them. Appends and compaction take an exclusive flock on
+the index where the platform has one.
+
+compact() writes the kept rows to the next generation's rows file and
+renames a new index over the old one, so readers switch files in one step
+and keep the old pages mapped until they do.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are not serialized between processes
+    fcntl = None
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+    RECORD = np.dtype([('key', 'S16'), ('row', '<i8')])
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+MAGIC = b'HEREMBC1'
+HEADER = struct.Struct('<8sIQ4x')   # magic, dim, generation; same size as a record
+
+# Records appended since the last sort stay in a dict until there are this many
+PENDING_MERGE = 1 << 14
+
+
+def content_key(text: str) -> bytes:
+    """16-byte digest identifying an embedded text"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """
+    Embeddings of previously seen texts, shared through two mapped files
+
+    Lookups bisect a sorted copy of the index keys (one argsort when the
+    cache is opened) plus a dict of records appended since. Each lookup
+    first maps whatever other processes appended or compacted in the
+    meantime.
+    """
+
+    def __init__(self, path: str, dim: int):
+        """
+        Args:
+            path: File prefix; callers put the embedder configuration in it,
+                  since rows of different embedders must never mix
+            dim: Embedding dimension
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("The embedding cache needs numpy. Install: pip install numpy")
+        self.path = path
+        self.dim = dim
+        self.hits = 0
+        self.misses = 0
+        self._index_path = f"{path}.idx"
+        self._reset(None)
+        self._create()
+        self._sync()
+
+    def _data_path(self, generation: int) -> str:
+        return f"{self.path}.{generation}.f32"
+
+    def _create(self):
+        os.makedirs(os.path.dirname(self._index_path) or '.', exist_ok=True)
+        if os.path.exists(self._index_path):
+            return
+        # Rows file first: once the index exists, readers expect it
+        open(self._data_path(0), 'ab').close()
+        try:
+            with open(self._index_path, 'xb') as f:
+                f.write(HEADER.pack(MAGIC, self.dim, 0))
+        except FileExistsError:
+            pass
+
+    def _reset(self, inode: Optional[int]):
+        """Forget everything mapped from an index file that has been replaced"""
+        self._inode = inode
+        self._records = np.zeros(0, dtype=RECORD)     # Mapped index records
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)   # Mapped rows
+        self._sorted_keys = np.zeros(0, dtype='S16')
+        self._sorted_rows = np.zeros(0, dtype=np.int64)
+        self._pending: Dict[bytes, int] = {}
+
+    def __len__(self) -> int:
+        """Number of cached rows (stale ones included until compact())"""
+        return len(self._records)
+
+    @property
+    def matrix(self) -> "np.ndarray":
+        """Read-only view of every cached row (mapped, not copied)"""
+        return self._vectors
+
+    def nbytes(self) -> int:
+        """Private resident size (the mapped files are shared page cache)"""
+        return self._sorted_keys.nbytes + self._sorted_rows.nbytes + 100 * len(self._pending)
+
+    # ══════════════════════════════════════════════════════════════════════
+    # MAPPING
+    # ══════════════════════════════════════════════════════════════════════
+
+    def _sync(self):
+        """Map records (and rows) appended since the last call"""
+        for _ in range(3):
+            try:
+                return self._sync_once()
+            except FileNotFoundError:
+                continue  # Compacted between reading the index and its rows: start over
+        self._sync_once()
+
+    def _sync_once(self):
+        if os.stat(self._index_path).st_size < HEADER.size + RECORD.itemsize and self._inode is None:
+            return  # Nothing cached yet (or the header is still being written)
+        with open(self._index_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_ino != self._inode:
+                self._reset(stat.st_ino)
+            count = max(stat.st_size - HEADER.size, 0) // RECORD.itemsize
+            if count <= len(self._records):
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, dim, generation = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or dim != self.dim:
+            raise ValueError(f"{self._index_path} is not a {self.dim}-d embedding cache")
+        old = len(self._records)
+        records = np.frombuffer(mapped, dtype=RECORD, count=count, offset=HEADER.size)
+        # The index was read first, so the rows file already holds every row it names
+        with open(self._data_path(generation), 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            rows = size // (4 * self.dim)
+            if rows:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._vectors = np.frombuffer(data, dtype=np.float32, count=rows * self.dim).reshape(rows, self.dim)
+        self._records = records
+
+        added = records[old:]
+        added = added[(added['row'] >= 0) & (added['row'] < rows)]
+        if len(self._pending) + len(added) > max(PENDING_MERGE, len(self._sorted_keys) // 4):
+            self._sort()
+        else:
+            self._pending.update(zip(added['key'].tolist(), added['row'].tolist()))
+
+    def _sort(self):
+        records = self._records[self._records['row'] < len(self._vectors)]
+        order = np.argsort(records['key'], kind='stable')
+        self._sorted_keys = records['key'][order]
+        self._sorted_rows = records['row'][order]
+        self._pending = {}
+
+    @contextmanager
+    def _locked_index(self):
+        """The index file opened for writing, flocked, and still the one at its path"""
+        while True:
+            index = open(self._index_path, 'r+b')
+            if fcntl is not None:
+                fcntl.flock(index.fileno(), fcntl.LOCK_EX)
+            if os.fstat(index.fileno()).st_ino == os.stat(self._index_path).st_ino:
+                break
+            index.close()  # Compacted while we waited for the lock
+        try:
+            yield index
+        finally:
+            if fcntl is not None:
+                fcntl.flock(index.fileno(), fcntl.LOCK_UN)
+            index.close()
+
+    # ══════════════════════════════════════════════════════════════════════
+    # LOOKUP & APPEND
+    # ══════════════════════════════════════════════════════════════════════
+
+    def lookup(self, keys: Sequence[bytes]) -> "np.ndarray":
+        """Row of each content_key() in the cache, -1 where it is missing"""
+        self._sync()
+        wanted = np.array(keys, dtype='S16')
+        rows = np.full(len(wanted), -1, dtype=np.int64)
+        if len(self._sorted_keys):
+            at = np.searchsorted(self._sorted_keys, wanted)
+            at[at == len(self._sorted_keys)] = 0
+            found = self._sorted_keys[at] == wanted
+            rows[found] = self._sorted_rows[at[found]]
+        if self._pending:
+            # tolist() strips trailing NULs, the same way the pending keys were read
+            for i, key in zip(np.flatnonzero(rows < 0).tolist(), wanted[rows < 0].tolist()):
+                rows[i] = self._pending.get(key, -1)
+        return rows
+
+    def append(self, keys: Sequence[bytes], vectors: "np.ndarray"):
+        """Store embeddings for these keys (rows first, then their index records)"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(keys), self.dim)
+        if not len(keys):
+            return
+        with self._locked_index() as index:
+            _, _, generation = HEADER.unpack(index.read(HEADER.size))
+            with open(self._data_path(generation), 'r+b') as data:
+                # Torn rows and records left by a crashed writer are overwritten
+                first = os.fstat(data.fileno()).st_size // (4 * self.dim)
+                data.seek(first * 4 * self.dim)
+                data.write(memoryview(vectors).cast('B'))
+                data.flush()
+                # Rows reach the disk before any record that points at them
+                os.fsync(data.fileno())
+            records = np.zeros(len(keys), dtype=RECORD)
+            records['key'] = keys
+            records['row'] = np.arange(first, first + len(keys))
+            count = max(os.fstat(index.fileno()).st_size - HEADER.size, 0) // RECORD.itemsize
+            index.seek(HEADER.size + count * RECORD.itemsize)
+            index.write(records.tobytes())
+            index.flush()
+        self._sync()
+
+    def compact(self, keep: Iterable[bytes]) -> int:
+        """
+        Rewrite the cache with only the rows of `keep` (e.g. the keys of the
+        live memories), dropping stale and duplicate rows
+
+        Returns:
+            Number of rows dropped
+        """
+        keep = list(dict.fromkeys(keep))
+        with self._locked_index() as index:
+            _, _, generation = HEADER.unpack(index.read(HEADER.size))
+            rows = self.lookup(keep)
+            kept = rows >= 0
+            keys = np.array(keep, dtype='S16')[kept]
+            before = len(self._records)
+
+            data_path = self._data_path(generation + 1)
+            with open(data_path, 'wb') as data:
+                data.write(memoryview(np.ascontiguousarray(self._vectors[rows[kept]])).cast('B'))
+                data.flush()
+                os.fsync(data.fileno())
+            records = np.zeros(len(keys), dtype=RECORD)
+            records['key'] = keys
+            records['row'] = np.arange(len(keys))
+            tmp_path = f"{self._index_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, self.dim, generation + 1))
+                f.write(records.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._index_path)
+            # Processes that mapped the old rows keep them until they resync
+            os.remove(self._data_path(generation))
+        self._sync()
+        return before - len(keys)
+
+    def embed(self, texts: List[str], embed_batch: Callable[[List[str]], "np.ndarray"]) -> "np.ndarray":
+        """
+        Embeddings of `texts`, computing (and caching) only the unseen ones
+
+        Args:
+            texts: Texts to embed
+            embed_batch: Embeds a list of texts into a (len, dim) matrix
+
+        Returns:
+            (len(texts), dim) float32 matrix
+        """
+        keys = [content_key(text) for text in texts]
+        rows = self.lookup(keys)
+        result = np.empty((len(texts), self.dim), dtype=np.float32)
+        hit = rows >= 0
+        result[hit] = self._vectors[rows[hit]]
+
+        missing: Dict[bytes, List[int]] = {}
+        for i in np.flatnonzero(~hit).tolist():
+            missing.setdefault(keys[i], []).append(i)
+        if missing:
+            firsts = [positions[0] for positions in missing.values()]
+            vectors = embed_batch([texts[i] for i in firsts])
+            for vector, positions in zip(vectors, missing.values()):
+                result[positions] = vector
+            try:
+                self.append(list(missing), vectors)
+            except OSError as e:
+                print(f"⚠️  Could not write embedding cache {self.path}: {e}")
+        self.hits += int(hit.sum())
+        self.misses += len(missing)
+        return result
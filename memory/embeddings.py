@@ -0,0 +1,326 @@
+"""
+Local Embeddings & Vector Search
+Offline hashing-trick char n-gram embedder (no model download, no network)
+plus a brute-force top-k index over a contiguous float32 matrix.
+
+Char n-grams make spelling variants of Romanized Nepali words
+(pehilo / pahilo, bhetna / bheteko) land close to each other without
+listing every variant by hand.
+"""
+
+import copy
+import hashlib
+import json
+import re
+import zlib
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .chunked import ChunkedDict, ChunkedSet
+from .embedding_cache import content_key
+
+if TYPE_CHECKING:
+    from .embedding_cache import EmbeddingCache
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Common Romanized Nepali spelling variations folded before hashing
+ROMAN_NORMALIZATION = [
+    ('chh', 'ch'), ('aa', 'a'), ('ee', 'i'), ('ii', 'i'),
+    ('oo', 'u'), ('uu', 'u'), ('sh', 's'), ('w', 'v'),
+]
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Bump when a change to the embedder makes old vectors wrong
+EMBEDDER_VERSION = 1
+
+
+def normalize_roman(word: str) -> str:
+    """Fold common Romanized Nepali spelling variants"""
+    for src, dst in ROMAN_NORMALIZATION:
+        word = word.replace(src, dst)
+    return word
+
+
+class HashingEmbedder:
+    """
+    Char n-gram embedder using the hashing trick
+
+    Every word contributes its boundary-padded char n-grams and the whole
+    word itself; each feature is hashed (crc32, stable across processes)
+    into `dim` signed buckets and the vector is L2-normalized.
+
+    With a `cache` (an EmbeddingCache), embed_memory() and embed_memories()
+    only embed texts the cache hasn't seen.
+    """
+
+    def __init__(self, dim: int = 512, ngram_range: Tuple[int, int] = (3, 4),
+                 cache: Optional["EmbeddingCache"] = None):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("Vector search needs numpy. Install: pip install numpy")
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.cache = cache
+        self._feature_cache: Dict[str, Tuple[int, float]] = {}
+        self._word_cache: Dict[str, Tuple["np.ndarray", "np.ndarray"]] = {}
+
+    def _features(self, text: str) -> List[str]:
+        features = []
+        lo, hi = self.ngram_range
+        for word in WORD_PATTERN.findall(text.lower()):
+            word = normalize_roman(word)
+            features.append(word)
+            padded = f" {word} "
+            for n in range(lo, hi + 1):
+                for i in range(len(padded) - n + 1):
+                    features.append(padded[i:i + n])
+        return features
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        cached = self._feature_cache.get(feature)
+        if cached is None:
+            h = zlib.crc32(feature.encode('utf-8'))
+            cached = (h % self.dim, 1.0 if h & 0x80000000 else -1.0)
+            if len(self._feature_cache) < 200_000:
+                self._feature_cache[feature] = cached
+        return cached
+
+    def embed(self, text: str) -> "np.ndarray":
+        """Embed one text into a unit-length float32 vector"""
+        features = self._features(text)
+        if not features:
+            return np.zeros(self.dim, dtype=np.float32)
+        buckets, signs = zip(*(self._bucket(f) for f in features))
+        vec = np.bincount(buckets, weights=signs, minlength=self.dim).astype(np.float32)
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec /= norm
+        return vec
+
+    def _word_buckets(self, word: str) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Buckets and signs of one lowercased word's features"""
+        cached = self._word_cache.get(word)
+        if cached is None:
+            pairs = [self._bucket(f) for f in self._features(word)]
+            cached = (np.array([bucket for bucket, _ in pairs], dtype=np.int64),
+                      np.array([sign for _, sign in pairs]))
+            if len(self._word_cache) < 200_000:
+                self._word_cache[word] = cached
+        return cached
+
+    def embed_batch(self, texts: List[str]) -> "np.ndarray":
+        """
+        Embed many texts into a (len(texts), dim) matrix
+
+        Rows equal embed() of each text, but features are worked out once
+        per distinct word and all rows are counted by a single bincount.
+        """
+        buckets, signs, rows = [], [], []
+        for row, text in enumerate(texts):
+            for word in WORD_PATTERN.findall(text.lower()):
+                word_buckets, word_signs = self._word_buckets(word)
+                buckets.append(word_buckets)
+                signs.append(word_signs)
+                rows.append(row)
+        if not buckets:
+            return np.zeros((len(texts), self.dim), dtype=np.float32)
+
+        offsets = np.repeat(np.array(rows, dtype=np.int64) * self.dim, [len(b) for b in buckets])
+        matrix = np.bincount(np.concatenate(buckets) + offsets, weights=np.concatenate(signs),
+                             minlength=len(texts) * self.dim).astype(np.float32)
+        matrix = matrix.reshape(len(texts), self.dim)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    @property
+    def fingerprint(self) -> str:
+        """Short hash of everything the vectors depend on (for cache file names)"""
+        config = [EMBEDDER_VERSION, self.dim, list(self.ngram_range), ROMAN_NORMALIZATION]
+        return hashlib.sha256(json.dumps(config).encode('utf-8')).hexdigest()[:12]
+
+    @staticmethod
+    def _memory_text(memory: Dict) -> str:
+        category = memory.get('category', '').replace('_', ' ')
+        return f"{memory.get('content', '')} {category}"
+
+    def cache_key(self, memory: Dict) -> bytes:
+        """Key of a memory's embedding in the cache"""
+        return content_key(self._memory_text(memory))
+
+    def embed_memory(self, memory: Dict) -> "np.ndarray":
+        """Embed a memory's content together with its category words"""
+        if self.cache is not None:
+            return self.embed_memories([memory])[0]
+        return self.embed(self._memory_text(memory))
+
+    def embed_memories(self, memories: List[Dict]) -> "np.ndarray":
+        """embed_memory() for many memories at once"""
+        texts = [self._memory_text(memory) for memory in memories]
+        if self.cache is not None:
+            return self.cache.embed(texts, self.embed_batch)
+        return self.embed_batch(texts)
+
+
+class VectorIndex:
+    """
+    Brute-force cosine top-k over a contiguous float32 matrix
+
+    Rows are unit vectors, so one matrix-vector product gives every
+    similarity; argpartition picks the top k without a full sort.
+
+    The matrix is shared with forks, so rows are never overwritten: a
+    replaced row's new vector is kept aside and scored separately, and
+    removed rows are masked out of every search.
+    """
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("Vector search needs numpy. Install: pip install numpy")
+        self.dim = dim
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self._size = 0
+        self._replaced = ChunkedDict()   # row -> its new vector
+        self._removed = ChunkedSet()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def matrix(self) -> "np.ndarray":
+        """View of the filled rows"""
+        return self._matrix[:self._size]
+
+    def add(self, vector: "np.ndarray") -> int:
+        """Append one vector (capacity doubles when full) and return its row"""
+        if self._size == len(self._matrix):
+            grown = np.zeros((max(2 * len(self._matrix), 1), self.dim), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        self._matrix[self._size] = vector
+        self._size += 1
+        return self._size - 1
+
+    def add_batch(self, vectors: "np.ndarray"):
+        """Append many vectors at once"""
+        needed = self._size + len(vectors)
+        if needed > len(self._matrix) or not self._matrix.flags.writeable:
+            grown = np.zeros((max(needed, 2 * len(self._matrix)), self.dim), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        self._matrix[self._size:needed] = vectors
+        self._size = needed
+
+    def replace(self, row: int, vector: "np.ndarray"):
+        """Give a row a new vector"""
+        if not 0 <= row < self._size or row in self._removed:
+            raise IndexError("no vector at this row")
+        self._replaced[row] = np.asarray(vector, dtype=np.float32)
+
+    def remove(self, row: int):
+        """Exclude a row from search results"""
+        if not 0 <= row < self._size:
+            raise IndexError("vector row out of range")
+        self._removed.add(row)
+        self._replaced.pop(row, None)
+
+    def nbytes(self) -> int:
+        """Resident size of the matrix (including spare capacity)"""
+        return self._matrix.nbytes + 4 * self.dim * len(self._replaced)
+
+    def fork(self) -> "VectorIndex":
+        """
+        Copy that takes add() without changing this index
+
+        Rows below len(self) are never written again, so the copy shares
+        the matrix and appends after them. Only the newest fork of an
+        index may be added to.
+        """
+        clone = copy.copy(self)
+        clone._replaced = self._replaced.copy()
+        clone._removed = self._removed.copy()
+        return clone
+
+    def export_state(self) -> tuple:
+        """(meta, arrays) for a CorpusSnapshot (replaced rows written in place)"""
+        matrix = self.matrix
+        if self._replaced:
+            matrix = matrix.copy()
+            for row, vector in self._replaced.items():
+                matrix[row] = vector
+        return {'dim': self.dim, 'removed': sorted(self._removed)}, {'matrix': matrix}
+
+    def load_state(self, meta: Dict, arrays: Dict[str, "np.ndarray"]):
+        """
+        Use a (possibly memory-mapped, read-only) snapshot matrix; it is
+        full, so the first add() copies it into a growable one
+        """
+        self.dim = meta['dim']
+        self._matrix = arrays['matrix']
+        self._size = len(self._matrix)
+        self._replaced = ChunkedDict()
+        self._removed = ChunkedSet(meta.get('removed', ()))
+
+    def gather(self, rows: "np.ndarray") -> "np.ndarray":
+        """Current vectors of `rows` (replaced rows included)"""
+        vectors = self._matrix[rows]
+        if self._replaced:
+            for i in np.flatnonzero(np.isin(rows, list(self._replaced))).tolist():
+                vectors[i] = self._replaced[int(rows[i])]
+        return vectors
+
+    def live_rows(self) -> "np.ndarray":
+        """Rows not removed, ascending"""
+        rows = np.arange(self._size)
+        if self._removed:
+            rows = rows[~np.isin(rows, list(self._removed))]
+        return rows
+
+    def similarities(self, query: "np.ndarray", rows: "np.ndarray") -> "np.ndarray":
+        """Cosine similarity of the query with each of `rows` (only those rows are multiplied)"""
+        return self.gather(rows) @ query
+
+    def search(self, query: "np.ndarray", k: int = 3, within=None,
+               ties: Optional[Callable[["np.ndarray"], Sequence["np.ndarray"]]] = None) -> List[Tuple[int, float]]:
+        """
+        Top-k rows by cosine similarity
+
+        Args:
+            query: Normalized query vector
+            k: Number of results
+            within: Only score these rows (e.g. a date range); None scores all
+            ties: Maps the rows tied at a similarity to extra ascending
+                  tie-break keys, applied in order before the row
+
+        Returns:
+            (row, similarity) pairs, best first; rows with similarity <= 0
+            are dropped
+        """
+        if self._size == 0 or k <= 0:
+            return []
+        if within is None:
+            rows = np.arange(self._size)
+            sims = self.matrix @ query
+            if self._replaced:
+                replaced = list(self._replaced)
+                sims[replaced] = np.stack([self._replaced[row] for row in replaced]) @ query
+            if self._removed:
+                sims[list(self._removed)] = -np.inf
+        else:
+            rows = np.asarray(within, dtype=np.int64)
+            if self._removed:
+                rows = rows[~np.isin(rows, list(self._removed))]
+            sims = self.similarities(query, rows)
+        top = np.flatnonzero(sims > 0)
+        if len(top) > k:
+            kth = sims[top[np.argpartition(-sims[top], k - 1)[:k]]].min()
+            # Keep boundary ties so tie-breaking stays exact
+            top = top[sims[top] >= kth]
+        keys = [rows[top]] + (list(reversed(ties(rows[top]))) if ties is not None else []) + [-sims[top]]
+        top = top[np.lexsort(keys)[:k]]
+        return [(int(rows[i]), float(sims[i])) for i in top]
@@ -0,0 +1,52 @@
+"""
+Rank Fusion
+Reciprocal rank fusion (RRF) of several rankings of one candidate set:
+each ranker contributes weight / (k + rank) for every candidate it ranked,
+so scores on different scales (keyword boosts, cosine similarities) can
+be combined without calibrating them against each other.
+"""
+
+from typing import Sequence
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Damping constant from the original RRF paper (Cormack et al., 2009)
+RRF_K = 60
+
+
+def ranks(keys: Sequence["np.ndarray"]) -> "np.ndarray":
+    """
+    1-based rank of every candidate when sorted by `keys`
+
+    Args:
+        keys: Ascending sort keys aligned with the candidates, the last
+              one primary (np.lexsort order)
+    """
+    order = np.lexsort(keys)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(1, len(order) + 1)
+    return rank
+
+
+def reciprocal_rank_fusion(rankings: "np.ndarray", weights: Sequence[float], k: float = RRF_K) -> "np.ndarray":
+    """
+    Fused score per candidate: sum of weight / (k + rank) over the rankers
+
+    Args:
+        rankings: (rankers x candidates) 1-based ranks; 0 marks a candidate
+                  the ranker left out, which adds nothing
+        weights: One weight per ranker
+        k: Damping constant; larger values flatten the gap between the
+           top ranks and the rest
+
+    Returns:
+        float64 fused scores aligned with the candidates
+    """
+    rankings = np.asarray(rankings)
+    weights = np.asarray(weights, dtype=np.float64)[:, None]
+    contributions = np.where(rankings > 0, weights / (k + rankings), 0.0)
+    return contributions.sum(axis=0)
@@ -0,0 +1,170 @@
+"""
+Memory Id Index
+Memory id -> table position, maintained on every add, update and delete so
+get/update/delete by id never scan the corpus.
+"""
+
+import json
+from bisect import insort
+from typing import Any, Dict, Iterable, Optional
+
+from .chunked import ChunkedDict
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def id_key(memory_id) -> Any:
+    """Hashable, type-exact form of a memory id (int and str ids as is)"""
+    if type(memory_id) in (int, str):
+        return memory_id
+    return json.dumps(memory_id, sort_keys=True)
+
+
+class IdIndex:
+    """
+    Positions of the live memories by id
+
+    Ids should be unique, but hand-edited files can repeat one: every
+    position is kept, and get() returns the lowest, so removing it exposes
+    the next.
+
+    Loaded from a snapshot, integer ids are looked up by bisecting a
+    sorted array until the first add() or remove() converts it back.
+
+    Both tables are ChunkedDicts, so a fork copies only their shard
+    tables; the lists in _more are replaced, never changed in place.
+    """
+
+    def __init__(self):
+        self._positions = ChunkedDict()   # id key -> lowest position
+        self._more = ChunkedDict()        # id key -> further positions, sorted
+        # (sorted int64 ids, positions) for the integer ids of a snapshot
+        self._frozen: Optional[tuple] = None
+
+    def build(self, memories: Iterable[Dict]):
+        """Index a full corpus (positions follow iteration order)"""
+        self.__init__()
+        self.extend(memories, 0)
+
+    def extend(self, memories: Iterable[Dict], start: int):
+        """Index a batch of appended memories, the first at position `start`"""
+        if self._frozen is not None:
+            self._thaw()
+        positions = self._positions
+        for pos, memory in enumerate(memories, start):
+            key = id_key(memory.get('id'))
+            if key in positions:
+                self._add_duplicate(key, pos)
+            else:
+                positions[key] = pos
+
+    def add(self, memory: Dict, pos: int):
+        """Index one memory (appended, or re-added at its old position)"""
+        if self._frozen is not None:
+            self._thaw()
+        key = id_key(memory.get('id'))
+        if key in self._positions:
+            self._add_duplicate(key, pos)
+        else:
+            self._positions[key] = pos
+
+    def _add_duplicate(self, key, pos: int):
+        first = self._positions[key]
+        if pos < first:
+            self._positions[key], pos = pos, first
+        more = list(self._more.get(key, ()))
+        insort(more, pos)
+        self._more[key] = more
+
+    def remove(self, memory: Dict, pos: int):
+        """Drop the memory at `pos` (KeyError if it isn't indexed there)"""
+        if self._frozen is not None:
+            self._thaw()
+        key = id_key(memory.get('id'))
+        more = self._more.get(key)
+        if self._positions.get(key) == pos:
+            if more:
+                self._positions[key] = more[0]
+                more = more[1:]
+            else:
+                del self._positions[key]
+        elif more and pos in more:
+            more = [p for p in more if p != pos]
+        else:
+            raise KeyError(f"memory {memory.get('id')!r} is not indexed at position {pos}")
+        if more:
+            self._more[key] = more
+        elif more is not None:
+            del self._more[key]
+
+    def get(self, memory_id) -> Optional[int]:
+        """Position of the memory with this id (the first of duplicates), or None"""
+        key = id_key(memory_id)
+        if self._frozen is not None and type(key) is int:
+            ids, positions = self._frozen
+            if not INT64_MIN <= key <= INT64_MAX:
+                return self._positions.get(key)
+            i = int(np.searchsorted(ids, key))
+            if i < len(ids) and ids[i] == key:
+                return int(positions[i])
+        return self._positions.get(key)
+
+    def __contains__(self, memory_id) -> bool:
+        return self.get(memory_id) is not None
+
+    def __len__(self) -> int:
+        """Number of distinct ids"""
+        frozen = len(self._frozen[0]) if self._frozen is not None else 0
+        return frozen + len(self._positions)
+
+    def fork(self) -> "IdIndex":
+        """Copy that takes add() and remove() without changing this index"""
+        clone = IdIndex()
+        clone._positions = self._positions.copy()
+        clone._more = self._more.copy()
+        clone._frozen = self._frozen
+        return clone
+
+    def nbytes(self) -> int:
+        """Approximate resident size"""
+        frozen = sum(array.nbytes for array in self._frozen) if self._frozen is not None else 0
+        return frozen + 100 * len(self._positions) + sum(8 * len(p) + 56 for p in self._more.values())
+
+    # ══════════════════════════════════════════════════════════════════════
+    # SNAPSHOT
+    # ══════════════════════════════════════════════════════════════════════
+
+    def export_state(self) -> tuple:
+        """(meta, arrays) for a CorpusSnapshot"""
+        if self._frozen is not None:
+            ids, positions = self._frozen
+            other = self._positions
+        else:
+            numeric = sorted((key, pos) for key, pos in self._positions.items()
+                             if type(key) is int and INT64_MIN <= key <= INT64_MAX)
+            ids = np.array([key for key, _ in numeric], dtype=np.int64)
+            positions = np.array([pos for _, pos in numeric], dtype=np.int64)
+            other = {key: pos for key, pos in self._positions.items()
+                     if not (type(key) is int and INT64_MIN <= key <= INT64_MAX)}
+        # JSON meta keeps int and str keys apart as [key, ...] pairs
+        meta = {'other': [[key, pos] for key, pos in other.items()],
+                'more': [[key, extra] for key, extra in self._more.items()]}
+        return meta, {'ids': ids, 'positions': positions}
+
+    def load_state(self, meta: Dict, arrays: Dict[str, "np.ndarray"]):
+        """Serve get() straight from (possibly memory-mapped) snapshot arrays"""
+        self.__init__()
+        self._positions = ChunkedDict((key, pos) for key, pos in meta['other'])
+        self._more = ChunkedDict((key, list(positions)) for key, positions in meta['more'])
+        self._frozen = (arrays['ids'], arrays['positions'])
+
+    def _thaw(self):
+        ids, positions = self._frozen
+        self._frozen = None
+        self._positions.update(zip(ids.tolist(), positions.tolist()))
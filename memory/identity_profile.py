@@ -0,0 +1,111 @@
+"""
+Identity Profile
+Her identity/family/personality memories kept pre-sorted by importance, so
+the girlfriend-identity fast path is a slice instead of a corpus scan.
+"""
+
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Set
+
+from .chunked import ChunkedList
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class IdentityProfile:
+    """
+    Identity memory positions ordered by importance (desc), then position
+
+    Same order as a stable sort of the identity memories by importance,
+    which is what the fast path used to compute per request.
+    """
+
+    def __init__(self, categories: Iterable[str]):
+        self.categories = frozenset(categories)
+        self._ranked = ChunkedList()   # (-importance, position)
+        # (neg_importance, positions) arrays while loaded from a snapshot
+        self._frozen: Optional[tuple] = None
+
+    def build(self, memories: Iterable[Dict]):
+        """Rank a full corpus (positions follow iteration order)"""
+        self._ranked = ChunkedList()
+        self._frozen = None
+        self.extend(memories, 0)
+
+    def extend(self, memories: Iterable[Dict], start: int):
+        """Rank a batch of appended memories, the first at position `start`"""
+        if self._frozen is not None:
+            self._thaw()
+        self._ranked.update(
+            (-memory.get('importance', 0), pos)
+            for pos, memory in enumerate(memories, start)
+            if memory.get('category', '') in self.categories
+        )
+
+    def add(self, memory: Dict, pos: int):
+        """Rank one appended memory (ignored unless it's an identity memory)"""
+        if memory.get('category', '') in self.categories:
+            if self._frozen is not None:
+                self._thaw()
+            self._ranked.add((-memory.get('importance', 0), pos))
+
+    def remove(self, memory: Dict, pos: int):
+        """Drop the memory at `pos` from the ranking (if it was ranked)"""
+        if memory.get('category', '') in self.categories:
+            if self._frozen is not None:
+                self._thaw()
+            self._ranked.discard((-memory.get('importance', 0), pos))
+
+    def fork(self) -> "IdentityProfile":
+        """Copy that takes add() and remove() without changing this profile (shares unchanged chunks)"""
+        clone = IdentityProfile(self.categories)
+        clone._ranked = self._ranked.copy()
+        clone._frozen = self._frozen
+        return clone
+
+    def nbytes(self) -> int:
+        """Approximate resident size"""
+        if self._frozen is not None:
+            return sum(array.nbytes for array in self._frozen)
+        return len(self._ranked) * 120  # List slot, tuple, two ints
+
+    def top(self, k: int, within: Optional[Set[int]] = None) -> List[int]:
+        """Positions of the k most important identity memories (only those in `within`, if given)"""
+        if within is not None:
+            ranked = self._frozen[1].tolist() if self._frozen is not None else (pos for _, pos in self._ranked)
+            return list(islice((pos for pos in ranked if pos in within), k))
+        if self._frozen is not None:
+            return self._frozen[1][:k].tolist()
+        return [pos for _, pos in self._ranked[:k]]
+
+    def __len__(self) -> int:
+        if self._frozen is not None:
+            return len(self._frozen[1])
+        return len(self._ranked)
+
+    # ══════════════════════════════════════════════════════════════════════
+    # SNAPSHOT
+    # ══════════════════════════════════════════════════════════════════════
+
+    def export_state(self) -> tuple:
+        """(meta, arrays) for a CorpusSnapshot"""
+        if self._frozen is not None:
+            neg_importance, positions = self._frozen
+        else:
+            neg_importance = np.array([entry[0] for entry in self._ranked], dtype=np.float64)
+            positions = np.array([entry[1] for entry in self._ranked], dtype=np.int64)
+        return {}, {'neg_importance': neg_importance, 'positions': positions}
+
+    def load_state(self, meta: Dict, arrays: Dict[str, "np.ndarray"]):
+        """Serve top() straight from (possibly memory-mapped) snapshot arrays"""
+        self._ranked = ChunkedList()
+        self._frozen = (arrays['neg_importance'], arrays['positions'])
+
+    def _thaw(self):
+        neg_importance, positions = self._frozen
+        self._frozen = None
+        self._ranked = ChunkedList(zip(neg_importance.tolist(), positions.tolist()))
@@ -0,0 +1,96 @@
+"""
+Bulk Memory Ingestion
+Streams memory records out of JSONL or CSV exports and validates them for
+MemoryAgent.import_memories(), which dedupes them, allocates ids and
+builds every index in one pass.
+"""
+
+import csv
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+DEFAULT_CATEGORY = 'imported'
+DEFAULT_IMPORTANCE = 5
+
+FORMATS = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.csv': 'csv'}
+
+
+def read_records(path: str, format: Optional[str] = None) -> Iterator[Optional[Dict]]:
+    """
+    Stream raw records from a JSONL or CSV file
+
+    Args:
+        path: File to read
+        format: 'jsonl' or 'csv' (default: from the file extension)
+
+    Yields:
+        One dict per record; None for a JSONL line that is not valid JSON
+    """
+    if format is None:
+        format = FORMATS.get(os.path.splitext(path)[1].lower())
+    if format not in ('jsonl', 'csv'):
+        raise ValueError(f"Unknown import format for {path}. Use .jsonl or .csv")
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if format == 'csv':
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield None
+
+
+def validate_record(record) -> Dict:
+    """
+    Normalize one raw record into a memory without an id
+
+    Only content is required. Category defaults to DEFAULT_CATEGORY,
+    importance to DEFAULT_IMPORTANCE and date to today; extra fields are
+    kept. Raises ValueError for a record that cannot become a memory.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("not a JSON object")
+
+    content = record.get('content')
+    if not isinstance(content, str) or not content.strip():
+        raise ValueError("missing content")
+
+    category = record.get('category') or DEFAULT_CATEGORY
+    if not isinstance(category, str):
+        raise ValueError(f"bad category {category!r}")
+    category = '_'.join(category.lower().split()) or DEFAULT_CATEGORY
+
+    importance = record.get('importance')
+    if importance in (None, ''):
+        importance = DEFAULT_IMPORTANCE
+    else:
+        try:
+            importance = int(float(importance))
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"bad importance {importance!r}")
+        if not 1 <= importance <= 10:
+            raise ValueError(f"importance {importance} outside 1-10")
+
+    date = record.get('date') or datetime.now().strftime('%Y-%m-%d')
+    try:
+        datetime.strptime(date, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise ValueError(f"bad date {date!r} (expected YYYY-MM-DD)")
+
+    memory = {'category': category, 'content': content.strip(), 'date': date, 'importance': importance}
+    for key, value in record.items():
+        # Ids are allocated on import; None keys are surplus CSV cells
+        if isinstance(key, str) and key not in memory and key != 'id' and value not in (None, ''):
+            memory[key] = value
+    return memory
+
+
+def dedupe_key(content: str) -> str:
+    """Content with case and whitespace folded; equal keys are duplicates"""
+    return ' '.join(content.lower().split())
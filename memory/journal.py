@@ -0,0 +1,159 @@
+"""
+Memory Write-Ahead Journal
+Append-only JSONL journal next to the memories.json snapshot.
+
+Each write appends one record instead of re-serializing the whole corpus;
+the journal is replayed on load and periodically compacted into a new
+snapshot that is written to a temp file and atomically renamed.
+"""
+
+import json
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class MemoryJournal:
+    """
+    Write-ahead journal for a memories.json snapshot
+
+    Records look like {"seq": 12, "op": "add", "memory": {...}}, where op
+    is "add", "update" (memory is the new version) or "delete" (memory is
+    just {"id": ...}). The snapshot stores the last seq it contains as
+    "journal_seq", so a crash between writing the snapshot and truncating
+    the journal never applies a record twice.
+    """
+
+    def __init__(self, snapshot_file: str, compact_records: int = 1000,
+                 compact_bytes: int = 1_000_000):
+        """
+        Args:
+            snapshot_file: Path of the memories.json snapshot
+            compact_records: Compact once the journal holds this many records
+            compact_bytes: ...or once the journal file reaches this size
+        """
+        root, _ = os.path.splitext(snapshot_file)
+        self.snapshot_file = snapshot_file
+        self.path = f"{root}.journal.jsonl"
+        self.compact_records = compact_records
+        self.compact_bytes = compact_bytes
+        self.seq = 0
+        self.records = 0
+
+    # ══════════════════════════════════════════════════════════════════════
+    # LOAD
+    # ══════════════════════════════════════════════════════════════════════
+
+    def replay(self, snapshot_seq: int, apply: Callable[[str, Dict], None]) -> int:
+        """
+        Re-apply journal records newer than the snapshot
+
+        Args:
+            snapshot_seq: "journal_seq" stored in the loaded snapshot
+            apply: Called with (op, memory) for every record to replay
+
+        Returns:
+            Number of records applied
+        """
+        self.seq = snapshot_seq
+        self.records = 0
+        if not os.path.exists(self.path):
+            return 0
+
+        applied = 0
+        good_offset = 0
+        for record, size in self._read():
+            if record is None:
+                # Torn final write from a crash: drop it so new appends start clean
+                print(f"⚠️  Dropping truncated journal record in {self.path}")
+                break
+            good_offset += size
+            self.records += 1
+            if record['seq'] <= self.seq:
+                continue
+            apply(record['op'], record['memory'])
+            self.seq = record['seq']
+            applied += 1
+        if good_offset < os.path.getsize(self.path):
+            os.truncate(self.path, good_offset)
+        return applied
+
+    def pending(self, snapshot_seq: int = 0) -> List[Dict]:
+        """Records replay() would apply, read without applying or repairing anything"""
+        records = []
+        for record, _ in self._read():
+            if record is None:
+                break
+            if record['seq'] > snapshot_seq:
+                records.append(record)
+        return records
+
+    def _read(self) -> Iterator[Tuple[Optional[Dict], int]]:
+        """(record, bytes) per line; record is None for a torn or unparseable line"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line.decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    record = None
+                yield (record if line.endswith(b'\n') else None), len(line)
+
+    def checkpoint(self) -> Dict:
+        """Position after a replay, to restore() without replaying again"""
+        return {'seq': self.seq, 'records': self.records}
+
+    def restore(self, checkpoint: Dict):
+        self.seq = checkpoint['seq']
+        self.records = checkpoint['records']
+
+    # ══════════════════════════════════════════════════════════════════════
+    # WRITE
+    # ══════════════════════════════════════════════════════════════════════
+
+    def append(self, op: str, memory: Dict):
+        """Durably append one record"""
+        self.seq += 1
+        line = json.dumps({'seq': self.seq, 'op': op, 'memory': memory}, ensure_ascii=False)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.records += 1
+
+    def should_compact(self) -> bool:
+        """True once the journal passed its record or byte threshold"""
+        if self.records >= self.compact_records:
+            return True
+        try:
+            return os.path.getsize(self.path) >= self.compact_bytes
+        except OSError:
+            return False
+
+    def compact(self, memories: List[Dict], extra: Optional[Dict] = None):
+        """
+        Write a full snapshot atomically, then truncate the journal
+
+        Args:
+            memories: Complete current corpus
+            extra: Additional top-level snapshot fields
+        """
+        # Small fields first, so a streaming reader has them before the memories
+        data = {'journal_seq': self.seq}
+        if extra:
+            data.update(extra)
+        data['memories'] = memories
+        write_atomic_json(self.snapshot_file, data)
+        with open(self.path, 'w', encoding='utf-8'):
+            pass
+        self.records = 0
+
+
+def write_atomic_json(path: str, data: Dict):
+    """Write JSON to a temp file, fsync it and rename it over `path`"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,105 @@
+"""
+Streaming JSON Reader
+Yields the elements of one top-level array of a large JSON object, such as
+the "memories" list of memories.json, while reading the file in chunks.
+Only the current chunk and element are held, never the whole parse tree.
+"""
+
+import json
+from typing import Any, Dict, Iterator
+
+DELIMITERS = frozenset(',:]} \t\r\n')
+
+
+class _ChunkedReader:
+    """Text buffer over a file that refills while values are decoded"""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Append one chunk (dropping consumed text); False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, chars: str) -> str:
+        """Consume one of `chars` after optional whitespace"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r}, found {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next JSON value, reading more until it is complete"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number can run past the buffer ("1." of "1.5"): only trust
+            # a value followed by a delimiter that is already buffered
+            if (end == len(self.buf) or self.buf[end] not in DELIMITERS) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(path: str, key: str, fields: Dict, chunk_size: int = 1 << 20) -> Iterator[Any]:
+    """
+    Stream the elements of the array stored under `key` in a JSON object
+
+    Args:
+        path: File holding one JSON object
+        key: Top-level key of the array to stream
+        fields: Receives every other top-level value (usually small),
+                complete once the generator is exhausted
+        chunk_size: Characters read per refill
+
+    Raises:
+        ValueError: The file is not an object, or `key` is not an array
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _ChunkedReader(f, chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            name = reader.value()
+            reader.expect(':')
+            if name == key:
+                reader.expect('[')
+                if reader.peek() == ']':
+                    reader.pos += 1
+                else:
+                    while True:
+                        yield reader.value()
+                        if reader.expect(',]') == ']':
+                            break
+            else:
+                fields[name] = reader.value()
+            if reader.expect(',}') == '}':
+                return
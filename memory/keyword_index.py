@@ -0,0 +1,548 @@
+"""
+Keyword Index for Memory Retrieval
+Inverted index built once at load time so the keyword scorer only touches
+memories that can actually match a query.
+"""
+
+import copy
+from itertools import groupby
+from typing import Dict, List, Optional, Set, Iterable, Tuple
+
+from .trigger_matcher import AhoCorasick
+from .text_features import MemoryText, text_of
+from .columnar import id_sort_key
+from .chunked import ChunkedDict, ChunkedList
+from .snapshot import StringTable, encode_strings
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def _pack_trigram(trigram: str) -> int:
+    """Three code points (21 bits each) in one int64 key"""
+    return (ord(trigram[0]) << 42) | (ord(trigram[1]) << 21) | ord(trigram[2])
+
+
+def _runs(postings: Iterable[int]) -> Tuple[List[int], List[int]]:
+    """(distinct positions, times each is repeated) of a sorted posting list"""
+    positions, counts = [], []
+    for pos, run in groupby(postings):
+        positions.append(pos)
+        counts.append(sum(1 for _ in run))
+    return positions, counts
+
+
+def _csr(groups: List[List[int]], dtype) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Concatenate lists into (offsets, values)"""
+    offsets = np.zeros(len(groups) + 1, dtype=np.int64)
+    if groups:
+        np.cumsum([len(g) for g in groups], out=offsets[1:])
+    values = np.fromiter((v for g in groups for v in g), dtype=dtype, count=int(offsets[-1]))
+    return offsets, values
+
+
+def _compile_groups(keyword_groups: Dict[str, Dict]) -> tuple:
+    """(phrases, group masks, group categories, phrase automaton, pattern masks) of keyword groups"""
+    # Assign one bit per (group, content_match) entry
+    phrases: List[str] = []
+    group_masks: Dict[str, int] = {}
+    group_categories: Dict[str, Set[str]] = {}
+    for group_name, group_info in keyword_groups.items():
+        mask = 0
+        for phrase in group_info['content_matches']:
+            mask |= 1 << len(phrases)
+            phrases.append(phrase)
+        group_masks[group_name] = mask
+        group_categories[group_name] = set(group_info['categories'])
+
+    # One automaton pass per memory finds every content_match phrase
+    automaton = AhoCorasick(phrases)
+    pattern_masks = [0] * len(automaton.patterns)
+    for bit, phrase in enumerate(phrases):
+        pattern_masks[automaton.patterns.index(phrase)] |= 1 << bit
+    return phrases, group_masks, group_categories, automaton, pattern_masks
+
+
+# keyword groups fingerprint -> _compile_groups() result
+_compiled_groups: Dict[str, tuple] = {}
+
+
+class KeywordIndex:
+    """
+    Precompiled inverted index over memory content
+
+    - token postings: whitespace token -> memory positions
+    - category postings: lowercased category -> memory positions
+    - group postings: memories holding any of a group's content_match
+      phrases, with the number of distinct phrases found (counted with a
+      one-bit-per-phrase mask, a single AND + popcount per group)
+
+    Loaded from a snapshot, the same lookups run on read-only CSR arrays;
+    the first write converts them back to the Python structures.
+    """
+
+    # Vocabulary lookups are cached per query word; cleared on every write
+    MAX_CACHED_WORDS = 4096
+
+    def __init__(self, keyword_groups: Dict[str, Dict], fingerprint: Optional[str] = None):
+        """
+        Args:
+            keyword_groups: Group name -> content_matches, categories, boost
+            fingerprint: Hash of keyword_groups; when given, the phrase
+                         automaton is compiled once per process and shared
+                         (read-only) by every index with that fingerprint
+        """
+        self.keyword_groups = keyword_groups
+        compiled = _compiled_groups.get(fingerprint) if fingerprint is not None else None
+        if compiled is None:
+            compiled = _compile_groups(keyword_groups)
+            if fingerprint is not None:
+                _compiled_groups[fingerprint] = compiled
+        (self._phrases, self._group_masks, self._group_categories,
+         self._phrase_automaton, self._pattern_masks) = compiled
+        self._reset()
+
+    def _reset(self):
+        self.size = 0
+        self.token_postings = ChunkedDict()    # token -> ChunkedList of positions
+        self.category_postings: Dict[str, ChunkedList] = {}
+        # group -> ChunkedList of positions, each repeated once per distinct
+        # content_match phrase found
+        self.group_postings: Dict[str, ChunkedList] = {g: ChunkedList() for g in self.keyword_groups}
+        self._trigrams = ChunkedDict()         # trigram -> set of tokens containing it
+        self._by_importance = ChunkedList()    # (-importance, id key, position)
+        self._word_cache: Dict[str, Set[int]] = {}
+        self._frozen: Optional[Dict] = None
+        # ids of the lists and sets copied since fork() (None: all are private)
+        self._owned: Optional[Set[int]] = None
+
+    # ══════════════════════════════════════════════════════════════════════
+    # BUILDING
+    # ══════════════════════════════════════════════════════════════════════
+
+    def build(self, memories: Iterable[Dict], texts: Optional[Iterable[MemoryText]] = None):
+        """
+        Index a full corpus (positions follow iteration order)
+
+        Args:
+            memories: Memory dicts
+            texts: Their precomputed MemoryText, if already available
+        """
+        self._reset()
+        if texts is None:
+            for memory in memories:
+                self._add(memory, text_of(memory))
+        else:
+            for memory, text in zip(memories, texts):
+                self._add(memory, text)
+
+    def add(self, memory: Dict, text: Optional[MemoryText] = None, pos: Optional[int] = None) -> int:
+        """
+        Index one memory and return its position
+
+        Args:
+            memory: Memory dict
+            text: Its precomputed MemoryText, if already available
+            pos: Re-index at this position after remove() (default: append)
+        """
+        if self._frozen is not None:
+            self._thaw()
+        if text is None:
+            text = text_of(memory)
+        self._own_lists(text)
+        pos = self._add(memory, text, pos)
+        self._word_cache.clear()
+        return pos
+
+    def extend(self, memories: Iterable[Dict], texts: Iterable[MemoryText]):
+        """Index a batch of appended memories"""
+        if self._frozen is not None:
+            self._thaw()
+        for memory, text in zip(memories, texts):
+            self._own_lists(text)
+            self._add(memory, text)
+        self._word_cache.clear()
+
+    def remove(self, memory: Dict, text: MemoryText, pos: int):
+        """
+        Drop the memory at `pos` from every posting list
+
+        Its position stays allocated (size does not shrink), matching the
+        tombstoned slot in the memory table; add(..., pos=pos) fills it
+        with a new version.
+
+        Args:
+            memory: The memory as it was indexed
+            text: Its MemoryText
+            pos: Its position
+        """
+        if self._frozen is not None:
+            self._thaw()
+        self._own_lists(text)
+        for token in text.tokens:
+            postings = self.token_postings.get(token)
+            if postings is not None:
+                # Emptied lists stay: the trigram sets still name the token
+                postings.discard(pos)
+        postings = self.category_postings.get(text.category)
+        if postings is not None:
+            postings.discard(pos)
+
+        mask = self._phrase_mask(text.text)
+        for group_name, group_mask in self._group_masks.items():
+            if mask & group_mask:
+                postings = self.group_postings[group_name]
+                while postings.discard(pos):
+                    continue
+
+        self._by_importance.discard((-memory.get('importance', 5), id_sort_key(memory.get('id')), pos))
+        self._word_cache.clear()
+
+    def fork(self) -> "KeywordIndex":
+        """
+        Copy that takes add() and remove() without changing this index
+
+        Tables are copied shallowly (the large ones shard by shard);
+        add() and remove() copy every list they change first, so the two
+        indexes never share a list that changes. Posting lists are
+        ChunkedLists, whose copies share all but the chunks written.
+        """
+        clone = copy.copy(self)
+        clone.token_postings = self.token_postings.copy()
+        clone.category_postings = dict(self.category_postings)
+        clone.group_postings = dict(self.group_postings)
+        clone._trigrams = self._trigrams.copy()
+        clone._by_importance = self._by_importance.copy()
+        clone._word_cache = {}
+        clone._owned = set()
+        return clone
+
+    def nbytes(self) -> int:
+        """Approximate resident size"""
+        if self._frozen is not None:
+            return sum(array.nbytes for array in self._frozen['arrays'].values())
+        slots = (sum(map(len, self.token_postings.values()))
+                 + sum(map(len, self.category_postings.values()))
+                 + sum(map(len, self.group_postings.values())))
+        # 8 B per list slot; per memory an importance entry and its position
+        # int; per token its string and posting list; per trigram its set
+        return 8 * slots + 150 * self.size + 300 * len(self.token_postings) + 320 * len(self._trigrams)
+
+    def _own_lists(self, text: MemoryText):
+        """
+        Replace the lists and sets _add() will extend with private copies
+
+        Each is copied at most once per fork; an index that was never
+        forked owns everything already.
+        """
+        owned = self._owned
+        if owned is None:
+            return
+
+        def own(table: Dict, key):
+            shared = table.get(key)
+            if shared is not None and id(shared) not in owned:
+                table[key] = shared.copy()
+                owned.add(id(table[key]))
+
+        for token in text.tokens:
+            if token in self.token_postings:
+                own(self.token_postings, token)
+                continue
+            for i in range(len(token) - 2):
+                own(self._trigrams, token[i:i + 3])
+        own(self.category_postings, text.category)
+        for group_name in self.keyword_groups:
+            own(self.group_postings, group_name)
+
+    def _phrase_mask(self, content: str) -> int:
+        """One bit per content_match phrase found in the normalized text"""
+        mask = 0
+        for pattern_id in set(self._phrase_automaton.iter_matches(content)):
+            mask |= self._pattern_masks[pattern_id]
+        return mask
+
+    def _add(self, memory: Dict, text: MemoryText, pos: Optional[int] = None) -> int:
+        # Appends go to the end of every posting list; a re-added position is inserted
+        if pos is None:
+            pos = self.size
+            self.size += 1
+        content = text.text
+        category = text.category
+
+        for token in text.tokens:
+            postings = self.token_postings.get(token)
+            if postings is None:
+                postings = self.token_postings[token] = ChunkedList()
+                for i in range(len(token) - 2):
+                    self._trigrams.setdefault(token[i:i + 3], set()).add(token)
+            postings.add(pos)
+
+        postings = self.category_postings.get(category)
+        if postings is None:
+            postings = self.category_postings[category] = ChunkedList()
+        postings.add(pos)
+
+        mask = self._phrase_mask(content)
+        if mask:
+            for group_name, group_mask in self._group_masks.items():
+                for _ in range((mask & group_mask).bit_count()):
+                    self.group_postings[group_name].add(pos)
+
+        self._by_importance.add((-memory.get('importance', 5), id_sort_key(memory.get('id')), pos))
+        return pos
+
+    # ══════════════════════════════════════════════════════════════════════
+    # SNAPSHOT
+    # ══════════════════════════════════════════════════════════════════════
+
+    def export_state(self) -> tuple:
+        """(meta, arrays) for a CorpusSnapshot"""
+        if self._frozen is not None:
+            return self._frozen['meta'], dict(self._frozen['arrays'])
+
+        tokens = list(self.token_postings)
+        token_ids = {token: i for i, token in enumerate(tokens)}
+        token_blob, token_offsets = encode_strings(tokens)
+        posting_offsets, postings = _csr(list(self.token_postings.values()), np.int32)
+
+        trigrams = sorted((_pack_trigram(t), sorted(token_ids[token] for token in owners))
+                          for t, owners in self._trigrams.items())
+        trigram_offsets, trigram_tokens = _csr([owners for _, owners in trigrams], np.int32)
+
+        categories = list(self.category_postings)
+        category_offsets, category_positions = _csr(list(self.category_postings.values()), np.int32)
+
+        groups = list(self.keyword_groups)
+        runs = [_runs(self.group_postings[g]) for g in groups]
+        group_offsets, group_positions = _csr([positions for positions, _ in runs], np.int32)
+        _, group_counts = _csr([counts for _, counts in runs], np.int16)
+
+        meta = {'size': self.size, 'categories': categories, 'groups': groups}
+        arrays = {
+            'token_blob': token_blob,
+            'token_offsets': token_offsets,
+            'posting_offsets': posting_offsets,
+            'postings': postings,
+            'trigram_keys': np.array([key for key, _ in trigrams], dtype=np.int64),
+            'trigram_offsets': trigram_offsets,
+            'trigram_tokens': trigram_tokens,
+            'category_offsets': category_offsets,
+            'category_positions': category_positions,
+            'group_offsets': group_offsets,
+            'group_positions': group_positions,
+            'group_counts': group_counts,
+            'importance_neg': np.array([e[0] for e in self._by_importance], dtype=np.float64),
+            'importance_ids': np.array([e[1] for e in self._by_importance], dtype=np.float64),
+            'importance_positions': np.array([e[2] for e in self._by_importance], dtype=np.int64)
+        }
+        return meta, arrays
+
+    def load_state(self, meta: Dict, arrays: Dict[str, "np.ndarray"]):
+        """Serve lookups straight from (possibly memory-mapped) snapshot arrays"""
+        self._reset()
+        self.size = meta['size']
+        self._frozen = {
+            'meta': meta,
+            'arrays': arrays,
+            'tokens': StringTable(arrays['token_blob'], arrays['token_offsets']),
+            'categories': {category: row for row, category in enumerate(meta['categories'])},
+            'groups': {group_name: row for row, group_name in enumerate(meta['groups'])}
+        }
+
+    def _thaw(self):
+        """Rebuild the Python structures from the snapshot arrays before a write"""
+        frozen, arrays = self._frozen, self._frozen['arrays']
+        self._frozen = None
+        self._owned = None
+
+        tokens = list(frozen['tokens'])
+        offsets = arrays['posting_offsets'].tolist()
+        postings = arrays['postings'].tolist()
+        self.token_postings = ChunkedDict(
+            (token, ChunkedList(postings[offsets[i]:offsets[i + 1]])) for i, token in enumerate(tokens)
+        )
+        trigrams: Dict[str, Set[str]] = {}
+        for token in tokens:
+            for i in range(len(token) - 2):
+                trigrams.setdefault(token[i:i + 3], set()).add(token)
+        self._trigrams = ChunkedDict(trigrams)
+
+        offsets = arrays['category_offsets'].tolist()
+        positions = arrays['category_positions'].tolist()
+        self.category_postings = {
+            category: ChunkedList(positions[offsets[i]:offsets[i + 1]])
+            for i, category in enumerate(frozen['meta']['categories'])
+        }
+        for group_name in self.keyword_groups:
+            positions, counts = self._frozen_group_entries(frozen, group_name)
+            self.group_postings[group_name] = ChunkedList(
+                pos for pos, matches in zip(positions, counts) for _ in range(matches))
+        self._by_importance = ChunkedList(zip(arrays['importance_neg'].tolist(),
+                                              arrays['importance_ids'].tolist(),
+                                              arrays['importance_positions'].tolist()))
+
+    @staticmethod
+    def _frozen_group_entries(frozen: Dict, group_name: str) -> Tuple[List[int], List[int]]:
+        row = frozen['groups'].get(group_name)
+        if row is None:
+            return [], []
+        arrays = frozen['arrays']
+        start, end = arrays['group_offsets'][row], arrays['group_offsets'][row + 1]
+        return arrays['group_positions'][start:end].tolist(), arrays['group_counts'][start:end].tolist()
+
+    # ══════════════════════════════════════════════════════════════════════
+    # LOOKUPS
+    # ══════════════════════════════════════════════════════════════════════
+
+    def _category_positions(self, category: str) -> List[int]:
+        if self._frozen is None:
+            return list(self.category_postings.get(category, ()))
+        row = self._frozen['categories'].get(category)
+        if row is None:
+            return []
+        arrays = self._frozen['arrays']
+        start, end = arrays['category_offsets'][row], arrays['category_offsets'][row + 1]
+        return arrays['category_positions'][start:end].tolist()
+
+    def _group_entries(self, group_name: str) -> Tuple[List[int], List[int]]:
+        """(positions, distinct content_match phrases found) for one group"""
+        if self._frozen is None:
+            return _runs(self.group_postings[group_name])
+        return self._frozen_group_entries(self._frozen, group_name)
+
+    def _frozen_positions_containing(self, word: str) -> Set[int]:
+        frozen, arrays = self._frozen, self._frozen['arrays']
+        tokens = frozen['tokens']
+        if len(word) < 3:
+            token_ids = [i for i, token in enumerate(tokens) if word in token]
+        else:
+            keys = arrays['trigram_keys']
+            offsets = arrays['trigram_offsets']
+            best = None
+            for i in range(len(word) - 2):
+                key = _pack_trigram(word[i:i + 3])
+                row = int(np.searchsorted(keys, key))
+                if row == len(keys) or keys[row] != key:
+                    return set()
+                span = (offsets[row], offsets[row + 1])
+                if best is None or span[1] - span[0] < best[1] - best[0]:
+                    best = span
+            candidates = arrays['trigram_tokens'][best[0]:best[1]].tolist()
+            token_ids = [i for i in candidates if word in tokens[i]]
+
+        offsets = arrays['posting_offsets']
+        postings = arrays['postings']
+        spans = [postings[offsets[i]:offsets[i + 1]] for i in token_ids]
+        if not spans:
+            return set()
+        return set(np.concatenate(spans).tolist())
+
+    def positions_containing(self, word: str) -> Set[int]:
+        """
+        Positions whose content contains `word` as a substring.
+        A whitespace-free word can only occur inside a single token, so the
+        vocabulary (narrowed by trigram) is searched instead of the corpus.
+        """
+        cached = self._word_cache.get(word)
+        if cached is not None:
+            return cached
+
+        if self._frozen is not None:
+            positions = self._frozen_positions_containing(word)
+        else:
+            if len(word) < 3:
+                tokens = [t for t in self.token_postings if word in t]
+            else:
+                candidates = min(
+                    (self._trigrams.get(word[i:i + 3], ()) for i in range(len(word) - 2)),
+                    key=len
+                )
+                tokens = [t for t in candidates if word in t]
+
+            positions = set()
+            for token in tokens:
+                positions.update(self.token_postings[token])
+
+        if len(self._word_cache) >= self.MAX_CACHED_WORDS:
+            self._word_cache.clear()
+        self._word_cache[word] = positions
+        return positions
+
+    def match_scores(self, query_lower: str, groups: Iterable[str]) -> Dict[int, float]:
+        """
+        Word + keyword-group score for every candidate memory
+
+        Args:
+            query_lower: Lowercased query
+            groups: Keyword groups triggered by the query
+
+        Returns:
+            Position -> score (importance not included)
+        """
+        scores: Dict[int, float] = {}
+
+        # Direct word matching (base score)
+        for word in query_lower.split():
+            if len(word) > 2:
+                for pos in self.positions_containing(word):
+                    scores[pos] = scores.get(pos, 0) + 3
+
+        for group_name in groups:
+            boost = self.keyword_groups[group_name]['boost']
+
+            # Category match boost
+            for category in self._group_categories[group_name]:
+                for pos in self._category_positions(category):
+                    scores[pos] = scores.get(pos, 0) + boost
+
+            # Content match boost
+            positions, counts = self._group_entries(group_name)
+            for pos, matches in zip(positions, counts):
+                scores[pos] = scores.get(pos, 0) + matches * 15
+
+        return scores
+
+    def group_score_matrix(self, groups: List[str]) -> "np.ndarray":
+        """
+        Dense group scores for batch scoring (needs numpy)
+
+        Returns:
+            float64 array of shape (len(groups), corpus size); row i holds
+            group i's category boost + content match score per memory
+        """
+        matrix = np.zeros((len(groups), self.size))
+        for row, group_name in enumerate(groups):
+            boost = self.keyword_groups[group_name]['boost']
+            for category in self._group_categories[group_name]:
+                postings = self._category_positions(category)
+                if postings:
+                    matrix[row, postings] += boost
+
+            positions, counts = self._group_entries(group_name)
+            if positions:
+                matrix[row, positions] += np.asarray(counts, dtype=np.float64) * 15
+        return matrix
+
+    def top_by_importance(self, k: int, exclude: Set[int] = frozenset()) -> List[tuple]:
+        """First k (-importance, id key, position) entries not in `exclude`"""
+        if self._frozen is not None:
+            # At most len(exclude) of the first k + len(exclude) entries are skipped
+            arrays = self._frozen['arrays']
+            limit = k + len(exclude)
+            entries = zip(arrays['importance_neg'][:limit].tolist(),
+                          arrays['importance_ids'][:limit].tolist(),
+                          arrays['importance_positions'][:limit].tolist())
+        else:
+            entries = self._by_importance
+
+        result = []
+        for entry in entries:
+            if len(result) >= k:
+                break
+            if entry[2] not in exclude:
+                result.append(entry)
+        return result
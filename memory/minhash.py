@@ -0,0 +1,211 @@
+"""
+MinHash Near-Duplicate Index
+MinHash signatures over memory word shingles, banded into an LSH table, so
+a new memory finds its likely near-duplicates without being compared to
+the whole corpus. Callers confirm candidates with exact Jaccard similarity.
+"""
+
+import copy
+import re
+import zlib
+from typing import Dict, FrozenSet, Iterable, Tuple
+
+from .chunked import ChunkedSet
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Prime above every crc32 shingle hash: (a * x + b) % PRIME permutes them
+PRIME = (1 << 32) + 15
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Word shingles of a memory's text (case folded, punctuation dropped)"""
+    return frozenset(WORD_PATTERN.findall(text.lower()))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two shingle sets (0.0 if either is empty)"""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class MinHashLSH:
+    """
+    Banded MinHash index from band keys to memory positions
+
+    A signature has bands * rows minimum hashes. Two memories become
+    candidates when every row of some band agrees, which happens with
+    probability 1 - (1 - J^rows)^bands for Jaccard similarity J: with the
+    defaults about 0.94 at J = 0.6 and 0.002 at J = 0.1.
+
+    Band keys live in one sorted uint64 array searched for all bands at
+    once, plus an unsorted tail of recent inserts that is merged in once
+    it fills. Arrays are never written below their published size, so
+    fork() shares them. Removed memories keep their keys and are filtered
+    out of candidates().
+    """
+
+    TAIL_KEYS = 1 << 12
+
+    def __init__(self, bands: int = 20, rows: int = 4, seed: int = 1):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("Near-duplicate detection needs numpy. Install: pip install numpy")
+        self.bands = bands
+        self.rows = rows
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        # a < 2^32 keeps a * x + b below 2^64 for 32-bit x
+        self._a = rng.integers(1, 1 << 32, bands * rows, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, bands * rows, dtype=np.uint64)
+        # Odd multipliers fold a band's rows into one key; salts keep bands apart
+        self._mix = rng.integers(0, 1 << 63, (bands, rows), dtype=np.uint64) | np.uint64(1)
+        self._salt = rng.integers(0, 1 << 63, bands, dtype=np.uint64)
+
+        self._keys = np.empty(0, dtype=np.uint64)        # Sorted band keys
+        self._positions = np.empty(0, dtype=np.int64)    # Memory position per key
+        self._tail_keys = np.empty(self.TAIL_KEYS, dtype=np.uint64)
+        self._tail_positions = np.empty(self.TAIL_KEYS, dtype=np.int64)
+        self._tail_size = 0
+        self._removed = ChunkedSet()
+
+    def __len__(self) -> int:
+        """Number of indexed band keys"""
+        return len(self._keys) + self._tail_size
+
+    # ══════════════════════════════════════════════════════════════════════
+    # HASHING
+    # ══════════════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def _shingle_hashes(shingle_set: Iterable[str]) -> "np.ndarray":
+        return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingle_set), dtype=np.uint64)
+
+    def _band_keys(self, signatures: "np.ndarray") -> "np.ndarray":
+        """(n, bands * rows) signatures -> (n, bands) band keys"""
+        banded = signatures.reshape(len(signatures), self.bands, self.rows)
+        return (banded * self._mix).sum(axis=2, dtype=np.uint64) ^ self._salt
+
+    def signature(self, shingle_set: FrozenSet[str]) -> "np.ndarray":
+        """MinHash signature of a non-empty shingle set"""
+        hashes = self._shingle_hashes(shingle_set)
+        return ((hashes[:, None] * self._a + self._b) % PRIME).min(axis=0)
+
+    # ══════════════════════════════════════════════════════════════════════
+    # INDEX
+    # ══════════════════════════════════════════════════════════════════════
+
+    def build(self, shingle_sets: Iterable[FrozenSet[str]]):
+        """Index a full corpus (positions follow iteration order)"""
+        self._keys = np.empty(0, dtype=np.uint64)
+        self._positions = np.empty(0, dtype=np.int64)
+        self._tail_size = 0
+        self._removed = ChunkedSet()
+        self.add_batch(0, shingle_sets)
+
+    def add_batch(self, start: int, shingle_sets: Iterable[FrozenSet[str]], chunk: int = 2048):
+        """Index a batch of appended memories, the first at position `start`"""
+        keys, positions = [self._tail_keys[:self._tail_size]], [self._tail_positions[:self._tail_size]]
+        shingle_sets = list(shingle_sets)
+        for offset in range(0, len(shingle_sets), chunk):
+            batch = [(pos, s) for pos, s in enumerate(shingle_sets[offset:offset + chunk], start + offset) if s]
+            if not batch:
+                continue
+            hashes = [self._shingle_hashes(s) for _, s in batch]
+            starts = np.cumsum([0] + [len(h) for h in hashes[:-1]])
+            permuted = (np.concatenate(hashes)[:, None] * self._a + self._b) % PRIME
+            band_keys = self._band_keys(np.minimum.reduceat(permuted, starts, axis=0))
+            keys.append(band_keys.ravel())
+            positions.append(np.repeat(np.array([pos for pos, _ in batch], dtype=np.int64), self.bands))
+
+        keys, positions = np.concatenate(keys), np.concatenate(positions)
+        order = np.argsort(keys, kind='stable')
+        keys, positions = keys[order], positions[order]
+        at = np.searchsorted(self._keys, keys, side='right')
+        self._keys, self._positions = np.insert(self._keys, at, keys), np.insert(self._positions, at, positions)
+        self._tail_keys = np.empty(self.TAIL_KEYS, dtype=np.uint64)
+        self._tail_positions = np.empty(self.TAIL_KEYS, dtype=np.int64)
+        self._tail_size = 0
+
+    def add(self, pos: int, shingle_set: FrozenSet[str]):
+        """Index one appended memory (memories without words are skipped)"""
+        if not shingle_set:
+            return
+        if self._tail_size + self.bands > len(self._tail_keys):
+            self._keys, self._positions = self._merged()
+            self._tail_keys = np.empty(self.TAIL_KEYS, dtype=np.uint64)
+            self._tail_positions = np.empty(self.TAIL_KEYS, dtype=np.int64)
+            self._tail_size = 0
+        end = self._tail_size + self.bands
+        self._tail_keys[self._tail_size:end] = self._band_keys(self.signature(shingle_set)[None])[0]
+        self._tail_positions[self._tail_size:end] = pos
+        self._tail_size = end
+
+    def remove(self, pos: int):
+        """Stop proposing the memory at `pos` as a candidate"""
+        self._removed.add(pos)
+
+    def _merged(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Sorted keys and positions with the tail folded in (new arrays)"""
+        size = self._tail_size
+        order = np.argsort(self._tail_keys[:size], kind='stable')
+        tail_keys = self._tail_keys[:size][order]
+        at = np.searchsorted(self._keys, tail_keys, side='right')
+        return (np.insert(self._keys, at, tail_keys),
+                np.insert(self._positions, at, self._tail_positions[:size][order]))
+
+    def candidates(self, shingle_set: FrozenSet[str]) -> "np.ndarray":
+        """Positions sharing at least one band with the shingle set"""
+        if not shingle_set or not len(self):
+            return np.empty(0, dtype=np.int64)
+        keys = self._band_keys(self.signature(shingle_set)[None])[0]
+        lo = np.searchsorted(self._keys, keys, side='left')
+        hi = np.searchsorted(self._keys, keys, side='right')
+        found = [self._positions[start:end] for start, end in zip(lo, hi) if end > start]
+        size = self._tail_size
+        if size:
+            found.append(self._tail_positions[:size][np.isin(self._tail_keys[:size], keys)])
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        positions = np.unique(np.concatenate(found))
+        if self._removed:
+            positions = positions[~np.isin(positions, list(self._removed))]
+        return positions
+
+    def fork(self) -> "MinHashLSH":
+        """Copy that takes add() and remove() without changing this index"""
+        clone = copy.copy(self)
+        clone._removed = self._removed.copy()
+        return clone
+
+    def nbytes(self) -> int:
+        """Resident size of the key and position arrays"""
+        return (self._keys.nbytes + self._positions.nbytes
+                + self._tail_keys.nbytes + self._tail_positions.nbytes)
+
+    # ══════════════════════════════════════════════════════════════════════
+    # SNAPSHOT
+    # ══════════════════════════════════════════════════════════════════════
+
+    def export_state(self) -> tuple:
+        """(meta, arrays) for a CorpusSnapshot"""
+        keys, positions = self._merged()
+        meta = {'bands': self.bands, 'rows': self.rows, 'seed': self.seed, 'removed': sorted(self._removed)}
+        return meta, {'keys': keys, 'positions': positions}
+
+    def load_state(self, meta: Dict, arrays: Dict[str, "np.ndarray"]):
+        """Use (possibly memory-mapped, read-only) snapshot arrays"""
+        if (meta['bands'], meta['rows'], meta['seed']) != (self.bands, self.rows, self.seed):
+            raise ValueError("MinHash parameters changed")
+        self._keys = arrays['keys']
+        self._positions = arrays['positions']
+        self._tail_size = 0
+        self._removed = ChunkedSet(meta.get('removed', ()))
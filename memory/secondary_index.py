@@ -0,0 +1,300 @@
+"""
+Secondary Memory Indexes
+Category, date and importance lookups plus running statistics, built at
+load time and updated on every insert and removal so the sidebar and stats
+calls never scan or sort the whole corpus.
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .chunked import ChunkedList
+from .snapshot import StringTable, encode_strings
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class SecondaryIndex:
+    """
+    Maintained lookup structures over memory positions
+
+    - category -> positions (list order)
+    - date-sorted keys (date, -position), searched with bisect for recency
+      and date ranges
+    - importance -> positions, with the distinct importances kept sorted
+    - running category counts and min/max date for get_stats()
+
+    The position lists are ChunkedLists, so a fork copies one reference
+    per chunk and a write copies the chunks it touches.
+
+    Loaded from a snapshot, lookups run on read-only arrays until the
+    first add() or remove() converts them back.
+    """
+
+    def __init__(self):
+        self.by_category: Dict[Optional[str], ChunkedList] = {}
+        self._date_keys = ChunkedList()
+        self._importance_buckets: Dict[float, ChunkedList] = {}
+        self._importance_values: List[float] = []
+        self.category_counts: Dict[str, int] = {}
+        self.total = 0
+        self.oldest: Optional[str] = None
+        self.newest: Optional[str] = None
+        self._frozen: Optional[Dict[str, "np.ndarray"]] = None
+
+    def build(self, memories: List[Dict]):
+        """Index a full corpus (positions follow list order)"""
+        self.__init__()
+        self.extend(memories, 0)
+
+    def extend(self, memories: Iterable[Dict], start: int):
+        """Index a batch of appended memories, the first at position `start`"""
+        if self._frozen is not None:
+            self._thaw()
+        date_keys = []
+        for pos, memory in enumerate(memories, start):
+            date_keys.append(self._add(memory, pos))
+        self._date_keys.update(date_keys)
+        self._importance_values.sort()
+
+    def add(self, memory: Dict, pos: int):
+        """Index one appended memory (or a new version at a removed one's position)"""
+        if self._frozen is not None:
+            self._thaw()
+        new_importance = memory.get('importance', 0) not in self._importance_buckets
+        self._date_keys.add(self._add(memory, pos))
+        if new_importance:
+            insort(self._importance_values, self._importance_values.pop())
+
+    def _add(self, memory: Dict, pos: int) -> tuple:
+        """Index everything but the date key, which is returned"""
+        self.by_category.setdefault(memory.get('category'), ChunkedList()).add(pos)
+
+        date = memory.get('date', '')
+        if self.oldest is None or date < self.oldest:
+            self.oldest = date
+        if self.newest is None or date > self.newest:
+            self.newest = date
+
+        importance = memory.get('importance', 0)
+        bucket = self._importance_buckets.get(importance)
+        if bucket is None:
+            bucket = self._importance_buckets[importance] = ChunkedList()
+            self._importance_values.append(importance)
+        bucket.add(pos)
+
+        category = memory.get('category', 'unknown')
+        self.category_counts[category] = self.category_counts.get(category, 0) + 1
+        self.total += 1
+        return date, -pos
+
+    def remove(self, memory: Dict, pos: int):
+        """Unindex the memory at `pos` (as it was when added)"""
+        if self._frozen is not None:
+            self._thaw()
+        positions = self.by_category.get(memory.get('category'))
+        if positions is None or not positions.discard(pos):
+            raise KeyError(f"memory position {pos} is not indexed")
+        if not positions:
+            del self.by_category[memory.get('category')]
+
+        self._date_keys.discard((memory.get('date', ''), -pos))
+        self.oldest = self._date_keys[0][0] if self._date_keys else None
+        self.newest = self._date_keys[-1][0] if self._date_keys else None
+
+        importance = memory.get('importance', 0)
+        bucket = self._importance_buckets[importance]
+        bucket.discard(pos)
+        if not bucket:
+            del self._importance_buckets[importance]
+            self._importance_values.remove(importance)
+
+        category = memory.get('category', 'unknown')
+        self.category_counts[category] -= 1
+        if not self.category_counts[category]:
+            del self.category_counts[category]
+        self.total -= 1
+
+    def fork(self) -> "SecondaryIndex":
+        """
+        Copy that takes add() and remove() without changing this index
+
+        Position lists are shared chunk by chunk, so this costs O(n / chunk).
+        """
+        clone = SecondaryIndex()
+        if self._frozen is None:
+            clone.by_category = {category: p.copy() for category, p in self.by_category.items()}
+        else:
+            # Category -> row in the shared read-only snapshot arrays
+            clone.by_category = dict(self.by_category)
+        clone._date_keys = self._date_keys.copy()
+        clone._importance_buckets = {value: p.copy() for value, p in self._importance_buckets.items()}
+        clone._importance_values = list(self._importance_values)
+        clone.category_counts = dict(self.category_counts)
+        clone.total = self.total
+        clone.oldest = self.oldest
+        clone.newest = self.newest
+        clone._frozen = self._frozen
+        return clone
+
+    def nbytes(self) -> int:
+        """Approximate resident size"""
+        if self._frozen is not None:
+            return sum(array.nbytes for array in self._frozen.values())
+        # Per memory: three list slots, a (date, -pos) tuple, two ints, the date string
+        return self.total * 200
+
+    # ══════════════════════════════════════════════════════════════════════
+    # SNAPSHOT
+    # ══════════════════════════════════════════════════════════════════════
+
+    def export_state(self) -> tuple:
+        """(meta, arrays) for a CorpusSnapshot"""
+        if self._frozen is not None:
+            return self._meta(), dict(self._frozen)
+
+        categories = list(self.by_category)
+        category_offsets = np.zeros(len(categories) + 1, dtype=np.int64)
+        np.cumsum([len(self.by_category[c]) for c in categories], out=category_offsets[1:])
+        date_blob, date_offsets = encode_strings(date for date, _ in self._date_keys)
+        importance_offsets = np.zeros(len(self._importance_values) + 1, dtype=np.int64)
+        np.cumsum([len(self._importance_buckets[v]) for v in self._importance_values],
+                  out=importance_offsets[1:])
+
+        meta = self._meta()
+        arrays = {
+            'category_offsets': category_offsets,
+            'category_positions': np.array([p for c in categories for p in self.by_category[c]],
+                                           dtype=np.int32),
+            'date_blob': date_blob,
+            'date_offsets': date_offsets,
+            'date_positions': np.array([-neg_pos for _, neg_pos in self._date_keys], dtype=np.int32),
+            'importance_values': np.array(self._importance_values, dtype=np.float64),
+            'importance_offsets': importance_offsets,
+            'importance_positions': np.array(
+                [p for v in self._importance_values for p in self._importance_buckets[v]],
+                dtype=np.int32)
+        }
+        return meta, arrays
+
+    def _meta(self) -> Dict:
+        return {
+            'categories': list(self.by_category),
+            # Pairs: a None category would not survive as a JSON object key
+            'category_counts': list(self.category_counts.items()),
+            'total': self.total,
+            'oldest': self.oldest,
+            'newest': self.newest
+        }
+
+    def load_state(self, meta: Dict, arrays: Dict[str, "np.ndarray"]):
+        """Serve lookups straight from (possibly memory-mapped) snapshot arrays"""
+        self.__init__()
+        self.by_category = {category: row for row, category in enumerate(meta['categories'])}
+        self.category_counts = {category: count for category, count in meta['category_counts']}
+        self.total = meta['total']
+        self.oldest = meta['oldest']
+        self.newest = meta['newest']
+        self._frozen = arrays
+
+    def _thaw(self):
+        """Rebuild the Python structures from the snapshot arrays before a write"""
+        arrays = self._frozen
+        self._frozen = None
+
+        offsets = arrays['category_offsets'].tolist()
+        positions = arrays['category_positions'].tolist()
+        self.by_category = {
+            category: ChunkedList(positions[offsets[row]:offsets[row + 1]])
+            for category, row in self.by_category.items()
+        }
+        dates = StringTable(arrays['date_blob'], arrays['date_offsets'])
+        self._date_keys = ChunkedList((date, -pos) for date, pos in zip(dates, arrays['date_positions'].tolist()))
+
+        offsets = arrays['importance_offsets'].tolist()
+        positions = arrays['importance_positions'].tolist()
+        self._importance_values = [
+            int(v) if v.is_integer() else v for v in arrays['importance_values'].tolist()
+        ]
+        self._importance_buckets = {
+            value: ChunkedList(positions[offsets[i]:offsets[i + 1]])
+            for i, value in enumerate(self._importance_values)
+        }
+
+    # ══════════════════════════════════════════════════════════════════════
+    # LOOKUPS
+    # ══════════════════════════════════════════════════════════════════════
+
+    def category_positions(self, category: str) -> List[int]:
+        """Positions with exactly this category, in list order"""
+        if self._frozen is not None:
+            row = self.by_category.get(category)
+            if row is None:
+                return []
+            offsets = self._frozen['category_offsets']
+            return self._frozen['category_positions'][offsets[row]:offsets[row + 1]].tolist()
+        return list(self.by_category.get(category, ()))
+
+    def recent_positions(self, n: int) -> List[int]:
+        """n newest positions (ties -> earlier position first)"""
+        if n <= 0:
+            return []
+        if self._frozen is not None:
+            return self._frozen['date_positions'][-n:][::-1].tolist()
+        return [-neg_pos for _, neg_pos in reversed(self._date_keys[-n:])]
+
+    def date_range_positions(self, start: Optional[str], end: Optional[str]) -> List[int]:
+        """
+        Positions dated start..end inclusive, oldest first (ties -> later
+        position first, the reverse of recent_positions)
+
+        Bounds are ISO 'YYYY-MM-DD' strings (None: open); a timestamp such
+        as '2024-02-14T09:30' counts as its day.
+        """
+        lo, hi = self._date_bounds(start, end)
+        if self._frozen is not None:
+            return self._frozen['date_positions'][lo:hi].tolist()
+        return [-neg_pos for _, neg_pos in self._date_keys[lo:hi]]
+
+    def count_between(self, start: Optional[str], end: Optional[str]) -> int:
+        """Number of memories dated start..end, in O(log n)"""
+        lo, hi = self._date_bounds(start, end)
+        return hi - lo
+
+    def _date_bounds(self, start: Optional[str], end: Optional[str]) -> Tuple[int, int]:
+        """Slice of the date-sorted keys holding start <= date <= end"""
+        # Undated memories ('') sort before any digit and stay out of every range
+        start = start if start is not None else '0'
+        end = end + '\uffff' if end is not None else '\uffff'
+        if self._frozen is not None:
+            dates = StringTable(self._frozen['date_blob'], self._frozen['date_offsets'])
+            return bisect_left(dates, start), bisect_left(dates, end)
+        keys = self._date_keys
+        return keys.bisect_left((start,)), keys.bisect_left((end,))
+
+    def important_positions(self, threshold: float) -> List[int]:
+        """Positions with importance >= threshold, in list order"""
+        if self._frozen is not None:
+            # Buckets are stored in importance order, so the matches are one slice
+            start = np.searchsorted(self._frozen['importance_values'], threshold)
+            offset = self._frozen['importance_offsets'][start]
+            return np.sort(self._frozen['importance_positions'][offset:]).tolist()
+        start = bisect_left(self._importance_values, threshold)
+        positions = []
+        for importance in self._importance_values[start:]:
+            positions.extend(self._importance_buckets[importance])
+        positions.sort()
+        return positions
+
+    def stats(self) -> Dict:
+        """Running statistics in get_stats() format"""
+        return {
+            'total_memories': self.total,
+            'categories': dict(self.category_counts),
+            'oldest_memory': self.oldest if self.oldest is not None else 'N/A',
+            'newest_memory': self.newest if self.newest is not None else 'N/A'
+        }
@@ -0,0 +1,335 @@
+"""
+Binary Corpus Snapshot
+The parsed corpus and its indexes saved as raw NumPy arrays plus string
+tables in one checksummed file next to memories.json. Loading maps the
+file into memory, so MemoryAgent construction skips json.load and every
+index build.
+
+Layout:
+    MAGIC | header length (u64) | header crc32 (u32) | header JSON |
+    arrays, each 64-byte aligned
+
+The header lists every array (dtype, shape, offset, crc32), the state of
+the source files the snapshot was built from, and component metadata.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+MAGIC = b'HERSNAP1'
+PREAMBLE = struct.Struct('<8sQI')
+ALIGN = 64
+
+# Bump when any component changes its exported arrays
+FORMAT_VERSION = 4
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# STRING TABLES
+# ══════════════════════════════════════════════════════════════════════════
+
+def encode_strings(strings: Iterable[str]) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Pack strings into (UTF-8 blob as uint8, int64 offsets)"""
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+
+class StringTable:
+    """Read-only list of strings decoded on access from a packed blob"""
+
+    def __init__(self, blob: "np.ndarray", offsets: "np.ndarray"):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], 'utf-8')
+
+    def __iter__(self):
+        blob = self._blob.tobytes()
+        offsets = self._offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield blob[start:end].decode('utf-8')
+
+
+def merge_states(states: Dict[str, Tuple[Dict, Dict[str, "np.ndarray"]]]) -> Tuple[Dict, Dict[str, "np.ndarray"]]:
+    """Combine per-component (meta, arrays) pairs; arrays become "<component>/<name>" entries"""
+    meta, arrays = {}, {}
+    for name, (part_meta, part_arrays) in states.items():
+        meta[name] = part_meta
+        for key, array in part_arrays.items():
+            arrays[f"{name}/{key}"] = array
+    return meta, arrays
+
+
+def split_state(meta: Dict, arrays: Dict[str, "np.ndarray"], name: str) -> Tuple[Dict, Dict[str, "np.ndarray"]]:
+    """One component's (meta, arrays) out of merge_states() output"""
+    prefix = f"{name}/"
+    return meta[name], {key[len(prefix):]: array for key, array in arrays.items() if key.startswith(prefix)}
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# FILE FORMAT
+# ══════════════════════════════════════════════════════════════════════════
+
+def write_snapshot(path: str, header: Dict, arrays: Dict[str, "np.ndarray"]):
+    """Write header + arrays to a temp file, fsync it and rename it over `path`"""
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        layout[name] = {
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'offset': offset,
+            'nbytes': array.nbytes,
+            'crc32': zlib.crc32(memoryview(array).cast('B')) if array.nbytes else 0
+        }
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+
+    header = dict(header, arrays=layout)
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    data_start = -(-(PREAMBLE.size + len(header_bytes)) // ALIGN) * ALIGN
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, len(header_bytes), zlib.crc32(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]['offset'])
+            if array.nbytes:
+                f.write(memoryview(array).cast('B'))
+        f.truncate(data_start + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str, verify: bool = False) -> Optional[Tuple[Dict, Dict[str, "np.ndarray"]]]:
+    """
+    Map a snapshot file into memory
+
+    The header checksum and array bounds are always checked; array
+    checksums only with verify=True (that reads the whole file).
+
+    Returns:
+        (header, read-only arrays) or None if the file is missing or damaged;
+        header['file_id'] identifies the file that was mapped
+    """
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            stat = os.fstat(f.fileno())
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, header_len, header_crc = PREAMBLE.unpack_from(mapped, 0)
+        header_bytes = mapped[PREAMBLE.size:PREAMBLE.size + header_len]
+        if magic != MAGIC or zlib.crc32(header_bytes) != header_crc:
+            return None
+        header = json.loads(header_bytes.decode('utf-8'))
+        # Identifies the mapped file for verify_in_background()
+        header['file_id'] = [stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size]
+        data_start = -(-(PREAMBLE.size + header_len) // ALIGN) * ALIGN
+
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            start = data_start + spec['offset']
+            if start + spec['nbytes'] > len(mapped):
+                return None
+            array = np.frombuffer(mapped, dtype=np.dtype(spec['dtype']),
+                                  count=int(np.prod(spec['shape'], dtype=np.int64)), offset=start)
+            arrays[name] = array.reshape(spec['shape'])
+        if verify and damaged_arrays(header, arrays):
+            return None
+        return header, arrays
+    except (struct.error, ValueError, KeyError, TypeError, UnicodeDecodeError):
+        return None
+
+
+def damaged_arrays(header: Dict, arrays: Dict[str, "np.ndarray"]) -> List[str]:
+    """Names of the arrays whose bytes don't match their crc32 (reads every page)"""
+    layout = header['arrays']
+    return [name for name, array in arrays.items()
+            if layout[name]['nbytes'] and zlib.crc32(memoryview(array).cast('B')) != layout[name]['crc32']]
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# BACKGROUND VERIFICATION
+# ══════════════════════════════════════════════════════════════════════════
+
+_verify_queue: "queue.Queue" = queue.Queue()
+_verify_thread: Optional[threading.Thread] = None
+_verify_lock = threading.Lock()
+# file_id of every mapped snapshot whose checksums matched
+_verified = set()
+
+
+def verify_in_background(header: Dict, arrays: Dict[str, "np.ndarray"],
+                         done: Callable[[List[str]], None]):
+    """
+    Check a read_snapshot() result's array checksums off the caller's
+    thread, then call done() with the names of the damaged arrays
+
+    One daemon thread serves the whole process (started by the first
+    call), so loading a snapshot only queues the check; a file already
+    verified in this process (same file_id) is not read again.
+    """
+    global _verify_thread
+    _verify_queue.put((header, arrays, done))
+    with _verify_lock:
+        if _verify_thread is None:
+            _verify_thread = threading.Thread(target=_verify_queued, daemon=True, name="snapshot-verify")
+            _verify_thread.start()
+
+
+def _verify_queued():
+    while True:
+        header, arrays, done = _verify_queue.get()
+        file_id = tuple(header.get('file_id', ()))
+        damaged = []
+        if not file_id or file_id not in _verified:
+            try:
+                damaged = damaged_arrays(header, arrays)
+            except Exception as e:
+                damaged = [f"unreadable ({e})"]
+            if file_id and not damaged:
+                _verified.add(file_id)
+        try:
+            done(damaged)
+        except Exception as e:
+            print(f"⚠️  Snapshot verification callback failed: {e}")
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# SOURCE TRACKING
+# ══════════════════════════════════════════════════════════════════════════
+
+def _file_stat(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _file_sha256(path: str) -> Optional[str]:
+    try:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+class CorpusSnapshot:
+    """
+    A snapshot file tied to the source files it was built from
+
+    The snapshot is current while every source has the recorded mtime and
+    size. If only the mtime moved (file touched or rewritten with the same
+    bytes) the SHA-256 is compared instead and the snapshot is re-stamped.
+    """
+
+    def __init__(self, path: str, sources: List[str], config: Dict):
+        """
+        Args:
+            path: Snapshot file
+            sources: Files whose contents define the corpus
+            config: Anything else the arrays depend on (engine, keyword
+                    groups...); a mismatch invalidates the snapshot
+        """
+        self.path = path
+        self.sources = sources
+        self.config = dict(config, format=FORMAT_VERSION)
+
+    def source_state(self, with_hash: bool = True) -> List[Dict]:
+        """Current stat (and hash) of every source file"""
+        state = []
+        for source in self.sources:
+            stat = _file_stat(source)
+            state.append({
+                'path': os.path.basename(source),
+                'stat': stat,
+                'sha256': _file_sha256(source) if with_hash and stat else None
+            })
+        return state
+
+    def load(self, verify: bool = False) -> Optional[Tuple[Dict, Dict[str, "np.ndarray"]]]:
+        """Mapped (header, arrays) if the snapshot matches the sources, else None"""
+        snapshot = read_snapshot(self.path, verify)
+        if snapshot is None:
+            return None
+        header, arrays = snapshot
+        if header.get('config') != self.config:
+            return None
+
+        recorded = header.get('sources', [])
+        current = self.source_state(with_hash=False)
+        if len(recorded) != len(current):
+            return None
+        restamp = False
+        for source, old, new in zip(self.sources, recorded, current):
+            if old['stat'] == new['stat']:
+                continue
+            if old['stat'] is None or new['stat'] is None or old['stat'][1] != new['stat'][1]:
+                return None
+            if _file_sha256(source) != old['sha256']:
+                return None
+            restamp = True
+
+        if restamp:
+            # Same bytes, new mtime: record it so the hash isn't recomputed next
+            # time (checked first, since saving recomputes every checksum)
+            if not verify and damaged_arrays(header, arrays):
+                return None
+            self.save(header['meta'], dict(arrays))
+        return header, arrays
+
+    def save(self, meta: Dict, arrays: Dict[str, "np.ndarray"],
+             sources: Optional[List[Dict]] = None):
+        """
+        Write the snapshot
+
+        Args:
+            meta: Component metadata (JSON-serializable)
+            arrays: Component arrays
+            sources: source_state() captured before the corpus was read
+                     (default: now)
+        """
+        header = {
+            'config': self.config,
+            'sources': sources if sources is not None else self.source_state(),
+            'meta': meta
+        }
+        write_snapshot(self.path, header, arrays)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
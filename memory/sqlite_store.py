@@ -0,0 +1,320 @@
+"""
+SQLite Memory Store
+Memories live in a SQLite table indexed on category, date and importance,
+with an FTS5 trigram index on content. Lookups run as indexed queries, so
+the corpus never has to be loaded into Python lists.
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .ingest import dedupe_key
+from .storage import MemoryStore
+
+
+# Columns every memory has; anything else round-trips through `extra`
+MEMORY_COLUMNS = ('id', 'category', 'content', 'date', 'importance')
+
+
+def _date_clause(dates: Optional[tuple]) -> Tuple[str, list]:
+    """SQL condition and params for an optional (start, end) ISO date range"""
+    if dates is None:
+        return "1", []
+    start, end = dates
+    # Same bounds as SecondaryIndex: undated rows never match, timestamps count as their day
+    return "date >= ? AND date < ?", [start if start is not None else '0',
+                                      end + '\uffff' if end is not None else '\uffff']
+
+
+class SQLiteMemoryStore(MemoryStore):
+    """
+    SQLite + FTS5 backend
+
+    `pos` (the rowid) is the insertion order and plays the role of the
+    list position in the JSON store, so ties are broken the same way.
+    Ids are indexed for get/update/delete; the next id to allocate is kept
+    in store_meta so deleting the newest memory never frees its id. Each
+    row also keeps its dedupe_key(), indexed, so imports check for
+    duplicates without reading the corpus.
+    The FTS table uses the trigram tokenizer: a quoted term matches any
+    substring of 3+ characters, same as Python's `in` on lowercased text.
+    """
+
+    queryable = True
+
+    def __init__(self, db_path: str = "memory/memories.db"):
+        """
+        Args:
+            db_path: SQLite database file (':memory:' for a throwaway store)
+        """
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS memories (
+                    pos INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id INTEGER,
+                    category TEXT NOT NULL DEFAULT '',
+                    content TEXT NOT NULL DEFAULT '',
+                    date TEXT NOT NULL DEFAULT '',
+                    importance NUMERIC NOT NULL DEFAULT 5,
+                    extra TEXT,
+                    content_key TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_memories_category ON memories(category);
+                CREATE INDEX IF NOT EXISTS idx_memories_date ON memories(date DESC);
+                CREATE INDEX IF NOT EXISTS idx_memories_importance ON memories(importance DESC);
+                CREATE INDEX IF NOT EXISTS idx_memories_id ON memories(id);
+                CREATE TABLE IF NOT EXISTS store_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+                    content, content='memories', content_rowid='pos', tokenize='trigram'
+                );
+            """)
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(memories)")}
+            if 'content_key' not in columns:
+                # Databases from before content_key: add and fill it once
+                self._conn.execute("ALTER TABLE memories ADD COLUMN content_key TEXT")
+                self._conn.executemany(
+                    "UPDATE memories SET content_key = ? WHERE pos = ?",
+                    [(dedupe_key(content), pos)
+                     for pos, content in self._conn.execute("SELECT pos, content FROM memories")]
+                )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_memories_content_key ON memories(content_key)")
+
+    # ══════════════════════════════════════════════════════════════════════
+    # WRITES
+    # ══════════════════════════════════════════════════════════════════════
+
+    def _insert(self, memory: Dict) -> int:
+        extra = {key: value for key, value in memory.items() if key not in MEMORY_COLUMNS}
+        cursor = self._conn.execute(
+            "INSERT INTO memories (id, category, content, date, importance, extra, content_key) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (memory.get('id'), memory.get('category', ''), memory.get('content', ''),
+             memory.get('date', ''), memory.get('importance', 5),
+             json.dumps(extra, ensure_ascii=False) if extra else None,
+             dedupe_key(memory.get('content', '')))
+        )
+        pos = cursor.lastrowid
+        self._conn.execute(
+            "INSERT INTO memories_fts (rowid, content) VALUES (?, ?)",
+            (pos, memory.get('content', ''))
+        )
+        return pos
+
+    def _find(self, memory_id) -> Optional[sqlite3.Row]:
+        """First row (lowest pos) with this id"""
+        return self._conn.execute(
+            "SELECT pos, content FROM memories WHERE id = ? ORDER BY pos LIMIT 1", (memory_id,)
+        ).fetchone()
+
+    def _unindex_content(self, row: sqlite3.Row):
+        self._conn.execute(
+            "INSERT INTO memories_fts (memories_fts, rowid, content) VALUES ('delete', ?, ?)",
+            (row['pos'], row['content'])
+        )
+
+    def append(self, memory: Dict):
+        with self._lock, self._conn:
+            self._insert(memory)
+
+    def update(self, memory: Dict):
+        """Rewrite the memory with memory['id'] in place (same pos)"""
+        extra = {key: value for key, value in memory.items() if key not in MEMORY_COLUMNS}
+        with self._lock, self._conn:
+            row = self._find(memory.get('id'))
+            if row is None:
+                raise KeyError(f"No memory with id {memory.get('id')!r}")
+            self._unindex_content(row)
+            self._conn.execute(
+                "UPDATE memories SET category = ?, content = ?, date = ?, importance = ?, extra = ?, "
+                "content_key = ? WHERE pos = ?",
+                (memory.get('category', ''), memory.get('content', ''), memory.get('date', ''),
+                 memory.get('importance', 5), json.dumps(extra, ensure_ascii=False) if extra else None,
+                 dedupe_key(memory.get('content', '')), row['pos'])
+            )
+            self._conn.execute(
+                "INSERT INTO memories_fts (rowid, content) VALUES (?, ?)",
+                (row['pos'], memory.get('content', ''))
+            )
+
+    def delete(self, memory_id):
+        with self._lock, self._conn:
+            row = self._find(memory_id)
+            if row is None:
+                raise KeyError(f"No memory with id {memory_id!r}")
+            self._unindex_content(row)
+            self._conn.execute("DELETE FROM memories WHERE pos = ?", (row['pos'],))
+
+    def allocate_id(self, count: int = 1) -> int:
+        with self._lock, self._conn:
+            stored = self._conn.execute("SELECT value FROM store_meta WHERE key = 'next_id'").fetchone()
+            newest = self._conn.execute(
+                "SELECT MAX(id) FROM memories WHERE typeof(id) = 'integer'"
+            ).fetchone()[0]
+            first = max(stored[0] if stored else 1, (newest or 0) + 1)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO store_meta (key, value) VALUES ('next_id', ?)", (first + count,)
+            )
+        return first
+
+    def import_memories(self, memories: Iterable[Dict]) -> int:
+        """Insert many memories in one transaction"""
+        count = 0
+        with self._lock, self._conn:
+            for memory in memories:
+                self._insert(memory)
+                count += 1
+        return count
+
+    def load(self) -> List[Dict]:
+        return self._query("SELECT * FROM memories ORDER BY pos")
+
+    def save(self, memories: List[Dict]):
+        """Replace the whole corpus"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM memories")
+            self._conn.execute("INSERT INTO memories_fts (memories_fts) VALUES ('delete-all')")
+            for memory in memories:
+                self._insert(memory)
+
+    # ══════════════════════════════════════════════════════════════════════
+    # QUERIES
+    # ══════════════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def _to_memory(row: sqlite3.Row) -> Dict:
+        memory = {key: row[key] for key in MEMORY_COLUMNS}
+        if row['extra']:
+            memory.update(json.loads(row['extra']))
+        return memory
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_memory(row) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+
+    def get(self, memory_id) -> Optional[Dict]:
+        """The memory with this id (the first of duplicates), or None"""
+        rows = self._query("SELECT * FROM memories WHERE id = ? ORDER BY pos LIMIT 1", (memory_id,))
+        return rows[0] if rows else None
+
+    def has_content(self, key: str) -> bool:
+        """True if some memory's dedupe_key(content) equals `key`"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM memories WHERE content_key = ? LIMIT 1", (key,)
+            ).fetchone() is not None
+
+    def by_category(self, category: str) -> List[Dict]:
+        return self._query("SELECT * FROM memories WHERE category = ? ORDER BY pos", (category,))
+
+    def by_categories_ranked(self, categories: Iterable[str], limit: int,
+                             dates: Optional[tuple] = None) -> List[Dict]:
+        """Memories in any of `categories` (dated within `dates`, if given), most important first"""
+        categories = list(dict.fromkeys(categories))
+        marks = ', '.join('?' * len(categories))
+        in_range, range_params = _date_clause(dates)
+        return self._query(
+            f"SELECT * FROM memories WHERE category IN ({marks}) AND {in_range} "
+            f"ORDER BY importance DESC, pos LIMIT ?",
+            (*categories, *range_params, limit)
+        )
+
+    def recent(self, n: int) -> List[Dict]:
+        return self._query("SELECT * FROM memories ORDER BY date DESC, pos LIMIT ?", (n,))
+
+    def between(self, start: Optional[str], end: Optional[str]) -> List[Dict]:
+        """Memories dated start..end (ISO, None: open), oldest first"""
+        in_range, params = _date_clause((start, end))
+        return self._query(f"SELECT * FROM memories WHERE {in_range} ORDER BY date, pos DESC", tuple(params))
+
+    def count_between(self, start: Optional[str], end: Optional[str]) -> int:
+        in_range, params = _date_clause((start, end))
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM memories WHERE {in_range}", params).fetchone()[0]
+
+    def important(self, threshold: float) -> List[Dict]:
+        return self._query("SELECT * FROM memories WHERE importance >= ? ORDER BY pos", (threshold,))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            categories = {
+                row[0]: row[1] for row in self._conn.execute(
+                    "SELECT category, COUNT(*) FROM memories GROUP BY category ORDER BY MIN(pos)"
+                )
+            }
+            total, oldest, newest = self._conn.execute(
+                "SELECT COUNT(*), MIN(date), MAX(date) FROM memories"
+            ).fetchone()
+        return {
+            'total_memories': total,
+            'categories': categories,
+            'oldest_memory': oldest if oldest is not None else 'N/A',
+            'newest_memory': newest if newest is not None else 'N/A'
+        }
+
+    def search_candidates(self, terms: Iterable[str], categories: Iterable[str],
+                          dates: Optional[tuple] = None) -> Dict[int, Dict]:
+        """
+        Memories whose content contains any of `terms` (substring, via the
+        trigram FTS index) or whose category is in `categories`, dated
+        within `dates` if given
+
+        Returns:
+            pos -> memory, in pos order
+        """
+        terms = [t for t in dict.fromkeys(terms) if len(t) >= 3]
+        categories = list(dict.fromkeys(categories))
+        clauses, params = [], []
+        if terms:
+            clauses.append("pos IN (SELECT rowid FROM memories_fts WHERE memories_fts MATCH ?)")
+            params.append(' OR '.join('"' + t.replace('"', '""') + '"' for t in terms))
+        if categories:
+            clauses.append(f"category IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        if not clauses:
+            return {}
+        in_range, range_params = _date_clause(dates)
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM memories WHERE ({' OR '.join(clauses)}) AND {in_range} ORDER BY pos",
+                params + range_params
+            ).fetchall()
+        return {row['pos']: self._to_memory(row) for row in rows}
+
+    def top_by_importance(self, k: int, exclude: Optional[Iterable[int]] = None,
+                          dates: Optional[tuple] = None) -> List[tuple]:
+        """First k (pos, memory) by importance (ties -> id, then pos) not in `exclude`"""
+        exclude = set(exclude or ())
+        in_range, params = _date_clause(dates)
+        result = []
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT * FROM memories WHERE {in_range} ORDER BY importance DESC, id IS NULL, id, pos",
+                params
+            )
+            for row in cursor:
+                if len(result) >= k:
+                    break
+                if row['pos'] not in exclude:
+                    result.append((row['pos'], self._to_memory(row)))
+        return result
+
+    def close(self):
+        self._conn.close()
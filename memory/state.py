@@ -0,0 +1,60 @@
+"""
+Versioned Memory State
+The loaded corpus and every index built over it, bundled so an agent can
+publish a whole new version with one reference assignment.
+
+Readers take the current MemoryState once per call and use only that
+object, so they never lock and never see a half-applied write. Writers
+fork() the current state, add to the fork and publish it.
+"""
+
+from typing import Any, NamedTuple, Optional
+
+from .id_index import IdIndex
+from .secondary_index import SecondaryIndex
+from .identity_profile import IdentityProfile
+from .keyword_index import KeywordIndex
+from .bm25 import BM25Index
+from .embeddings import VectorIndex
+from .ann import IVFIndex
+from .minhash import MinHashLSH
+
+
+class MemoryState(NamedTuple):
+    """One immutable published version of the corpus and its indexes"""
+    version: int
+    memories: Any                       # ColumnarMemories or DictMemories
+    ids: IdIndex
+    secondary: SecondaryIndex
+    identity: IdentityProfile
+    keyword: Optional[KeywordIndex] = None
+    bm25: Optional[BM25Index] = None
+    vectors: Optional[VectorIndex] = None
+    ann: Optional[IVFIndex] = None
+    near_dups: Optional[MinHashLSH] = None
+
+    def nbytes(self) -> int:
+        """Approximate resident size of the table and every index"""
+        components = (self.memories, self.ids, self.secondary, self.identity, self.keyword, self.bm25, self.vectors,
+                      self.ann, self.near_dups)
+        return sum(component.nbytes() for component in components if component is not None)
+
+    def fork(self) -> "MemoryState":
+        """
+        Next version, ready for writes that leave this one untouched
+
+        Must be called on the newest state only (one writer at a time):
+        append-only columns are shared with the fork.
+        """
+        return MemoryState(
+            version=self.version + 1,
+            memories=self.memories.fork(),
+            ids=self.ids.fork(),
+            secondary=self.secondary.fork(),
+            identity=self.identity.fork(),
+            keyword=self.keyword.fork() if self.keyword is not None else None,
+            bm25=self.bm25.fork() if self.bm25 is not None else None,
+            vectors=self.vectors.fork() if self.vectors is not None else None,
+            ann=self.ann.fork() if self.ann is not None else None,
+            near_dups=self.near_dups.fork() if self.near_dups is not None else None
+        )
@@ -0,0 +1,269 @@
+"""
+Memory Storage Backends
+MemoryAgent talks to storage through MemoryStore, so the JSON snapshot
+can be swapped for a database without touching retrieval code.
+"""
+
+import json
+import os
+from collections import deque
+from typing import Dict, Iterator, List
+
+from .id_index import id_key
+from .journal import MemoryJournal
+from .json_stream import iter_json_array
+
+
+class MemoryStore:
+    """
+    Base class for memory storage backends
+
+    Plain stores only persist memories: MemoryAgent loads everything with
+    load() and answers lookups from its in-memory indexes. Stores with
+    `queryable = True` answer lookups themselves (see SQLiteMemoryStore)
+    and are never loaded into Python lists.
+    """
+
+    queryable = False
+
+    def load(self) -> List[Dict]:
+        """Return every stored memory"""
+        raise NotImplementedError
+
+    def stream(self, strict: bool = False) -> Iterator[Dict]:
+        """
+        Every stored memory, in load() order, without building the full list first
+
+        Args:
+            strict: Raise on unreadable data instead of yielding what could be read
+        """
+        yield from self.load()
+
+    def append(self, memory: Dict):
+        """Persist one new memory"""
+        raise NotImplementedError
+
+    def update(self, memory: Dict):
+        """Persist a new version of the stored memory with memory['id']"""
+        raise NotImplementedError
+
+    def delete(self, memory_id):
+        """Forget the stored memory with this id"""
+        raise NotImplementedError
+
+    def allocate_id(self, count: int = 1) -> int:
+        """
+        Reserve `count` consecutive new memory ids and return the first
+
+        Ids only ever grow: one that was handed out, even to a memory
+        deleted since, is never handed out again.
+        """
+        raise NotImplementedError
+
+    def should_compact(self) -> bool:
+        """True if save() should run to fold pending writes"""
+        return False
+
+    def save(self, memories: List[Dict]):
+        """Persist the full corpus"""
+        raise NotImplementedError
+
+    def source_files(self) -> List[str]:
+        """Files load() reads; a corpus snapshot is only valid while they are unchanged"""
+        return []
+
+    def checkpoint(self) -> Dict:
+        """Store state after load(), saved alongside a corpus snapshot"""
+        return {}
+
+    def restore(self, checkpoint: Dict):
+        """Resume from checkpoint() when a snapshot replaces load()"""
+
+
+class JsonMemoryStore(MemoryStore):
+    """
+    memories.json snapshot plus an append-only write journal
+
+    The next id to allocate is saved as "next_id" in memories.json and
+    recovered from the ids of journaled adds, so it survives restarts.
+    """
+
+    def __init__(self, memory_file: str = "memory/memories.json",
+                 compact_records: int = 1000, compact_bytes: int = 1_000_000):
+        """
+        Args:
+            memory_file: Path to memories.json
+            compact_records: Fold the journal into memories.json after
+                             this many appended memories
+            compact_bytes: ...or once the journal grows past this size
+        """
+        self.memory_file = memory_file
+        self.journal = MemoryJournal(memory_file, compact_records, compact_bytes)
+        self.next_id = 1
+
+    def _see_id(self, memory: Dict):
+        """Keep next_id past a stored integer id"""
+        memory_id = memory.get('id')
+        if type(memory_id) is int and memory_id >= self.next_id:
+            self.next_id = memory_id + 1
+
+    def load(self) -> List[Dict]:
+        """Load the snapshot and replay the journal on top of it"""
+        memories = []
+        snapshot_seq = 0
+        if os.path.exists(self.memory_file):
+            try:
+                with open(self.memory_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    memories = data.get('memories', [])
+                    snapshot_seq = data.get('journal_seq', 0)
+                    self.next_id = max(self.next_id, data.get('next_id', 1))
+                print(f"✅ Loaded {len(memories)} memories")
+            except Exception as e:
+                print(f"❌ Error loading memories: {e}")
+                memories = []
+        else:
+            print(f"⚠️  Memory file not found: {self.memory_file}")
+        for memory in memories:
+            self._see_id(memory)
+
+        # id -> list indexes, built at the first journaled update or delete
+        slots = None
+
+        def apply(op: str, memory: Dict):
+            nonlocal slots
+            if op == 'add':
+                self._see_id(memory)
+                if slots is not None:
+                    slots.setdefault(id_key(memory.get('id')), []).append(len(memories))
+                memories.append(memory)
+                return
+            if slots is None:
+                slots = {}
+                for i, stored in enumerate(memories):
+                    slots.setdefault(id_key(stored.get('id')), []).append(i)
+            indexes = slots.get(id_key(memory.get('id')))
+            if not indexes:
+                return
+            if op == 'update':
+                memories[indexes[0]] = memory
+            elif op == 'delete':
+                memories[indexes.pop(0)] = None
+
+        replayed = self.journal.replay(snapshot_seq, apply)
+        if replayed:
+            print(f"✅ Replayed {replayed} journaled writes")
+        if slots is not None:
+            memories = [memory for memory in memories if memory is not None]
+        return memories
+
+    def stream(self, strict: bool = False) -> Iterator[Dict]:
+        """
+        load() one memory at a time: the snapshot is parsed incrementally,
+        so the whole file and its parse tree are never in memory at once
+
+        Unlike load(), memories read before a parse error are kept, unless
+        strict=True: then a missing or unreadable file raises (e.g. a
+        reload that must not mistake a half-written file for deletions).
+
+        Journaled updates and deletes are applied as each memory streams
+        past, so they are read up front; compact() writes journal_seq
+        ahead of the memories to say which of them are already folded in.
+        """
+        fields = {}
+        edits = None
+
+        def edited(memory: Dict):
+            """Memory after its journaled updates, None if it was deleted"""
+            ops = edits.get(id_key(memory.get('id')))
+            while ops:
+                op, edit = ops.popleft()
+                if op == 'delete':
+                    return None
+                memory = edit
+            return memory
+
+        if os.path.exists(self.memory_file):
+            count = 0
+            try:
+                for memory in iter_json_array(self.memory_file, 'memories', fields):
+                    count += 1
+                    if edits is None:
+                        edits = self._journal_edits(fields.get('journal_seq', 0))
+                    self._see_id(memory)
+                    memory = edited(memory)
+                    if memory is not None:
+                        yield memory
+                print(f"✅ Loaded {count} memories")
+            except (OSError, ValueError) as e:
+                if strict:
+                    raise
+                print(f"❌ Error loading memories after {count}: {e}")
+        elif strict:
+            raise FileNotFoundError(f"Memory file not found: {self.memory_file}")
+        else:
+            print(f"⚠️  Memory file not found: {self.memory_file}")
+
+        # Journal tails are small (compaction thresholds); older files store
+        # journal_seq after the memories array
+        self.next_id = max(self.next_id, fields.get('next_id', 1))
+        if edits is None:
+            edits = self._journal_edits(fields.get('journal_seq', 0))
+        added = []
+
+        def apply(op: str, memory: Dict):
+            if op == 'add':
+                self._see_id(memory)
+                added.append(memory)
+
+        replayed = self.journal.replay(fields.get('journal_seq', 0), apply)
+        if replayed:
+            print(f"✅ Replayed {replayed} journaled writes")
+        # Edits left over target memories added by the journal itself
+        for memory in added:
+            memory = edited(memory)
+            if memory is not None:
+                yield memory
+
+    def _journal_edits(self, snapshot_seq: int) -> Dict:
+        """id -> journaled (op, memory) updates and deletes newer than the snapshot, oldest first"""
+        edits = {}
+        for record in self.journal.pending(snapshot_seq):
+            if record['op'] in ('update', 'delete'):
+                edits.setdefault(id_key(record['memory'].get('id')), deque()).append(
+                    (record['op'], record['memory']))
+        return edits
+
+    def append(self, memory: Dict):
+        self._see_id(memory)
+        self.journal.append('add', memory)
+
+    def update(self, memory: Dict):
+        self.journal.append('update', memory)
+
+    def delete(self, memory_id):
+        self.journal.append('delete', {'id': memory_id})
+
+    def allocate_id(self, count: int = 1) -> int:
+        first = self.next_id
+        self.next_id += count
+        return first
+
+    def should_compact(self) -> bool:
+        return self.journal.should_compact()
+
+    def save(self, memories: List[Dict]):
+        """Write memories.json atomically and truncate the journal"""
+        for memory in memories:
+            self._see_id(memory)
+        self.journal.compact(memories, {'next_id': self.next_id})
+
+    def source_files(self) -> List[str]:
+        return [self.memory_file, self.journal.path]
+
+    def checkpoint(self) -> Dict:
+        return {'journal': self.journal.checkpoint(), 'next_id': self.next_id}
+
+    def restore(self, checkpoint: Dict):
+        self.journal.restore(checkpoint['journal'])
+        self.next_id = max(self.next_id, checkpoint['next_id'])
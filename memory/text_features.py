@@ -0,0 +1,45 @@
+"""
+Precomputed Memory Text
+Lowercased content, token set and category tokens, computed once per
+memory (at load / add_memory) and reused by the retriever and the
+romantic agent's relevance check.
+"""
+
+import sys
+from typing import Dict, FrozenSet, NamedTuple
+
+
+class MemoryText(NamedTuple):
+    """Normalized text of one memory"""
+    text: str                        # content.lower()
+    tokens: FrozenSet[str]           # set(text.split())
+    category: str                    # category.lower()
+    category_tokens: FrozenSet[str]  # 'first_contact' -> {'first', 'contact'}
+
+
+def memory_text(memory: Dict) -> MemoryText:
+    """Normalize a memory's content and category"""
+    text = memory.get('content', '').lower()
+    category = memory.get('category', '').lower()
+    return MemoryText(
+        text=text,
+        # Interned so the same word is stored once across the corpus
+        tokens=frozenset(sys.intern(token) for token in text.split()),
+        category=category,
+        category_tokens=frozenset(category.replace('_', ' ').split())
+    )
+
+
+class MemoryRecord(dict):
+    """
+    A memory dict carrying its precomputed MemoryText as `.text`
+    (an attribute, not a key, so it never reaches JSON or the LLM prompt)
+    """
+
+    __slots__ = ('text',)
+
+
+def text_of(memory: Dict) -> MemoryText:
+    """Precomputed text if the memory carries it, else computed now"""
+    text = getattr(memory, 'text', None)
+    return text if text is not None else memory_text(memory)
@@ -0,0 +1,116 @@
+"""
+Multi-Pattern Trigger Matcher
+Aho-Corasick automaton that finds every trigger phrase in a query with a
+single linear pass, however many spelling variants the groups carry.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton over plain substrings"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        seen = set()
+        for pattern in patterns:
+            if pattern and pattern not in seen:
+                seen.add(pattern)
+                self._insert(pattern)
+        self._link()
+
+    def _insert(self, pattern: str):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] += (len(self.patterns),)
+        self.patterns.append(pattern)
+
+    def _link(self):
+        """Compute failure links breadth-first and merge suffix outputs"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def iter_matches(self, text: str) -> Iterator[int]:
+        """Yield the pattern id of every occurrence in `text`"""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                yield from out[state]
+
+    def find_all(self, text: str) -> List[str]:
+        """Distinct patterns occurring in `text`, in pattern order"""
+        found = set(self.iter_matches(text))
+        return [self.patterns[i] for i in sorted(found)]
+
+
+class TriggerMatch(NamedTuple):
+    """Phrases a query matched"""
+    identity: List[str]             # Girlfriend identity triggers
+    groups: Dict[str, List[str]]    # Keyword group -> matched keywords
+
+
+class TriggerMatcher:
+    """
+    Compiled matcher for girlfriend identity triggers and every keyword
+    group's keywords
+    """
+
+    def __init__(self, keyword_groups: Dict[str, Dict], identity_triggers: Iterable[str]):
+        self._group_order = list(keyword_groups)
+        self._identity = set(identity_triggers)
+
+        # phrase -> groups that list it
+        self._phrase_groups: Dict[str, List[str]] = {}
+        for group_name, group_info in keyword_groups.items():
+            for kw in group_info['keywords']:
+                groups = self._phrase_groups.setdefault(kw, [])
+                if group_name not in groups:
+                    groups.append(group_name)
+
+        self._automaton = AhoCorasick(list(self._identity) + list(self._phrase_groups))
+
+    def match(self, query_lower: str) -> TriggerMatch:
+        """
+        Find all triggered phrases in one pass
+
+        Args:
+            query_lower: Lowercased query
+
+        Returns:
+            TriggerMatch with identity phrases and per-group keywords
+        """
+        identity = []
+        groups: Dict[str, List[str]] = {}
+        for phrase in self._automaton.find_all(query_lower):
+            if phrase in self._identity:
+                identity.append(phrase)
+            for group_name in self._phrase_groups.get(phrase, ()):
+                groups.setdefault(group_name, []).append(phrase)
+
+        ordered = {g: groups[g] for g in self._group_order if g in groups}
+        return TriggerMatch(identity=identity, groups=ordered)
@@ -0,0 +1,130 @@
+"""
+HerAI Concurrency Stress Test
+Many reader threads query one tenant's MemoryAgent while a writer keeps
+adding memories. Readers must never fail and never see a half-applied
+add_memory: every read reflects exactly the first n writes for some n.
+Usage: python test_concurrency.py
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+
+import pytest
+
+from agents.memory_agent import MemoryAgent, NUMPY_AVAILABLE
+from agents.tenant_manager import TenantMemoryManager
+
+# bm25 and vector search need numpy
+requires_numpy = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy is not installed")
+
+
+READERS = 8
+WRITES = 200
+CATEGORY = 'stress_test'
+TOKEN = 'xqzvjk'
+
+
+def stress_ids(memories, first_id):
+    """Ids of the stress memories in a result, checked to be writes 1..n"""
+    ids = sorted(m['id'] for m in memories if m.get('category') == CATEGORY)
+    expected = list(range(first_id, first_id + len(ids)))
+    assert ids == expected, f"half-applied writes: {ids[:5]}... vs {expected[:5]}..."
+    return len(ids)
+
+
+def run_stress(engine: str):
+    """One writer, READERS readers on one tenant's agent over a temp corpus"""
+    tmp = tempfile.mkdtemp()
+    try:
+        memory_file = os.path.join(tmp, 'memories.json')
+        shutil.copy('memory/memories.json', memory_file)
+        manager = TenantMemoryManager(root=tmp, default_memory_file=memory_file,
+                                      engine=engine, compact_records=50)
+        agent = manager.get()
+        assert manager.get() is agent
+        # Another manager over the same file gets the same agent, never a second writer
+        other = TenantMemoryManager(root=tmp, default_memory_file=memory_file, engine=engine)
+        assert other.get() is agent
+        first_id = len(agent.memories) + 1
+        base_total = agent.get_stats()['total_memories']
+
+        done = threading.Event()
+        errors = []
+        reads = [0] * READERS
+
+        def reader(slot: int):
+            seen = 0
+            total = base_total
+            try:
+                while not done.is_set() or reads[slot] == 0:
+                    n = stress_ids(agent.get_memory_by_category(CATEGORY), first_id)
+                    assert n >= seen, "a reader went back in time"
+                    seen = n
+
+                    if engine == 'keyword':
+                        # Only stress memories score 3 + 10 * 0.5 on this query
+                        hits = agent.retrieve_memories(TOKEN, k=WRITES, min_score=8)
+                        assert len(hits) == stress_ids(hits, first_id)
+                        batch = agent.retrieve_memories_batch([TOKEN, 'who is lalita'], k=WRITES, min_score=8)
+                        stress_ids(batch[0], first_id)
+
+                    stats_total = agent.get_stats()['total_memories']
+                    assert stats_total >= total, "stats went back in time"
+                    total = stats_total
+                    stress_ids(agent.get_recent_memories(WRITES), first_id)
+                    reads[slot] += 1
+            except Exception as e:
+                errors.append(e)
+
+        def writer():
+            try:
+                for i in range(WRITES):
+                    agent.add_memory(f"{TOKEN} concurrent write {i}", CATEGORY, importance=10)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                done.set()
+
+        threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(READERS)]
+        threads.append(threading.Thread(target=writer))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors, f"{len(errors)} thread(s) failed: {errors[0]!r}"
+        assert stress_ids(agent.get_memory_by_category(CATEGORY), first_id) == WRITES
+        assert agent.get_stats()['total_memories'] == base_total + WRITES
+
+        # Everything reached the journal / snapshot: a fresh agent agrees
+        reloaded = MemoryAgent(memory_file, engine)
+        assert stress_ids(reloaded.get_memory_by_category(CATEGORY), first_id) == WRITES
+        print(f"✅ {engine}: {WRITES} writes, {sum(reads)} consistent reads by {READERS} readers")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_concurrent_keyword():
+    run_stress('keyword')
+
+
+@requires_numpy
+def test_concurrent_bm25():
+    run_stress('bm25')
+
+
+@requires_numpy
+def test_concurrent_vector():
+    run_stress('vector')
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("  🧵 CONCURRENCY STRESS TEST")
+    print("=" * 60 + "\n")
+    test_concurrent_keyword()
+    test_concurrent_bm25()
+    test_concurrent_vector()
+    print("\n  ✅ ALL CONCURRENCY CHECKS PASSED!\n")
@@ -0,0 +1,99 @@
+"""
+HerAI Memory CRUD Test
+get / update / delete by id, re-indexing on update, and id allocation
+that never hands out a deleted id again, even after a restart or a
+re-pack.
+Usage: python test_crud.py
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from agents.memory_agent import MemoryAgent, NUMPY_AVAILABLE
+
+# bm25 and vector search need numpy
+requires_numpy = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy is not installed")
+
+
+def raises_key_error(call, *args):
+    try:
+        call(*args)
+    except KeyError:
+        return
+    raise AssertionError(f"{call.__name__}{args} did not raise KeyError")
+
+
+def run_crud(engine: str):
+    tmp = tempfile.mkdtemp()
+    try:
+        memory_file = os.path.join(tmp, 'memories.json')
+        shutil.copy('memory/memories.json', memory_file)
+        agent = MemoryAgent(memory_file, engine, watch_interval=None)
+        total = agent.get_stats()['total_memories']
+
+        added = agent.add_memory("snorkelwump tea on the balcony", 'test', importance=7)
+        memory_id = added['id']
+        assert agent.get_memory(memory_id) == added
+
+        updated = agent.update_memory(memory_id, content="flibbertine cake for her birthday")
+        assert updated['id'] == memory_id and updated['importance'] == 7
+        assert agent.get_memory(memory_id)['content'] == "flibbertine cake for her birthday"
+        assert agent.retrieve_memories("flibbertine cake", k=1)[0]['id'] == memory_id
+        assert all(m['id'] != memory_id for m in agent.retrieve_memories("snorkelwump tea", k=3))
+
+        # Deleting the newest memory must not free its id
+        assert agent.delete_memory(memory_id)['id'] == memory_id
+        assert agent.get_memory(memory_id) is None
+        raises_key_error(agent.delete_memory, memory_id)
+        raises_key_error(agent.update_memory, memory_id, "again")
+        assert agent.get_stats()['total_memories'] == total
+        assert all(m['id'] != memory_id for m in agent.retrieve_memories("flibbertine cake", k=3))
+        next_id = agent.add_memory("after the delete", 'test')['id']
+        assert next_id == memory_id + 1, next_id
+
+        # ...nor after a restart (journal replay) or a compaction
+        agent.delete_memory(next_id)
+        agent = MemoryAgent(memory_file, engine, watch_interval=None)
+        assert agent.get_memory(next_id) is None
+        assert agent.add_memory("after a restart", 'test')['id'] == next_id + 1
+        agent._save_memories()
+        agent = MemoryAgent(memory_file, engine, watch_interval=None)
+        assert agent.add_memory("after a compaction", 'test')['id'] == next_id + 2
+
+        # Deleting most memories re-packs the table; the others keep their ids
+        kept = agent.get_memory(1)
+        for memory_id in range(2, 45):
+            agent.delete_memory(memory_id)
+        assert agent.get_memory(1) == kept and agent.get_memory(44) is None
+        assert agent.get_memory(next_id + 2)['content'] == "after a compaction"
+        assert agent.add_memory("after a re-pack", 'test')['id'] == next_id + 3
+        print(f"✅ {engine}: add, get, update, delete; deleted ids stay retired")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_crud_keyword():
+    run_crud('keyword')
+
+
+@requires_numpy
+def test_crud_bm25():
+    run_crud('bm25')
+
+
+@requires_numpy
+def test_crud_vector():
+    run_crud('vector')
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("  🗂️  MEMORY CRUD TEST")
+    print("=" * 60 + "\n")
+    test_crud_keyword()
+    test_crud_bm25()
+    test_crud_vector()
+    print("\n  ✅ ALL CRUD CHECKS PASSED!\n")
@@ -0,0 +1,97 @@
+"""
+HerAI Date Parser Test
+Date spans parse_date_range() finds in English and Romanized Nepali
+queries, against a fixed "today".
+Usage: python test_date_parser.py
+"""
+
+from datetime import date
+
+from memory.date_parser import DateRange, parse_date_range
+
+
+TODAY = date(2026, 10, 17)
+
+
+def span(start: str, end: str) -> DateRange:
+    return DateRange(date.fromisoformat(start), date.fromisoformat(end))
+
+
+def check(query: str, expected, exists=None):
+    parsed = parse_date_range(query, TODAY, exists)
+    assert parsed == expected, f"{query!r}: {parsed} != {expected}"
+
+
+def test_absolute_dates():
+    check("what happened on 2024-02-14", span('2024-02-14', '2024-02-14'))
+    check("2024-03 ko kura", span('2024-03-01', '2024-03-31'))
+    check("feb 14, 2024", span('2024-02-14', '2024-02-14'))
+    check("14th of february 2025", span('2025-02-14', '2025-02-14'))
+    check("march 2025", span('2025-03-01', '2025-03-31'))
+    check("2024 ma ke bhayo", span('2024-01-01', '2024-12-31'))
+    print("✅ absolute dates")
+
+
+def test_yearless_dates():
+    # Latest occurrence up to today
+    check("what happened in January?", span('2026-01-01', '2026-01-31'))
+    check("in november", span('2025-11-01', '2025-11-30'))
+    check("feb 14", span('2026-02-14', '2026-02-14'))
+    # ...or the latest one that holds memories
+    in_2024 = lambda s: s.start.year == 2024
+    check("what happened in January?", span('2024-01-01', '2024-01-31'), in_2024)
+    check("feb 14", span('2024-02-14', '2024-02-14'), in_2024)
+    check("what happened in January?", span('2026-01-01', '2026-01-31'), lambda s: False)
+    # Month names that are also words need a day, a year or a range
+    check("in march", None)
+    check("I may go", None)
+    print("✅ yearless dates")
+
+
+def test_relative_dates():
+    check("hijo ke bhayo", span('2026-10-16', '2026-10-16'))
+    check("last month", span('2026-09-01', '2026-09-30'))
+    check("gaeko mahina", span('2026-09-01', '2026-09-30'))
+    check("3 din aghi", span('2026-10-14', '2026-10-14'))
+    check("last 2 weeks", span('2026-10-03', '2026-10-17'))
+    check("pohor", span('2025-01-01', '2025-12-31'))
+    print("✅ relative dates")
+
+
+def test_bikram_sambat():
+    check("bhadra 2081", span('2024-08-17', '2024-09-16'))
+    check("bhadra, 2081", span('2024-08-17', '2024-09-16'))
+    check("kartik 2080 ma", span('2023-10-18', '2023-11-16'))
+    check("mero janma bhadra 2060 ma", span('2003-08-17', '2003-09-16'))
+    check("2060 bhadra", span('2003-08-17', '2003-09-16'))
+    check("mero janma 2060 bhadra ma", span('2003-08-17', '2003-09-16'))
+    check("kartik 15 2080", span('2023-10-18', '2023-11-16'))
+    check("bhadra", span('2026-08-17', '2026-09-16'))
+    check("2081 sal", span('2024-04-14', '2025-04-13'))
+    print("✅ Bikram Sambat")
+
+
+def test_ranges():
+    check("from 2024-02-14 to 2024-03-01", span('2024-02-14', '2024-03-01'))
+    check("2024-02-14 dekhi 2024-03-01 samma", span('2024-02-14', '2024-03-01'))
+    check("january dekhi march samma", span('2026-01-01', '2026-03-31'))
+    check("from feb to march 2025", span('2025-02-01', '2025-03-31'))
+    check("jan to mar 2024", span('2024-01-01', '2024-03-31'))
+    check("sept and oct 2023", span('2023-09-01', '2023-10-31'))
+    check("since 2024", DateRange(date(2024, 1, 1), None))
+    check("2024 dekhi", DateRange(date(2024, 1, 1), None))
+    check("before 2024", DateRange(None, date(2023, 12, 31)))
+    check("2024-06 samma", DateRange(None, date(2024, 6, 30)))
+    print("✅ ranges")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("  📅 DATE PARSER TEST")
+    print("=" * 60 + "\n")
+    test_absolute_dates()
+    test_yearless_dates()
+    test_relative_dates()
+    test_bikram_sambat()
+    test_ranges()
+    print("\n  ✅ ALL DATE PARSER CHECKS PASSED!\n")
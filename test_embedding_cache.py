@@ -0,0 +1,92 @@
+"""
+HerAI Embedding Cache Test
+Embeddings computed once are reused by a second cache on the same files
+(another process, or the next start), compaction keeps only live rows,
+and a restarted vector agent embeds only memories whose text changed.
+Usage: python test_embedding_cache.py
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from agents.memory_agent import MemoryAgent  # noqa: E402
+from memory.embedding_cache import EmbeddingCache, content_key  # noqa: E402
+from memory.embeddings import HashingEmbedder  # noqa: E402
+
+
+TEXTS = ["momo at the ghat", "first date in Pokhara", "Ma timilai maya garchu", "momo at the ghat"]
+
+
+def counting_embedder(embedder, calls):
+    def embed_batch(texts):
+        calls.extend(texts)
+        return embedder.embed_batch(texts)
+    return embed_batch
+
+
+def test_shared_cache():
+    tmp = tempfile.mkdtemp()
+    try:
+        embedder = HashingEmbedder()
+        path = os.path.join(tmp, 'memories.embeddings')
+        calls = []
+        first = EmbeddingCache(path, embedder.dim)
+        vectors = first.embed(TEXTS, counting_embedder(embedder, calls))
+        assert calls == TEXTS[:3], calls   # The repeated text is embedded once
+        assert np.allclose(vectors, embedder.embed_batch(TEXTS), atol=1e-6)
+
+        # A second cache on the same files (next start, another worker) embeds nothing
+        second = EmbeddingCache(path, embedder.dim)
+        calls.clear()
+        assert np.array_equal(second.embed(TEXTS, counting_embedder(embedder, calls)), vectors)
+        assert calls == [] and second.hits == 4
+        # ...and sees what the first one appends later
+        first.embed(["sel roti"], embedder.embed_batch)
+        assert second.lookup([content_key("sel roti")])[0] >= 0
+
+        dropped = second.compact([content_key(text) for text in TEXTS])
+        assert dropped == 1 and len(second) == 3
+        assert first.lookup([content_key("sel roti")])[0] == -1
+        calls.clear()
+        assert np.array_equal(first.embed(TEXTS, counting_embedder(embedder, calls)), vectors)
+        assert calls == []
+        print("✅ cache rows shared between instances and kept by compaction")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_agent_restart():
+    tmp = tempfile.mkdtemp()
+    try:
+        memory_file = os.path.join(tmp, 'memories.json')
+        shutil.copy('memory/memories.json', memory_file)
+        # No corpus snapshot, so every start embeds the corpus through the cache
+        agent = MemoryAgent(memory_file, 'vector', snapshot=False, watch_interval=None)
+        count = agent.get_stats()['total_memories']
+        assert agent._embedder.cache.misses == count
+        # The edited text is embedded (and cached) by the write
+        agent.update_memory(1, content="Our first date was chiya and a long walk by the lake")
+        assert agent._embedder.cache.misses == count + 1
+        results = [m['id'] for m in agent.retrieve_memories("first date", k=3)]
+
+        agent = MemoryAgent(memory_file, 'vector', snapshot=False, watch_interval=None)
+        cache = agent._embedder.cache
+        assert (cache.hits, cache.misses) == (count, 0), (cache.hits, cache.misses)
+        assert [m['id'] for m in agent.retrieve_memories("first date", k=3)] == results
+        print(f"✅ restarted vector agent reused {cache.hits} cached embeddings")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("  💾 EMBEDDING CACHE TEST")
+    print("=" * 60 + "\n")
+    test_shared_cache()
+    test_agent_restart()
+    print("\n  ✅ ALL EMBEDDING CACHE CHECKS PASSED!\n")
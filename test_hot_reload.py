@@ -0,0 +1,108 @@
+"""
+HerAI Hot Reload Test
+Edits made to memories.json behind the agent's back are diffed by memory
+id: reload() reports and applies only what changed, the file watcher
+picks edits up on its own, and a half-written file changes nothing.
+Usage: python test_hot_reload.py
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pytest
+
+from agents.memory_agent import MemoryAgent, NUMPY_AVAILABLE
+
+# bm25 search needs numpy
+requires_numpy = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy is not installed")
+
+
+def edit_file(memory_file: str, edit):
+    """Rewrite memories.json the way an editor would"""
+    with open(memory_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    edit(data['memories'])
+    with open(memory_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def new_memory(memory_id: int, content: str) -> dict:
+    return {'id': memory_id, 'category': 'test', 'content': content, 'date': '2026-10-17', 'importance': 5}
+
+
+def run_reload(engine: str):
+    tmp = tempfile.mkdtemp()
+    try:
+        memory_file = os.path.join(tmp, 'memories.json')
+        shutil.copy('memory/memories.json', memory_file)
+        agent = MemoryAgent(memory_file, engine, watch_interval=None)
+        count = agent.get_stats()['total_memories']
+
+        def edit(memories):
+            memories[0] = {**memories[0], 'content': 'zorbling picnic by the lake'}
+            del memories[5]
+            memories.append(new_memory(500, 'quuxberry lassi at the airport'))
+        edit_file(memory_file, edit)
+        report = agent.reload()
+        assert report == {'added': 1, 'removed': 1, 'modified': 1}, report
+        assert agent.get_stats()['total_memories'] == count
+        assert agent.get_memory(1)['content'] == 'zorbling picnic by the lake'
+        assert agent.get_memory(6) is None
+        assert agent.retrieve_memories('quuxberry lassi', k=1)[0]['id'] == 500
+        assert agent.retrieve_memories('zorbling picnic', k=1)[0]['id'] == 1
+        assert agent.reload() == {'added': 0, 'removed': 0, 'modified': 0}
+
+        # A half-written file raises and keeps the corpus
+        version = agent.version
+        with open(memory_file, 'r+', encoding='utf-8') as f:
+            f.truncate(os.path.getsize(memory_file) // 2)
+        try:
+            agent.reload()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("reloaded a truncated file")
+        assert agent.version == version and agent.get_stats()['total_memories'] == count
+        print(f"✅ {engine}: reload() applied 1 add, 1 removal and 1 edit")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_reload_keyword():
+    run_reload('keyword')
+
+
+@requires_numpy
+def test_reload_bm25():
+    run_reload('bm25')
+
+
+def test_watcher():
+    tmp = tempfile.mkdtemp()
+    try:
+        memory_file = os.path.join(tmp, 'memories.json')
+        shutil.copy('memory/memories.json', memory_file)
+        agent = MemoryAgent(memory_file, 'keyword', watch_interval=0.01)
+        edit_file(memory_file, lambda memories: memories.append(new_memory(501, 'glimmerfish kite festival')))
+
+        deadline = time.monotonic() + 10
+        while agent.get_memory(501) is None:
+            assert time.monotonic() < deadline, "the watcher never reloaded"
+            time.sleep(0.02)
+        assert agent.retrieve_memories('glimmerfish kite', k=1)[0]['id'] == 501
+        print("✅ watcher reloaded an outside edit")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("  🔄 HOT RELOAD TEST")
+    print("=" * 60 + "\n")
+    test_reload_keyword()
+    test_reload_bm25()
+    test_watcher()
+    print("\n  ✅ ALL HOT RELOAD CHECKS PASSED!\n")
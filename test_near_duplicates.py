@@ -0,0 +1,82 @@
+"""
+HerAI Near-Duplicate Test
+MinHash near-duplicate detection when adding and importing memories, in
+the 'flag' and 'skip' modes.
+Usage: python test_near_duplicates.py
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from agents.memory_agent import MemoryAgent, NUMPY_AVAILABLE
+
+# Near-duplicate detection needs numpy
+requires_numpy = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy is not installed")
+
+
+ORIGINAL = "We shared one plate of buff momo at the tiny shop near Basantapur after her exam"
+# Same words, one swapped (word Jaccard 14/16)
+REWORDED = "We shared one plate of buff momo at the small shop near Basantapur after her exam"
+UNRELATED = "She taught me to fold paper cranes on a rainy Saturday"
+
+
+def make_agent(tmp: str, mode: str) -> MemoryAgent:
+    memory_file = os.path.join(tmp, f'{mode}.json')
+    shutil.copy('memory/memories.json', memory_file)
+    return MemoryAgent(memory_file, 'keyword', near_duplicates=mode)
+
+
+@requires_numpy
+def test_add_memory():
+    tmp = tempfile.mkdtemp()
+    try:
+        agent = make_agent(tmp, 'flag')
+        original = agent.add_memory(ORIGINAL, 'food')
+        assert 'duplicate_of' not in original
+        flagged = agent.add_memory(REWORDED, 'food')
+        assert flagged['duplicate_of'] == original['id'], flagged
+        assert 'duplicate_of' not in agent.add_memory(UNRELATED, 'hobby')
+
+        agent = make_agent(tmp, 'skip')
+        original = agent.add_memory(ORIGINAL, 'food')
+        count = len(agent.memories)
+        assert agent.add_memory(REWORDED, 'food') == original
+        assert len(agent.memories) == count
+        print("✅ add_memory flags and skips near-duplicates")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+@requires_numpy
+def test_import_memories():
+    tmp = tempfile.mkdtemp()
+    try:
+        records = [{'content': ORIGINAL}, {'content': UNRELATED}, {'content': REWORDED}]
+
+        agent = make_agent(tmp, 'flag')
+        report = agent.import_memories(records, progress_every=0)
+        assert (report['added'], report['near_duplicates']) == (3, 1), report
+        # Flagged against a memory of the same batch
+        assert agent.get_memory(report['last_id'])['duplicate_of'] == report['first_id']
+
+        agent = make_agent(tmp, 'skip')
+        report = agent.import_memories(records, progress_every=0)
+        assert (report['added'], report['near_duplicates']) == (2, 1), report
+        # ...and against the stored corpus
+        report = agent.import_memories([{'content': REWORDED + '!'}], progress_every=0)
+        assert (report['added'], report['near_duplicates']) == (0, 1), report
+        print("✅ import_memories flags and skips near-duplicates")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("  👯 NEAR-DUPLICATE TEST")
+    print("=" * 60 + "\n")
+    test_add_memory()
+    test_import_memories()
+    print("\n  ✅ ALL NEAR-DUPLICATE CHECKS PASSED!\n")